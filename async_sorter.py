@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Asyncio API
+
+Runs sorts from asyncio code without blocking the event loop:
+
+    executor = SortExecutor(max_sorts=4, per_device=1)
+    ok = await sort_files_async('/srv/inbox/a', 'By File Type', executor=executor)
+
+    async for event in sort_events('/srv/inbox/b', 'By Date', executor=executor):
+        if event.kind == 'progress':
+            print(event.progress.files_done, event.progress.files_total)
+        elif event.kind == 'result':
+            print(event.success, event.metrics['counters']['files_moved'])
+
+Every sort runs in a worker thread of a bounded SortExecutor, so the blocking
+scandir, stat, mkdir and rename calls never run on the event loop. Sorts that
+share an executor share its limits: at most ``max_sorts`` sorts run at once,
+and at most ``per_device`` of them on the same filesystem, so many small sorts
+do not fight over one disk. A sort over the limit waits for a slot without
+holding a thread. Events travel through a bounded queue; when the consumer
+falls behind, the sorting thread waits for it instead of buffering without
+limit. Cancelling the awaiting task cancels the sort at its next checkpoint and
+waits for it to stop, so no file is left half moved.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import asyncio
+import threading
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, NamedTuple, Optional, Tuple
+
+from main import FileSorterApp, CancellationToken, ProgressEvent
+
+
+class SortEvent(NamedTuple):
+    """One item of the stream yielded by sort_events."""
+    kind: str                                 # 'progress', 'message' or 'result'
+    folder_path: str
+    progress: Optional[ProgressEvent] = None  # For 'progress'
+    message: str = ''                         # For 'message'
+    success: Optional[bool] = None            # For 'result'
+    stopped: Optional[str] = None             # For 'result': CancellationToken.stop_reason
+    metrics: Optional[Dict] = None            # For 'result': SortMetrics.to_dict()
+
+
+class SortExecutor:
+    """
+    Bounded thread pool shared by the sorts of one service.
+
+    The limits are enforced with asyncio semaphores, so waiting sorts cost
+    nothing but a suspended coroutine. The semaphores belong to the event loop
+    that first uses the executor; on another loop they are made anew.
+    """
+
+    def __init__(self, max_sorts: int = 2, per_device: int = 1):
+        """
+        Args:
+            max_sorts: Maximum number of sorts running at once
+            per_device: Maximum number of sorts running at once on the same
+                filesystem (the folder's st_dev). Each sort still uses its own
+                scan_workers and move_workers threads, so 1 is usually right
+                for a single disk.
+        """
+        if max_sorts < 1:
+            raise ValueError("max_sorts must be at least 1")
+        if per_device < 1:
+            raise ValueError("per_device must be at least 1")
+        self.max_sorts = max_sorts
+        self.per_device = per_device
+        self._executor = ThreadPoolExecutor(max_workers=max_sorts, thread_name_prefix='file-sorter')
+        self._loop = None
+        self._slots = None
+        self._device_slots = {}
+
+    def _semaphores(self, device: Optional[int]) -> Tuple[asyncio.Semaphore, Optional[asyncio.Semaphore]]:
+        """Return the global semaphore and the one of a device, for the running loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_sorts)
+            self._device_slots = {}
+        if device is None:
+            return self._slots, None
+        device_slots = self._device_slots.get(device)
+        if device_slots is None:
+            device_slots = self._device_slots[device] = asyncio.Semaphore(self.per_device)
+        return self._slots, device_slots
+
+    async def run(self, folder_path: str, func: Callable[[], Any],
+                  cancel: Optional[Callable[[], None]] = None) -> Any:
+        """
+        Run a blocking function that works on a folder, once a slot is free.
+
+        Args:
+            folder_path: Folder the function works on; decides its device slot
+            func: Function to run in a worker thread
+            cancel: Called (on the event loop) when the awaiting task is
+                cancelled while func runs; func is then awaited to the end
+
+        Returns:
+            The result of func
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            device = (await loop.run_in_executor(None, os.stat, folder_path)).st_dev
+        except OSError:
+            # The sort itself reports the bad folder
+            device = None
+        slots, device_slots = self._semaphores(device)
+        # Wait for the device before taking a global slot, so sorts queued on a
+        # busy disk do not hold up sorts on idle ones
+        if device_slots is not None:
+            await device_slots.acquire()
+        try:
+            async with slots:
+                future = loop.run_in_executor(self._executor, func)
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    if cancel is not None:
+                        cancel()
+                    await _wait_until_done(future)
+                    raise
+        finally:
+            if device_slots is not None:
+                device_slots.release()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads once the running sorts have finished."""
+        self._executor.shutdown(wait=wait)
+
+
+async def _wait_until_done(future: asyncio.Future):
+    """Wait for a future to finish, even if the waiting task is cancelled again."""
+    while not future.done():
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            continue
+        except Exception:
+            break
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def default_executor() -> SortExecutor:
+    """Return the SortExecutor used when none is given, creating it on first use."""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = SortExecutor()
+        return _default_executor
+
+
+async def _run_sort(folder_path: str, sorting_method: str, executor: Optional[SortExecutor],
+                    cancel_token: Optional[CancellationToken], streaming: bool, dry_run: bool,
+                    full_rescan: bool, options: Dict) -> Tuple[bool, FileSorterApp]:
+    """Make a FileSorterApp and run one sort with it in the executor."""
+    executor = executor or default_executor()
+    # Without a token of the caller's, the token is made once the sort starts,
+    # so time spent waiting for a slot does not count against time_budget
+    tokens = [cancel_token]
+    cancel_requested = threading.Event()
+
+    def run() -> Tuple[bool, FileSorterApp]:
+        sorter = FileSorterApp(**options)
+        if tokens[0] is None:
+            tokens[0] = CancellationToken(sorter.time_budget, sorter.max_files)
+        if cancel_requested.is_set():
+            tokens[0].cancel()
+        success = sorter.sort_files(folder_path, sorting_method, streaming=streaming, dry_run=dry_run,
+                                    full_rescan=full_rescan, cancel_token=tokens[0])
+        return success, sorter
+
+    def cancel():
+        cancel_requested.set()
+        if tokens[0] is not None:
+            tokens[0].cancel()
+
+    return await executor.run(folder_path, run, cancel)
+
+
+async def sort_files_async(folder_path: str, sorting_method: str,
+                           executor: Optional[SortExecutor] = None,
+                           cancel_token: Optional[CancellationToken] = None,
+                           streaming: bool = False, dry_run: bool = False,
+                           full_rescan: bool = False, **options) -> bool:
+    """
+    Sort a folder without blocking the event loop.
+
+    Args:
+        folder_path: Path to the folder to sort
+        sorting_method: A sorting method accepted by FileSorterApp.sort_files
+        executor: SortExecutor whose limits the sort shares; by default one
+            executor shared by the whole process
+        cancel_token: Token to pause or cancel the sort; cancelling the
+            awaiting task cancels it too
+        streaming, dry_run, full_rescan: As for FileSorterApp.sort_files
+        **options: Arguments for FileSorterApp. Callbacks given here are
+            called from the worker thread, not on the event loop.
+
+    Returns:
+        bool: The result of FileSorterApp.sort_files
+    """
+    success, _ = await _run_sort(folder_path, sorting_method, executor, cancel_token,
+                                 streaming, dry_run, full_rescan, options)
+    return success
+
+
+class _EventStream:
+    """Bounded queue written by the sorting thread and read on the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, folder_path: str, max_events: int):
+        self.loop = loop
+        self.folder_path = folder_path
+        self.queue = asyncio.Queue(max_events)
+        self.closed = False
+
+    def put(self, event: SortEvent):
+        """Add an event, waiting while the queue is full (called from worker threads)."""
+        if self.closed:
+            return
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.queue.put(event), self.loop)
+        except RuntimeError:
+            # The loop has been closed
+            return
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return
+            except concurrent.futures.TimeoutError:
+                if self.closed:
+                    future.cancel()
+                    return
+            except Exception:
+                return
+
+    def progress(self, event: ProgressEvent):
+        """event_callback of the sorter."""
+        self.put(SortEvent('progress', self.folder_path, progress=event))
+
+    def message(self, text: str):
+        """progress_callback of the sorter."""
+        self.put(SortEvent('message', self.folder_path, message=text))
+
+    def close(self):
+        """Drop unread events and stop accepting new ones (called on the loop)."""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+async def sort_events(folder_path: str, sorting_method: str,
+                      executor: Optional[SortExecutor] = None,
+                      cancel_token: Optional[CancellationToken] = None,
+                      streaming: bool = False, dry_run: bool = False,
+                      full_rescan: bool = False, max_events: int = 256,
+                      **options) -> AsyncIterator[SortEvent]:
+    """
+    Sort a folder and yield its progress as SortEvents.
+
+    The stream holds 'progress' events (throttled to ``max_event_rate`` per
+    second), 'message' events with the sorter's log lines, and ends with one
+    'result' event. If the sort raises, the exception is raised from the
+    iteration instead. Closing the iterator early (aclose(), or cancelling the
+    task iterating it) cancels the sort and waits for it to stop.
+
+    Args:
+        max_events: Events buffered before the sort waits for the consumer
+        Other arguments: As for sort_files_async. ``log_each_file`` defaults
+            to False; ``progress_callback`` and ``event_callback`` cannot be
+            given, since their output is what is yielded.
+    """
+    for name in ('progress_callback', 'event_callback'):
+        if name in options:
+            raise ValueError(f"{name} cannot be used with sort_events; its output is yielded instead")
+    if max_events < 1:
+        raise ValueError("max_events must be at least 1")
+    options.setdefault('log_each_file', False)
+    stream = _EventStream(asyncio.get_running_loop(), folder_path, max_events)
+    options['progress_callback'] = stream.message
+    options['event_callback'] = stream.progress
+    task = asyncio.ensure_future(_run_sort(folder_path, sorting_method, executor, cancel_token,
+                                           streaming, dry_run, full_rescan, options))
+    get = None
+    try:
+        while True:
+            get = asyncio.ensure_future(stream.queue.get())
+            done, _ = await asyncio.wait({get, task}, return_when=asyncio.FIRST_COMPLETED)
+            if get in done:
+                yield get.result()
+                continue
+            get.cancel()
+            break
+        # The sorting thread has returned, so every event it sent is queued
+        while not stream.queue.empty():
+            yield stream.queue.get_nowait()
+        success, sorter = task.result()
+        stop_reason = sorter.cancel_token.stop_reason if sorter.cancel_token else None
+        yield SortEvent('result', folder_path, success=success, stopped=stop_reason,
+                        metrics=sorter.metrics.to_dict())
+    finally:
+        if get is not None:
+            get.cancel()
+        stream.close()
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                pass
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Batch Command Line Interface
+
+Sorts many folders without any prompts, for use from cron jobs and scripts.
+Independent folders are sorted in parallel on a process pool, and each one
+gets a summary line, optionally as JSON lines:
+
+    file-sorter ~/Downloads ~/Desktop --method type --jobs 2 --json
+    file-sorter --manifest folders.txt --method date --date-granularity day
+    file-sorter ~/Downloads --method rules --rules sorting_rules.toml
+    file-sorter ~/Documents --method 'type > date'
+    file-sorter ~/shares/dev --exclude-common --exclude '*.tmp' --max-depth 3
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional
+
+from main import FileSorterApp, DateBucketer, ScanFilter
+
+# Short names accepted by --method, besides the full method names
+METHOD_ALIASES = {
+    'type': 'By File Type',
+    'date': 'By Date',
+    'alphabetical': 'Alphabetically',
+    'size': 'By Size',
+    'rules': 'By Rules',
+}
+
+# Error and warning messages kept per folder in the summary
+MAX_REPORTED_ERRORS = 20
+
+
+def resolve_method(name: str) -> Optional[str]:
+    """
+    Turn a --method value into a sorting method, or None if it is not valid.
+
+    Aliases and full names can be mixed, and several methods joined by '>'
+    sort into nested folders: 'type > date' is 'By File Type > By Date'.
+    """
+    methods = [METHOD_ALIASES.get(part.strip(), part.strip()) for part in name.split('>')]
+    sorting_method = FileSorterApp.COMPOSITE_SEPARATOR.join(methods)
+    return sorting_method if FileSorterApp.is_valid_sorting_method(sorting_method) else None
+
+
+def read_manifest(path: str) -> List[str]:
+    """Read folder paths from a manifest file (one per line, '#' starts a comment, '-' is stdin)."""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    folders = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            folders.append(line)
+    return folders
+
+
+def find_overlapping_roots(roots: List[str]) -> Optional[tuple]:
+    """Return a pair of roots where one contains the other, or None."""
+    resolved = sorted((os.path.realpath(root), root) for root in roots)
+    for (path, root), (next_path, next_root) in zip(resolved, resolved[1:]):
+        if next_path == path or next_path.startswith(path.rstrip(os.sep) + os.sep):
+            return root, next_root
+    return None
+
+
+def metrics_file_name(folder_path: str) -> str:
+    """Return the Prometheus textfile name used for a folder's metrics."""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', os.path.realpath(folder_path)).strip('_')
+    return f'file_sorter_{slug or "root"}.prom'
+
+
+def sort_root(folder_path: str, sorting_method: str, options: Dict) -> Dict:
+    """
+    Sort one folder and summarize the outcome.
+
+    Runs in a worker process, so it only takes and returns plain data.
+
+    Args:
+        folder_path: Folder to sort
+        sorting_method: One of FileSorterApp.SORTING_METHODS
+        options: FileSorterApp keyword arguments, plus 'dry_run', 'streaming'
+            and 'metrics_dir' (folder for one Prometheus textfile per root)
+
+    Returns:
+        Dictionary with the folder, success flag, file and byte counts,
+        duration, wall seconds per phase and the error and warning messages.
+        With an index ('index_path'), 'files' counts only the new or changed
+        files that were sorted and 'unchanged_folders' the folders skipped
+        because they did not change; otherwise 'unchanged_folders' is None.
+    """
+    options = dict(options)
+    dry_run = options.pop('dry_run', False)
+    streaming = options.pop('streaming', False)
+    metrics_dir = options.pop('metrics_dir', None)
+    if metrics_dir:
+        options['metrics_path'] = os.path.join(metrics_dir, metrics_file_name(folder_path))
+    errors = []
+    error_count = [0]
+
+    def collect(message: str):
+        if message.startswith(('Error', 'Warning')):
+            error_count[0] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(message)
+
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    try:
+        sorter = FileSorterApp(progress_callback=collect, log_each_file=False, **options)
+        success = sorter.sort_files(folder_path, sorting_method, streaming=streaming, dry_run=dry_run)
+    except Exception as e:
+        collect(f'Error: {e}')
+        sorter = None
+        success = False
+
+    files = moved = bytes_moved = 0
+    unchanged = None
+    phases = {}
+    stopped = None
+    if sorter is not None:
+        stopped = sorter.cancel_token.stop_reason
+        if sorter.incremental_stats is not None:
+            unchanged = sorter.incremental_stats['directories_skipped']
+        phases = {name: timings['wall'] for name, timings in sorter.metrics.to_dict()['phases'].items()}
+        if streaming and not dry_run and getattr(sorter, 'stream_stats', None):
+            files = sorter.stream_stats['files_seen']
+            moved = sorter.stream_stats['files_moved']
+            bytes_moved = sorter.stream_stats['bytes_moved']
+        elif sorter.last_plan is not None:
+            files = sorter.last_plan.total_files
+            if dry_run:
+                moved = len(sorter.last_plan.moves)
+                bytes_moved = sum(move.size for move in sorter.last_plan.moves)
+            else:
+                for result in sorter.move_results:
+                    if not result.error:
+                        moved += 1
+                        bytes_moved += result.move.size
+
+    return {
+        'event': 'root',
+        'root': folder_path,
+        'method': sorting_method,
+        'success': success,
+        'dry_run': dry_run,
+        'stopped': stopped,
+        'files': files,
+        'unchanged_folders': unchanged,
+        'moved': moved,
+        'bytes': bytes_moved,
+        'duration': round(time.perf_counter() - start_time, 6),
+        'cpu_time': round(time.process_time() - start_cpu, 6),
+        'phases': phases,
+        'error_count': error_count[0],
+        'errors': errors
+    }
+
+
+def format_summary(summary: Dict) -> str:
+    """Format a per-folder summary as one line of text."""
+    verb = 'would move' if summary['dry_run'] else 'moved'
+    status = 'OK' if summary['success'] else 'FAILED'
+    if summary['unchanged_folders'] is None:
+        files = f'{summary["files"]} files'
+    else:
+        files = (f'{summary["files"]} new or changed files '
+                 f'({summary["unchanged_folders"]} unchanged folders skipped)')
+    line = (f'{status} {summary["root"]}: {verb} {summary["moved"]} of {files} '
+            f'({summary["bytes"] / (1024 * 1024):.1f} MB) in {summary["duration"]:.2f}s')
+    if summary['stopped']:
+        line += f', stopped ({summary["stopped"].replace("_", " ")})'
+    if summary['error_count']:
+        line += f', {summary["error_count"]} errors'
+        for error in summary['errors']:
+            line += f'\n    {error}'
+    return line
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the batch command."""
+    method_choices = sorted(METHOD_ALIASES) + FileSorterApp.get_available_sorting_methods()
+    parser = argparse.ArgumentParser(
+        prog='file-sorter',
+        description='Sort one or more folders without prompts. '
+                    'Run without arguments for the interactive prompt.'
+    )
+    parser.add_argument('roots', nargs='*', help='folders to sort')
+    parser.add_argument('--manifest', metavar='FILE',
+                        help="file listing folders to sort, one per line ('-' reads stdin)")
+    parser.add_argument('--method', default='type',
+                        help="sorting method, or several joined by '>' for nested folders, "
+                             "e.g. 'type > date' (default: %(default)s; choices: "
+                             + ', '.join(method_choices) + ')')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='folders sorted in parallel, each in its own process '
+                             '(default: one per CPU, at most one per folder)')
+    parser.add_argument('--json', action='store_true',
+                        help='print one JSON object per folder and a final summary object')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='only report what would be moved')
+    parser.add_argument('--streaming', action='store_true',
+                        help='move files while scanning')
+    parser.add_argument('--scan-workers', type=int, default=0,
+                        help='threads scanning each folder (default: serial)')
+    parser.add_argument('--move-workers', type=int, default=0,
+                        help='concurrent moves within each folder (default: serial)')
+    parser.add_argument('--date-source', default='ctime', choices=FileSorterApp.DATE_SOURCES,
+                        help='timestamp used by the date method (default: %(default)s)')
+    parser.add_argument('--date-granularity', default='month', choices=DateBucketer.GRANULARITIES,
+                        help='date folder size (default: %(default)s)')
+    parser.add_argument('--date-layout', default='flat', choices=DateBucketer.LAYOUTS,
+                        help='flat (Oct_2026) or nested (2026/10) date folders (default: %(default)s)')
+    parser.add_argument('--content-types', action='store_true',
+                        help='recognize files without a known extension from their contents when sorting by type')
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help='stop sorting each folder after this many seconds and leave '
+                             'the remaining files for the next run')
+    parser.add_argument('--max-files', type=int, metavar='N',
+                        help='move at most N files per folder')
+    parser.add_argument('--metrics-dir', metavar='DIR',
+                        help='write a Prometheus textfile of run metrics per folder to DIR '
+                             "(e.g. node-exporter's textfile collector directory)")
+    parser.add_argument('--include', action='append', default=[], metavar='PATTERN',
+                        help="only sort files matching this glob (repeatable; a pattern "
+                             "with '/' matches the path below the folder)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help='skip files and folders matching this glob; excluded folders '
+                             'are never scanned (repeatable)')
+    parser.add_argument('--exclude-common', action='store_true',
+                        help='skip tool folders such as ' + ', '.join(ScanFilter.COMMON_EXCLUDES[:4]))
+    parser.add_argument('--max-depth', type=int, metavar='N',
+                        help='scan at most N folder levels below each folder (0: only its own files)')
+    parser.add_argument('--hidden', default='include', choices=ScanFilter.HIDDEN_POLICIES,
+                        help='include or exclude hidden files and folders (default: %(default)s)')
+    parser.add_argument('--symlinks', default='files', choices=ScanFilter.SYMLINK_POLICIES,
+                        help='files: sort symlinked files but do not enter symlinked folders; '
+                             'skip: ignore symlinks; follow: enter symlinked folders too '
+                             '(default: %(default)s)')
+    parser.add_argument('--skip-output-folders', action='store_true',
+                        help='do not rescan folders made by earlier sorts (No_Extension, '
+                             'size and date folders, ...)')
+    parser.add_argument('--rules', metavar='FILE',
+                        help='TOML or JSON rule file used by the rules method')
+    parser.add_argument('--duplicates', choices=['report', 'skip', 'hardlink', 'move'],
+                        help='find files with identical contents and handle them this way')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point for batch sorting.
+
+    Returns:
+        Exit status: 0 if every folder was sorted, 1 if any failed, 2 for usage errors
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    roots = list(args.roots)
+    if args.manifest:
+        try:
+            roots.extend(read_manifest(args.manifest))
+        except OSError as e:
+            parser.error(f'could not read manifest: {e}')
+    if not roots:
+        parser.error('no folders given')
+    if args.max_depth is not None and args.max_depth < 0:
+        parser.error('--max-depth must not be negative')
+    overlap = find_overlapping_roots(roots)
+    if overlap:
+        parser.error(f'folders overlap and cannot be sorted in parallel: {overlap[0]} and {overlap[1]}')
+
+    sorting_method = resolve_method(args.method)
+    if sorting_method is None:
+        parser.error(f'invalid sorting method "{args.method}"')
+    if any(FileSorterApp.SORTING_METHODS[method] == 'sort_by_rules'
+           for method in FileSorterApp.split_sorting_method(sorting_method)):
+        if not args.rules:
+            parser.error('the rules method needs --rules FILE')
+        # Check the rule file once here instead of failing in every worker
+        from rules import RuleSet
+        try:
+            RuleSet.load(args.rules)
+        except (OSError, ValueError) as e:
+            parser.error(f'could not load rules: {e}')
+    options = {
+        'scan_workers': args.scan_workers,
+        'move_workers': args.move_workers,
+        'date_source': args.date_source,
+        'date_granularity': args.date_granularity,
+        'date_layout': args.date_layout,
+        'content_types': args.content_types,
+        'duplicates': args.duplicates,
+        'dry_run': args.dry_run,
+        'streaming': args.streaming,
+        'metrics_dir': args.metrics_dir,
+        'time_budget': args.time_budget,
+        'max_files': args.max_files,
+        'rules_path': args.rules,
+        'include': args.include,
+        'exclude': args.exclude + (list(ScanFilter.COMMON_EXCLUDES) if args.exclude_common else []),
+        'max_depth': args.max_depth,
+        'hidden_files': args.hidden,
+        'symlinks': args.symlinks,
+        'skip_output_folders': args.skip_output_folders,
+    }
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    jobs = min(jobs, len(roots))
+
+    def report(summary: Dict):
+        if args.json:
+            print(json.dumps(summary), flush=True)
+        else:
+            print(format_summary(summary), flush=True)
+
+    start_time = time.perf_counter()
+    summaries = []
+    try:
+        if jobs <= 1:
+            for root in roots:
+                summaries.append(sort_root(root, sorting_method, options))
+                report(summaries[-1])
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(sort_root, root, sorting_method, options) for root in roots]
+                for future in as_completed(futures):
+                    summaries.append(future.result())
+                    report(summaries[-1])
+    except KeyboardInterrupt:
+        print('\nOperation cancelled by user.', file=sys.stderr)
+        return 1
+
+    failed = sum(1 for summary in summaries if not summary['success'])
+    unchanged = [summary['unchanged_folders'] for summary in summaries
+                 if summary['unchanged_folders'] is not None]
+    totals = {
+        'event': 'summary',
+        'roots': len(summaries),
+        'succeeded': len(summaries) - failed,
+        'failed': failed,
+        'files': sum(summary['files'] for summary in summaries),
+        'unchanged_folders': sum(unchanged) if unchanged else None,
+        'moved': sum(summary['moved'] for summary in summaries),
+        'bytes': sum(summary['bytes'] for summary in summaries),
+        'error_count': sum(summary['error_count'] for summary in summaries),
+        'duration': round(time.perf_counter() - start_time, 6)
+    }
+    if args.json:
+        print(json.dumps(totals), flush=True)
+    else:
+        files = 'files' if totals['unchanged_folders'] is None else 'new or changed files'
+        print(f'Sorted {totals["succeeded"]} of {totals["roots"]} folders: moved {totals["moved"]} '
+              f'of {totals["files"]} {files} in {totals["duration"]:.2f}s.')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Benchmarks
+
+Generates reproducible synthetic file trees and times each phase of a sort
+(scan, plan, move, cleanup) for every sorting method. Results are written as
+JSON and can be compared against the results of another revision:
+
+    python benchmark.py --files 20000 --depth 3 --fanout 6 --output new.json
+    python benchmark.py --dir /dev/shm --compare old.json --threshold 0.15
+
+The same seed and tree parameters always produce the same tree. Runs need no
+network access and no third-party packages; use a tmpfs such as /dev/shm to
+take the disk out of the measurement.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import string
+import platform
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+from typing import List, Dict, Tuple, Optional, NamedTuple
+
+from main import FileSorterApp
+
+# Short names accepted by --methods
+METHOD_ALIASES = {
+    'type': 'By File Type',
+    'date': 'By Date',
+    'alphabetical': 'Alphabetically',
+    'size': 'By Size',
+    'rules': 'By Rules',
+}
+
+PHASES = ('scan', 'plan', 'move', 'cleanup')
+
+# Phases faster than this (seconds) in both runs are never reported as regressions
+MIN_REGRESSION_SECONDS = 0.005
+
+SIZE_SUFFIXES = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+class TreeSpec(NamedTuple):
+    """Parameters of a synthetic file tree."""
+    files: int = 10000
+    depth: int = 3
+    fanout: int = 4
+    # (extension without dot, weight); '' makes files without an extension
+    extensions: Tuple[Tuple[str, float], ...] = (
+        ('jpg', 30), ('pdf', 15), ('txt', 15), ('mp4', 5), ('docx', 10),
+        ('py', 10), ('zip', 5), ('', 10))
+    # (smallest size, largest size, weight); sizes are drawn log-uniformly in the range
+    sizes: Tuple[Tuple[int, int, float], ...] = (
+        (0, 10 * 1024, 60), (10 * 1024, 1024 ** 2, 30), (1024 ** 2, 20 * 1024 ** 2, 10))
+    # Fraction of files reusing a file name from another folder
+    collision_rate: float = 0.05
+    # Modification times are spread over this many days before now
+    age_days: int = 730
+    seed: int = 1
+    # Create sizes as sparse files instead of writing every byte
+    sparse: bool = True
+
+    def to_dict(self) -> Dict:
+        """Return the spec as JSON-compatible data."""
+        data = self._asdict()
+        data['extensions'] = [list(item) for item in self.extensions]
+        data['sizes'] = [list(item) for item in self.sizes]
+        return data
+
+
+def parse_size(text: str) -> int:
+    """Parse a size such as 512, 10K, 4M or 1G."""
+    text = text.strip().upper().rstrip('B')
+    suffix = text[-1:] if text[-1:] in SIZE_SUFFIXES else ''
+    number = text[:-1] if suffix else text
+    return int(float(number) * SIZE_SUFFIXES[suffix])
+
+
+def parse_extension_mix(text: str) -> Tuple[Tuple[str, float], ...]:
+    """Parse 'jpg:5,pdf:2,:1' into ((ext, weight), ...). An empty name means no extension."""
+    mix = []
+    for item in text.split(','):
+        name, _, weight = item.partition(':')
+        mix.append((name.strip().lstrip('.'), float(weight) if weight else 1.0))
+    return tuple(mix)
+
+
+def parse_size_mix(text: str) -> Tuple[Tuple[int, int, float], ...]:
+    """Parse '0-10K:6,10K-1M:3,1M-20M:1' into ((low, high, weight), ...)."""
+    mix = []
+    for item in text.split(','):
+        size_range, _, weight = item.partition(':')
+        low, _, high = size_range.partition('-')
+        low = parse_size(low)
+        mix.append((low, parse_size(high) if high else low, float(weight) if weight else 1.0))
+    return tuple(mix)
+
+
+def _draw_size(rng: random.Random, low: int, high: int) -> int:
+    """Draw a size log-uniformly between low and high (inclusive)."""
+    if high <= low:
+        return low
+    # Shift by one so that a range starting at zero works
+    value = (low + 1) * ((high + 1) / (low + 1)) ** rng.random() - 1
+    return min(high, max(low, int(value)))
+
+
+def tree_directories(root: str, depth: int, fanout: int) -> List[str]:
+    """Return the folders of a tree with the given depth and fan-out, root first."""
+    directories = [root]
+    level = [root]
+    for depth_index in range(depth):
+        next_level = []
+        for parent in level:
+            for child in range(fanout):
+                next_level.append(os.path.join(parent, f'dir_{depth_index}_{child:03d}'))
+        directories.extend(next_level)
+        level = next_level
+    return directories
+
+
+def generate_tree(root: str, spec: TreeSpec) -> Dict:
+    """
+    Create a synthetic file tree.
+
+    Files are spread evenly over every folder of the tree, including the root.
+    Names start with a random word, so alphabetical sorting spreads them over
+    many folders. With collision_rate > 0, some files reuse the name of a file
+    in another folder, which is what happens when real shares are flattened.
+
+    Args:
+        root: Folder to create the tree in (created if missing)
+        spec: Tree parameters
+
+    Returns:
+        Dictionary with the number of folders, files and bytes created and
+        the seconds it took
+    """
+    start_time = time.perf_counter()
+    rng = random.Random(spec.seed)
+    directories = tree_directories(root, spec.depth, spec.fanout)
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+    extensions = [ext for ext, _ in spec.extensions]
+    extension_weights = [weight for _, weight in spec.extensions]
+    size_ranges = [(low, high) for low, high, _ in spec.sizes]
+    size_weights = [weight for _, _, weight in spec.sizes]
+    now = time.time()
+    oldest = now - spec.age_days * 86400
+    used_names = []
+    total_bytes = 0
+
+    for index in range(spec.files):
+        directory = directories[index % len(directories)]
+        filename = None
+        if used_names and rng.random() < spec.collision_rate:
+            candidate_dir, candidate = used_names[rng.randrange(len(used_names))]
+            if candidate_dir != directory and not os.path.exists(os.path.join(directory, candidate)):
+                filename = candidate
+        if filename is None:
+            word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(6))
+            extension = rng.choices(extensions, extension_weights)[0]
+            filename = f'{word}_{index:07d}' + (f'.{extension}' if extension else '')
+            used_names.append((directory, filename))
+
+        size = _draw_size(rng, *rng.choices(size_ranges, size_weights)[0])
+        file_path = os.path.join(directory, filename)
+        with open(file_path, 'wb') as f:
+            if spec.sparse:
+                f.truncate(size)
+            else:
+                remaining = size
+                block = rng.randbytes(min(size, 65536)) if hasattr(rng, 'randbytes') else os.urandom(min(size, 65536))
+                while remaining > 0:
+                    remaining -= f.write(block[:remaining])
+        mtime = rng.uniform(oldest, now)
+        os.utime(file_path, (mtime, mtime))
+        total_bytes += size
+
+    return {
+        'directories': len(directories),
+        'files': spec.files,
+        'bytes': total_bytes,
+        'seconds': round(time.perf_counter() - start_time, 6)
+    }
+
+
+def _timed(func, *args):
+    """Call func and return (result, wall seconds, CPU seconds)."""
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    result = func(*args)
+    return result, time.perf_counter() - start_wall, time.process_time() - start_cpu
+
+
+def run_method(root: str, sorting_method: str, options: Dict) -> Dict:
+    """
+    Sort a generated tree once, timing each phase separately.
+
+    Args:
+        root: Root of a freshly generated tree
+        sorting_method: One of FileSorterApp.SORTING_METHODS, or a composite
+            such as 'By File Type > By Date'
+        options: FileSorterApp keyword arguments
+
+    Returns:
+        Dictionary with per-phase wall and CPU seconds and the file counts
+    """
+    sorter = FileSorterApp(progress_callback=lambda message: None, log_each_file=False, **options)
+    sorter.folder_path = root
+    key_func = sorter.key_function(sorting_method)
+
+    timings = {}
+    file_list, wall, cpu = _timed(sorter.scan_files, root)
+    timings['scan'] = (wall, cpu)
+    plan, wall, cpu = _timed(sorter.plan_moves, root, file_list, key_func)
+    timings['plan'] = (wall, cpu)
+    moved, wall, cpu = _timed(sorter.execute_plan, plan, file_list)
+    timings['move'] = (wall, cpu)
+    vacated_dirs = None if sorter.full_cleanup else sorter.vacated_dirs
+    removed, wall, cpu = _timed(sorter.delete_empty_folders, root, vacated_dirs)
+    timings['cleanup'] = (wall, cpu)
+
+    return {
+        'timings': timings,
+        'files': len(file_list),
+        'moves': len(plan.moves),
+        'moved': moved,
+        'errors': sum(1 for result in sorter.move_results if result.error),
+        'folders_removed': len(removed)
+    }
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    """Reduce repeated measurements to min, median and max."""
+    return {
+        'min': round(min(samples), 6),
+        'median': round(median(samples), 6),
+        'max': round(max(samples), 6)
+    }
+
+
+def benchmark(spec: TreeSpec, methods: List[str], base_dir: str, repeat: int = 3,
+              options: Optional[Dict] = None, keep: bool = False,
+              progress=None) -> Dict:
+    """
+    Benchmark sorting methods on freshly generated trees.
+
+    Every repetition of every method gets its own copy of the tree, generated
+    from the same spec and seed, so all runs start from identical input.
+
+    Args:
+        spec: Tree parameters
+        methods: Sorting method names (keys of FileSorterApp.SORTING_METHODS)
+        base_dir: Folder the trees are generated in
+        repeat: Runs per method
+        options: FileSorterApp keyword arguments
+        keep: Leave the generated trees in place
+        progress: Optional function called with a status message per run
+
+    Returns:
+        JSON-compatible results: the spec, the environment and, per method,
+        per-phase wall and CPU time statistics and throughput
+    """
+    options = dict(options or {})
+    options.setdefault('date_source', 'mtime')
+    results = {}
+    generation = None
+    run_dir = tempfile.mkdtemp(prefix='file-sorter-bench-', dir=base_dir)
+    try:
+        for method in methods:
+            runs = []
+            for run_index in range(repeat):
+                slug = '_'.join(FileSorterApp.SORTING_METHODS[part]
+                                for part in FileSorterApp.split_sorting_method(method))
+                root = os.path.join(run_dir, f'{slug}_{run_index}')
+                generation = generate_tree(root, spec)
+                if progress:
+                    progress(f'{method} run {run_index + 1}/{repeat}...')
+                runs.append(run_method(root, method, options))
+                if not keep:
+                    shutil.rmtree(root, ignore_errors=True)
+
+            phases = {}
+            for phase in PHASES:
+                walls = [run['timings'][phase][0] for run in runs]
+                phases[phase] = {
+                    'wall': _summarize(walls),
+                    'cpu': _summarize([run['timings'][phase][1] for run in runs])
+                }
+            total_walls = [sum(run['timings'][phase][0] for phase in PHASES) for run in runs]
+            phases['total'] = {'wall': _summarize(total_walls)}
+            last = runs[-1]
+            results[method] = {
+                'phases': phases,
+                'files': last['files'],
+                'moves': last['moves'],
+                'errors': last['errors'],
+                'folders_removed': last['folders_removed'],
+                'scan_files_per_second': round(last['files'] / max(phases['scan']['wall']['median'], 1e-9), 1),
+                'move_files_per_second': round(last['moves'] / max(phases['move']['wall']['median'], 1e-9), 1)
+            }
+    finally:
+        if not keep:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    return {
+        'spec': spec.to_dict(),
+        'options': options,
+        'repeat': repeat,
+        'generation': generation,
+        'environment': environment_info(base_dir),
+        'results': results
+    }
+
+
+def environment_info(base_dir: str) -> Dict:
+    """Describe the machine, Python and source revision the benchmark ran on."""
+    revision = None
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return {
+        'revision': revision,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'directory': os.path.abspath(base_dir),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    Find phases that got slower than a baseline.
+
+    Median wall times are compared per method and phase. A phase regresses
+    when it is more than threshold (a fraction, 0.1 = 10%) slower and the
+    difference is above MIN_REGRESSION_SECONDS.
+
+    Returns:
+        One dictionary per regression with the method, phase, both medians and
+        the relative change
+    """
+    regressions = []
+    for method, result in current['results'].items():
+        base_result = baseline.get('results', {}).get(method)
+        if base_result is None:
+            continue
+        for phase, timings in result['phases'].items():
+            base_timings = base_result['phases'].get(phase)
+            if base_timings is None:
+                continue
+            old = base_timings['wall']['median']
+            new = timings['wall']['median']
+            if new - old <= MIN_REGRESSION_SECONDS or old <= 0:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append({
+                    'method': method,
+                    'phase': phase,
+                    'baseline': old,
+                    'current': new,
+                    'change': round(change, 4)
+                })
+    return regressions
+
+
+def format_results(results: Dict) -> str:
+    """Format benchmark results as a text table of median wall times."""
+    lines = [f'{"method":<16}' + ''.join(f'{phase:>10}' for phase in PHASES + ('total',)) +
+             f'{"scan f/s":>12}{"move f/s":>12}']
+    for method, result in results['results'].items():
+        lines.append(f'{method:<16}' +
+                     ''.join(f'{result["phases"][phase]["wall"]["median"]:>10.4f}' for phase in PHASES + ('total',)) +
+                     f'{result["scan_files_per_second"]:>12.0f}{result["move_files_per_second"]:>12.0f}')
+    return '\n'.join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the benchmark command."""
+    defaults = TreeSpec()
+    method_choices = sorted(METHOD_ALIASES) + FileSorterApp.get_available_sorting_methods()
+    parser = argparse.ArgumentParser(description='Time the phases of each sorting method on a synthetic tree.')
+    parser.add_argument('--files', type=int, default=defaults.files,
+                        help='files in the tree (default: %(default)s)')
+    parser.add_argument('--depth', type=int, default=defaults.depth,
+                        help='folder levels below the root (default: %(default)s)')
+    parser.add_argument('--fanout', type=int, default=defaults.fanout,
+                        help='subfolders per folder (default: %(default)s)')
+    parser.add_argument('--extensions', type=parse_extension_mix,
+                        help="extension mix as ext:weight pairs, e.g. 'jpg:5,pdf:2,:1' "
+                             "(an empty name means no extension)")
+    parser.add_argument('--sizes', type=parse_size_mix,
+                        help="size mix as low-high:weight ranges, e.g. '0-10K:6,10K-1M:3,1M-20M:1'")
+    parser.add_argument('--collision-rate', type=float, default=defaults.collision_rate,
+                        help='fraction of files sharing a name with a file in another folder '
+                             '(default: %(default)s)')
+    parser.add_argument('--age-days', type=int, default=defaults.age_days,
+                        help='spread modification times over this many days (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=defaults.seed,
+                        help='random seed (default: %(default)s)')
+    parser.add_argument('--dense', action='store_true',
+                        help='write every byte instead of creating sparse files')
+    parser.add_argument('--methods', default='type,date,alphabetical,size',
+                        help="comma-separated methods to run, each optionally several joined by '>' "
+                             '(default: %(default)s; choices: '
+                             + ', '.join(method_choices) + ')')
+    parser.add_argument('--rules', metavar='FILE',
+                        help='TOML or JSON rule file for the rules method')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per method; medians are reported (default: %(default)s)')
+    parser.add_argument('--dir', default=tempfile.gettempdir(),
+                        help='folder to generate trees in, e.g. /dev/shm (default: %(default)s)')
+    parser.add_argument('--keep', action='store_true',
+                        help='leave the generated trees in place')
+    parser.add_argument('--scan-workers', type=int, default=0,
+                        help='threads scanning the tree (default: serial)')
+    parser.add_argument('--move-workers', type=int, default=0,
+                        help='concurrent moves (default: serial)')
+    parser.add_argument('--full-cleanup', action='store_true',
+                        help='walk the whole tree for empty folders after moving')
+    parser.add_argument('--output', metavar='FILE',
+                        help="write JSON results to FILE ('-' for stdout)")
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare against JSON results from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown reported as a regression (default: %(default)s)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point for the benchmarks.
+
+    Returns:
+        Exit status: 0 on success, 1 if a regression was found, 2 for usage errors
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    methods = []
+    for name in args.methods.split(','):
+        parts = [METHOD_ALIASES.get(part.strip(), part.strip()) for part in name.split('>')]
+        method = FileSorterApp.COMPOSITE_SEPARATOR.join(parts)
+        if not FileSorterApp.is_valid_sorting_method(method):
+            parser.error(f'unknown method "{name.strip()}"')
+        if 'By Rules' in parts and not args.rules:
+            parser.error('the rules method needs a rule file (--rules FILE)')
+        methods.append(method)
+    if args.rules:
+        from rules import RuleSet
+        try:
+            RuleSet.load(args.rules)
+        except (OSError, ValueError) as e:
+            parser.error(f'could not load rules: {e}')
+    if args.files < 0 or args.depth < 0 or args.fanout < 1 or args.repeat < 1:
+        parser.error('--files and --depth must not be negative, --fanout and --repeat must be positive')
+
+    defaults = TreeSpec()
+    spec = TreeSpec(
+        files=args.files,
+        depth=args.depth,
+        fanout=args.fanout,
+        extensions=args.extensions or defaults.extensions,
+        sizes=args.sizes or defaults.sizes,
+        collision_rate=args.collision_rate,
+        age_days=args.age_days,
+        seed=args.seed,
+        sparse=not args.dense
+    )
+    options = {
+        'scan_workers': args.scan_workers,
+        'move_workers': args.move_workers,
+        'full_cleanup': args.full_cleanup,
+        'rules_path': args.rules,
+    }
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f'could not read baseline: {e}')
+
+    def log(message: str):
+        print(message, file=sys.stderr, flush=True)
+
+    results = benchmark(spec, methods, args.dir, args.repeat, options, args.keep, log)
+
+    if args.output == '-':
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_results(results))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare_results(baseline, results, args.threshold)
+        for regression in regressions:
+            log(f'Regression: {regression["method"]} {regression["phase"]} '
+                f'{regression["baseline"]:.4f}s -> {regression["current"]:.4f}s '
+                f'(+{regression["change"]:.0%})')
+        if regressions:
+            return 1
+        log(f'No regressions above {args.threshold:.0%} against {args.compare}.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
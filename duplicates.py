@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Duplicate Detection
+
+Finds files with identical contents among scan records in three tiers, so
+that most files are never read in full:
+
+1. Files are grouped by size; a file with a unique size has no duplicate.
+2. Within each size group, only the first and last blocks are hashed.
+3. Files that still share a size and edge hash get a full-content hash.
+
+Hashing runs on a process pool, and full hashes read files through mmap.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import mmap
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, Iterable, NamedTuple
+
+# What FileSorterApp can do with duplicates
+DUPLICATE_ACTIONS = ('report', 'skip', 'hardlink', 'move')
+
+# Bucket that the 'move' action sends duplicates to
+DUPLICATES_FOLDER = 'Duplicates'
+
+# Bytes hashed at each end of a file in the second tier
+EDGE_BLOCK_SIZE = 64 * 1024
+
+# Slice of a memory map handed to the hash function at a time
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _edge_digest(task: Tuple[str, int, int]) -> Optional[str]:
+    """Hash the first and last block of a file; None if it cannot be read."""
+    path, size, block_size = task
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            digest.update(f.read(block_size))
+            if size > block_size:
+                f.seek(max(size - block_size, block_size))
+                digest.update(f.read(block_size))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _full_digest(task: Tuple[str, int]) -> Optional[str]:
+    """Hash a whole file, through mmap where possible; None if it cannot be read."""
+    path, size = task
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            else:
+                with mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for start in range(0, len(mapped), HASH_CHUNK_SIZE):
+                            digest.update(view[start:start + HASH_CHUNK_SIZE])
+                    finally:
+                        view.release()
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class DuplicateGroup(NamedTuple):
+    """Files with identical contents, as indices into the scanned file list."""
+    size: int
+    digest: str
+    original: int
+    duplicates: Tuple[int, ...]
+
+
+class DuplicateFinder:
+    """
+    Finds groups of identical files among scan records.
+
+    Records that share a (device, inode) pair are hard links to the same data.
+    They are hashed once and still reported as duplicates of each other.
+    Empty files are ignored. The first record of each group in scan order is
+    treated as the original.
+    """
+
+    def __init__(self, workers: int = 0, block_size: int = EDGE_BLOCK_SIZE):
+        """
+        Args:
+            workers: Number of hashing processes (0 or 1 hashes in this process)
+            block_size: Bytes hashed at each end of a file in the edge tier
+        """
+        self.workers = workers
+        self.block_size = block_size
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        """Return a fresh counter dictionary for one find() call."""
+        return {
+            'files': 0,
+            'size_candidates': 0,
+            'edge_hashes': 0,
+            'full_hashes': 0,
+            'bytes_hashed': 0,
+            'errors': 0,
+            'groups': 0,
+            'duplicates': 0
+        }
+
+    def _map(self, executor: Optional[ProcessPoolExecutor], func, tasks: List[Tuple]) -> List[Optional[str]]:
+        """Run a hash function over tasks, on the pool if there is one."""
+        if executor is None or len(tasks) < 2:
+            return [func(task) for task in tasks]
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        return list(executor.map(func, tasks, chunksize=chunksize))
+
+    def _refine(self, executor: Optional[ProcessPoolExecutor], groups: List[List[Tuple[str, int, List[int]]]],
+                full: bool) -> List[Tuple[str, List[Tuple[str, int, List[int]]]]]:
+        """
+        Split candidate groups by edge or full hash.
+
+        Each group holds (path, size, record indices) entries, one per distinct
+        inode. Returns (digest, entries) for every hash shared by two or more
+        entries, or by one entry with several hard links.
+        """
+        entries = [entry for group in groups for entry in group]
+        if full:
+            digests = self._map(executor, _full_digest, [(path, size) for path, size, _ in entries])
+            self.stats['full_hashes'] += len(entries)
+            self.stats['bytes_hashed'] += sum(size for _, size, _ in entries)
+        else:
+            digests = self._map(executor, _edge_digest,
+                                [(path, size, self.block_size) for path, size, _ in entries])
+            self.stats['edge_hashes'] += len(entries)
+            self.stats['bytes_hashed'] += sum(min(size, 2 * self.block_size) for _, size, _ in entries)
+
+        buckets = {}
+        for entry, digest in zip(entries, digests):
+            if digest is None:
+                self.stats['errors'] += 1
+                continue
+            buckets.setdefault((entry[1], digest), []).append(entry)
+        return [(digest, members) for (_, digest), members in buckets.items()
+                if len(members) > 1 or len(members[0][2]) > 1]
+
+    def find(self, file_list: Iterable[Dict]) -> List[DuplicateGroup]:
+        """
+        Find files with identical contents.
+
+        Args:
+            file_list: File dictionaries (or a FileRecordStore) from a scan
+
+        Returns:
+            One DuplicateGroup per set of identical files, in scan order
+        """
+        self.stats = self._new_stats()
+        by_size = {}
+        for index, file in enumerate(file_list):
+            self.stats['files'] += 1
+            size = file['size']
+            if size == 0:
+                continue
+            # One entry per inode; hard links share their entry
+            inodes = by_size.setdefault(size, {})
+            key = (file.get('device', -1), file.get('inode', 0)) if file.get('inode') else ('path', index)
+            entry = inodes.get(key)
+            if entry is None:
+                inodes[key] = (file['filepath'], size, [index])
+            else:
+                entry[2].append(index)
+
+        small, large = [], []
+        for size, inodes in by_size.items():
+            entries = list(inodes.values())
+            if len(entries) < 2 and len(entries[0][2]) < 2:
+                continue
+            self.stats['size_candidates'] += len(entries)
+            (small if size <= 2 * self.block_size else large).append(entries)
+        del by_size
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            # The edge hash of a small file covers all of its bytes
+            matches = self._refine(executor, small, full=False)
+            edge_groups = self._refine(executor, large, full=False)
+            matches.extend(self._refine(executor, [members for _, members in edge_groups], full=True))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        groups = []
+        for digest, members in matches:
+            indices = sorted(index for _, _, member_indices in members for index in member_indices)
+            groups.append(DuplicateGroup(members[0][1], digest, indices[0], tuple(indices[1:])))
+            self.stats['duplicates'] += len(indices) - 1
+        groups.sort(key=lambda group: group.original)
+        self.stats['groups'] = len(groups)
+        return groups
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Persistent Metadata Index
+
+SQLite-backed index that lets FileSorterApp re-sort a folder incrementally.
+It remembers every file it has already sorted (size, mtime, inode and bucket)
+and the mtime, subdirectories and sorting method of every directory. On the
+next run with the same method and options, directories whose mtime has not
+changed are not listed at all, and files that have not changed are not planned
+again.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import List, Dict, Optional, Tuple
+
+
+class FileIndex:
+    """
+    On-disk index of sorted files and scanned directories, keyed by path.
+
+    A directory's mtime changes whenever entries are added to, removed from or
+    renamed inside it, but not when an existing file is rewritten in place.
+    Files edited in place inside an otherwise unchanged directory are therefore
+    only picked up by a full rescan (IncrementalRun with full_rescan=True).
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            directory TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            inode INTEGER NOT NULL,
+            method TEXT NOT NULL,
+            bucket TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_directory ON files (directory);
+        CREATE TABLE IF NOT EXISTS directories (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            subdirs TEXT NOT NULL,
+            method TEXT NOT NULL DEFAULT ''
+        );
+    '''
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) an index database.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(self.SCHEMA)
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(directories)')]
+        if 'method' not in columns:
+            # Indexes made before directories recorded their method; an empty
+            # method never matches, so each directory is listed once more
+            self.connection.execute("ALTER TABLE directories ADD COLUMN method TEXT NOT NULL DEFAULT ''")
+        self.connection.commit()
+
+    def get_directory(self, path: str) -> Optional[Tuple[int, List[str], str]]:
+        """Return (mtime_ns, subdirectories, method) recorded for a directory, or None."""
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT mtime_ns, subdirs, method FROM directories WHERE path = ?', (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+
+    def get_files(self, directory: str) -> Dict[str, Tuple[int, float, int, str]]:
+        """Return {path: (size, mtime, inode, method)} for the files recorded in a directory."""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT path, size, mtime, inode, method FROM files WHERE directory = ?', (directory,)
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def update(self, files: List[Tuple], removed_files: List[str],
+               directories: List[Tuple[str, int, List[str], str]], removed_directories: List[str]):
+        """
+        Apply the results of a run in a single transaction.
+
+        Args:
+            files: Rows of (path, directory, size, mtime, inode, method, bucket) to store
+            removed_files: Paths of files to forget
+            directories: Rows of (path, mtime_ns, subdirectories, method) to store
+            removed_directories: Directories to forget, along with their files
+        """
+        with self._lock, self.connection:
+            self.connection.executemany(
+                'DELETE FROM files WHERE path = ?', ((path,) for path in removed_files)
+            )
+            self.connection.executemany(
+                'DELETE FROM directories WHERE path = ?', ((path,) for path in removed_directories)
+            )
+            self.connection.executemany(
+                'DELETE FROM files WHERE directory = ?', ((path,) for path in removed_directories)
+            )
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)', files
+            )
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?)',
+                ((path, mtime_ns, json.dumps(subdirs), method) for path, mtime_ns, subdirs, method in directories)
+            )
+
+    def record_moves(self, root: str, method: str, records: List[Dict], move_results: List):
+        """
+        Record moves made outside an IncrementalRun, such as watch mode batches.
+
+        Moved files are stored under their new paths. The rows of the folders
+        they left and entered are dropped, so the next run lists those folders
+        again instead of trusting their old mtimes.
+
+        Args:
+            root: Root folder being sorted
+            method: Sorting method signature the files were sorted with
+            records: The records the plan was made from
+            move_results: MoveResult list from FileSorterApp.execute_plan
+        """
+        root = os.path.normpath(os.path.abspath(root))
+        files = []
+        removed_files = []
+        directories = set()
+        for result in move_results:
+            if result.error:
+                continue
+            record = records[result.move.record_index]
+            source = os.path.normpath(os.path.abspath(result.move.source))
+            destination = os.path.normpath(os.path.abspath(result.move.destination))
+            directory = os.path.dirname(destination)
+            files.append((destination, directory, record['size'], record['modified_time'],
+                          record['inode'], method, os.path.relpath(directory, root)))
+            removed_files.append(source)
+            directories.add(os.path.dirname(source))
+            directories.add(directory)
+        if files:
+            self.update(files, removed_files, [], sorted(directories))
+
+    def clear(self):
+        """Forget everything in the index."""
+        with self._lock, self.connection:
+            self.connection.execute('DELETE FROM files')
+            self.connection.execute('DELETE FROM directories')
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.connection.close()
+
+
+class IncrementalRun:
+    """
+    One incremental sorting run against a FileIndex.
+
+    scan() returns only the files that are new or changed since the last run;
+    commit() records the outcome of sorting them. Paths are normalized so the
+    same folder always maps to the same index rows.
+    """
+
+    def __init__(self, index: FileIndex, sorter, folder_path: str, method_name: str,
+                 full_rescan: bool = False):
+        """
+        Args:
+            index: Index to read from and update
+            sorter: FileSorterApp used for directory listings and logging
+            folder_path: Root folder being sorted
+            method_name: Sorting method signature (see FileSorterApp.sorting_signature);
+                files and directories sorted with a different method or
+                different options are treated as changed
+            full_rescan: List every directory even if its mtime is unchanged
+        """
+        self.index = index
+        self.sorter = sorter
+        self.root = os.path.normpath(os.path.abspath(folder_path))
+        self.method_name = method_name
+        self.full_rescan = full_rescan
+        self.directory_state = {}
+        self.removed_files = []
+        self.removed_directories = []
+        self.stats = {
+            'directories_listed': 0,
+            'directories_skipped': 0,
+            'files_unchanged': 0,
+            'files_changed': 0
+        }
+
+    def scan(self) -> List[Dict]:
+        """
+        Walk the folder, skipping directories that are unchanged since they
+        were last sorted with the same method.
+
+        Returns:
+            File dictionaries for new or changed files only
+        """
+        scan_stats = self.sorter._new_scan_stats()
+        self.sorter.scan_stats = scan_stats
+        if self.sorter.scan_filter is not None:
+            self.sorter.scan_filter.start(self.root)
+        changed = []
+        stack = [self.root]
+
+        while stack:
+            if not self.sorter.cancel_token.checkpoint():
+                break
+            dir_path = stack.pop()
+            try:
+                scan_stats['stat_calls'] += 1
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                self.removed_directories.append(dir_path)
+                continue
+
+            known = None if self.full_rescan else self.index.get_directory(dir_path)
+            if known is not None and known[0] == mtime_ns and known[2] == self.method_name:
+                subdirs = known[1]
+                self.stats['directories_skipped'] += 1
+            else:
+                try:
+                    records, subdirs = self.sorter._scan_directory(dir_path, scan_stats)
+                except (OSError, PermissionError) as e:
+                    if dir_path == self.root:
+                        self.sorter._log_progress(f'Error accessing folder {dir_path}: {e}')
+                        return []
+                    self.sorter._log_progress(f'Warning: Could not access folder {dir_path}: {e}')
+                    self.removed_directories.append(dir_path)
+                    continue
+                self.stats['directories_listed'] += 1
+
+                known_files = self.index.get_files(dir_path)
+                for record in records:
+                    row = known_files.pop(record['filepath'], None)
+                    if row is not None and row == (record['size'], record['modified_time'],
+                                                   record['inode'], self.method_name):
+                        self.stats['files_unchanged'] += 1
+                        continue
+                    changed.append(record)
+                # Whatever is left was deleted or moved away since the last run
+                self.removed_files.extend(known_files)
+
+            self.directory_state[dir_path] = (mtime_ns, list(subdirs))
+            stack.extend(reversed(subdirs))
+
+        self.stats['files_changed'] = len(changed)
+        return changed
+
+    def _add_directory(self, directory: str, touched: set):
+        """Register a directory created during the run, along with missing parents."""
+        while directory != self.root and directory not in self.directory_state:
+            parent = os.path.dirname(directory)
+            self.directory_state[directory] = (0, [])
+            touched.add(directory)
+            if parent in self.directory_state and directory not in self.directory_state[parent][1]:
+                self.directory_state[parent][1].append(directory)
+            touched.add(parent)
+            directory = parent
+
+    def commit(self, records: List[Dict], plan, move_results):
+        """
+        Record the outcome of sorting the records returned by scan().
+
+        Args:
+            records: The changed records (with filepaths updated by the executor)
+            plan: MovePlan that was executed
+            move_results: MoveResult list from FileSorterApp.execute_plan
+        """
+        failed_indices = set()
+        touched = set()
+        invalid_directories = set()
+        removed_files = list(self.removed_files)
+
+        for result in move_results:
+            source_dir = os.path.dirname(result.move.source)
+            if result.error:
+                failed_indices.add(result.move.record_index)
+                invalid_directories.add(source_dir)
+                continue
+            removed_files.append(result.move.source)
+            touched.add(source_dir)
+            touched.add(os.path.dirname(result.move.destination))
+
+        for directory in plan.directories:
+            self._add_directory(directory, touched)
+        
+        # Cleanup removed these folders, which changed their parents
+        for folder in self.sorter.removed_folders:
+            touched.add(os.path.dirname(os.path.normpath(folder)))
+
+        files = []
+        for index, record in enumerate(records):
+            if index in failed_indices:
+                continue
+            path = record['filepath']
+            directory = os.path.dirname(path)
+            files.append((path, directory, record['size'], record['modified_time'],
+                          record['inode'], self.method_name, os.path.relpath(directory, self.root)))
+
+        directories = []
+        removed_directories = list(self.removed_directories)
+        for directory, (mtime_ns, subdirs) in self.directory_state.items():
+            if directory in invalid_directories:
+                removed_directories.append(directory)
+                continue
+            if directory in touched:
+                # Our own moves changed this directory; record its new mtime
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except OSError:
+                    removed_directories.append(directory)
+                    continue
+            directories.append((directory, mtime_ns, subdirs, self.method_name))
+
+        self.index.update(files, removed_files, directories, removed_directories)
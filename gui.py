@@ -15,27 +15,303 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import threading
+import queue
+import itertools
+import time
 import os
-from main import FileSorterApp
+from collections import deque
+from main import FileSorterApp, CancellationToken, ScanCache
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")  # Modes: "System" (standard), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
 
+class LogBuffer:
+    """
+    Bounded in-memory model for the progress log.
+    
+    Keeps the most recent max_lines messages plus a separate list of warnings
+    and errors. When a log file is open, every message is also handed to a
+    background thread that writes it to disk, so the full log is preserved
+    without the GUI thread ever waiting on file I/O.
+    """
+    
+    def __init__(self, max_lines=5000, max_issues=5000):
+        self.lines = deque(maxlen=max_lines)
+        self.issues = deque(maxlen=max_issues)
+        self.log_path = None
+        self._write_queue = None
+        self._writer_thread = None
+    
+    @staticmethod
+    def is_issue(message):
+        """Return True for warning and error messages."""
+        return message.startswith("Warning:") or message.startswith("Error") or "Error:" in message
+    
+    def append(self, message):
+        """Add a message to the log."""
+        self.lines.append(message)
+        if self.is_issue(message):
+            self.issues.append(message)
+        if self._write_queue is not None:
+            self._write_queue.put(message)
+    
+    def clear(self):
+        """Remove all messages from memory (the log file is not affected)."""
+        self.lines.clear()
+        self.issues.clear()
+    
+    def open_log_file(self, log_path):
+        """Start saving every new message to log_path in the background."""
+        self.close_log_file()
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        self.log_path = log_path
+        self._write_queue = queue.Queue()
+        self._writer_thread = threading.Thread(
+            target=self._write_log,
+            args=(log_path, self._write_queue),
+            daemon=True
+        )
+        self._writer_thread.start()
+    
+    def close_log_file(self):
+        """Flush and close the current log file, if any."""
+        if self._write_queue is None:
+            return
+        self._write_queue.put(None)
+        self._writer_thread.join(timeout=5)
+        self._write_queue = None
+        self._writer_thread = None
+    
+    @staticmethod
+    def _write_log(log_path, write_queue):
+        """Writer thread: drain the queue into the log file in batches."""
+        with open(log_path, "a", encoding="utf-8") as log_file:
+            while True:
+                message = write_queue.get()
+                batch = []
+                while message is not None:
+                    batch.append(message)
+                    try:
+                        message = write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    log_file.write("\n".join(batch) + "\n")
+                    log_file.flush()
+                if message is None:
+                    return
+
+
+class UpdateQueue:
+    """
+    Hands log messages and progress events from worker threads to the GUI thread.
+    
+    Items are queued without touching Tk. The first item after a drain
+    schedules one drain, which handles everything queued by then, so however
+    fast a sort logs, the GUI thread runs at most one callback per scheduling
+    interval. Messages are all delivered, in order; of the progress events in
+    one drain only the newest is, since each replaces the last on screen.
+    """
+    
+    def __init__(self, schedule, handle_message, handle_event):
+        """
+        Args:
+            schedule: Called with the drain function to run it later on the
+                GUI thread (e.g. a root.after with a delay)
+            handle_message: Called with each text message (GUI thread)
+            handle_event: Called with the newest ProgressEvent (GUI thread)
+        """
+        self._schedule = schedule
+        self._handle_message = handle_message
+        self._handle_event = handle_event
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+    
+    def put_message(self, message):
+        """Queue a text message (any thread)."""
+        self._put((True, message))
+    
+    def put_event(self, event):
+        """Queue a progress event (any thread)."""
+        self._put((False, event))
+    
+    def _put(self, item):
+        self._items.append(item)
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule(self.drain)
+    
+    def drain(self):
+        """Handle everything queued so far (GUI thread)."""
+        with self._lock:
+            self._scheduled = False
+        items = []
+        while self._items:
+            items.append(self._items.popleft())
+        last_event = max((index for index, (is_message, _) in enumerate(items) if not is_message), default=-1)
+        for index, (is_message, item) in enumerate(items):
+            if is_message:
+                self._handle_message(item)
+            elif index == last_event:
+                self._handle_event(item)
+
+
+class VirtualLogView(ctk.CTkFrame):
+    """
+    Log widget that only renders the lines currently visible.
+    
+    The text box holds at most one screen of text taken from a LogBuffer, and
+    the scrollbar position is mapped onto the buffer. Redraws are coalesced, so
+    appending thousands of messages costs one redraw per refresh interval. The
+    view follows the end of the log until the user scrolls up.
+    """
+    
+    REFRESH_MS = 100
+    
+    def __init__(self, master, log_buffer, font=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.log_buffer = log_buffer
+        self.issues_only = False
+        self.first_line = 0
+        self.follow_tail = True
+        self._redraw_pending = False
+        self._font = font or ctk.CTkFont(size=11)
+        
+        self.textbox = ctk.CTkTextbox(
+            self,
+            font=self._font,
+            wrap="none",
+            activate_scrollbars=False
+        )
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.textbox.pack(side="left", fill="both", expand=True)
+        self.textbox.configure(state="disabled")
+        
+        self.textbox.bind("<Configure>", lambda event: self.refresh())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.textbox.bind(sequence, self._on_mousewheel)
+    
+    def _source(self):
+        return self.log_buffer.issues if self.issues_only else self.log_buffer.lines
+    
+    def _visible_count(self):
+        line_height = max(1, self._font.metrics("linespace"))
+        return max(1, self.textbox.winfo_height() // line_height)
+    
+    def set_issues_only(self, issues_only):
+        """Switch between the full log and warnings/errors only."""
+        self.issues_only = issues_only
+        self.follow_tail = True
+        self.refresh()
+    
+    def refresh(self):
+        """Schedule a redraw (several calls within REFRESH_MS collapse into one)."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after(self.REFRESH_MS, self._redraw)
+    
+    def _redraw(self):
+        self._redraw_pending = False
+        source = self._source()
+        total = len(source)
+        visible = self._visible_count()
+        max_first = max(0, total - visible)
+        if self.follow_tail:
+            self.first_line = max_first
+        self.first_line = min(max(0, self.first_line), max_first)
+        
+        lines = itertools.islice(source, self.first_line, self.first_line + visible)
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", "\n".join(lines))
+        self.textbox.configure(state="disabled")
+        
+        if total:
+            self.scrollbar.set(self.first_line / total, min(1.0, (self.first_line + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _scroll_to(self, first_line):
+        total = len(self._source())
+        max_first = max(0, total - self._visible_count())
+        self.first_line = min(max(0, first_line), max_first)
+        self.follow_tail = self.first_line >= max_first
+        self.refresh()
+    
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self._source())))
+        elif args[0] == "scroll":
+            step = self._visible_count() if args[2] == "pages" else 1
+            self._scroll_to(self.first_line + int(args[1]) * step)
+    
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._scroll_to(self.first_line - 3)
+        else:
+            self._scroll_to(self.first_line + 3)
+        return "break"
+
+
 class FileSorterGUI:
-    def __init__(self):
+    # Directory where the full log of every sorting run is saved
+    LOG_DIR = os.path.join(os.path.expanduser("~"), ".file_sorter", "logs")
+    # Journal of the last sort, used to resume an interrupted sort or undo it
+    JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".file_sorter", "journal.jsonl")
+    # Rule file used by the By Rules method when it exists; otherwise one is asked for
+    RULES_PATH = os.path.join(os.path.expanduser("~"), ".file_sorter", "rules.toml")
+    # Milliseconds worker-thread updates are collected before the GUI shows them
+    UPDATE_INTERVAL_MS = 50
+    # Status shown while a preview waits for its scan
+    PREVIEW_WAIT_TEXT = "Preview opens when counting has finished..."
+    
+    def __init__(self, max_log_lines=5000):
         self.root = ctk.CTk()
         self.root.title("File Sorter")
         self.root.geometry("900x800")
         self.root.resizable(True, True)
+        # Log messages and progress events reach the GUI thread in batches
+        self.updates = UpdateQueue(
+            lambda drain: self.root.after(self.UPDATE_INTERVAL_MS, drain),
+            self._update_progress_gui,
+            self._update_progress_event_gui
+        )
         
-        # Initialize the sorting app
-        self.sorter = FileSorterApp(progress_callback=self.update_progress)
+        # Initialize the sorting app. Per-file progress arrives as throttled
+        # events, so the text log only receives phase messages and warnings.
+        # Counting, preview and sorting share one scan through the scan cache.
+        self.sorter = FileSorterApp(
+            progress_callback=self.update_progress,
+            event_callback=self.update_progress_event,
+            max_event_rate=20,
+            log_each_file=False,
+            journal_path=self.JOURNAL_PATH,
+            scan_cache=ScanCache()
+        )
         self.is_sorting = False
+        self.cancel_token = None
+        # Background file count: its thread, its cancellation token, and
+        # whether a preview is waiting for it to finish
+        self.count_thread = None
+        self.count_token = None
+        self.preview_pending = False
+        self.rules_path = None
+        # Watch mode: the FolderWatcher and the thread running it
+        self.watcher = None
+        self.watch_thread = None
+        self.log_buffer = LogBuffer(max_lines=max_log_lines)
         
         # Create the GUI elements
         self.create_widgets()
         
+        # Offer to finish a sort that was interrupted last time
+        self.root.after(500, self.check_interrupted_sort)
+        
     def create_widgets(self):
         """Create and arrange all GUI widgets."""
         
@@ -130,7 +406,16 @@ class FileSorterGUI:
             font=ctk.CTkFont(size=12),
             text_color="gray"
         )
-        self.file_count_label.pack(pady=5)
+        self.file_count_label.pack(side="left", padx=(15, 5), pady=5, expand=True)
+        
+        self.refresh_button = ctk.CTkButton(
+            info_frame,
+            text="Refresh",
+            command=self.refresh_file_count,
+            width=80,
+            height=28
+        )
+        self.refresh_button.pack(side="right", padx=(5, 15), pady=5)
         
         # Control buttons frame
         button_frame = ctk.CTkFrame(main_frame)
@@ -159,6 +444,48 @@ class FileSorterGUI:
         )
         self.sort_button.pack(side="left", padx=(10, 0))
         
+        self.pause_button = ctk.CTkButton(
+            buttons_container,
+            text="Pause",
+            command=self.toggle_pause,
+            width=100,
+            height=40,
+            font=ctk.CTkFont(size=14),
+            state="disabled"
+        )
+        self.pause_button.pack(side="left", padx=(10, 0))
+        
+        self.cancel_button = ctk.CTkButton(
+            buttons_container,
+            text="Cancel",
+            command=self.cancel_sorting,
+            width=100,
+            height=40,
+            font=ctk.CTkFont(size=14),
+            state="disabled"
+        )
+        self.cancel_button.pack(side="left", padx=(10, 0))
+        
+        self.undo_button = ctk.CTkButton(
+            buttons_container,
+            text="Undo Last Sort",
+            command=self.undo_last_sort,
+            width=150,
+            height=40,
+            font=ctk.CTkFont(size=14)
+        )
+        self.undo_button.pack(side="left", padx=(20, 0))
+        
+        self.watch_var = tk.BooleanVar(value=False)
+        self.watch_switch = ctk.CTkSwitch(
+            buttons_container,
+            text="Watch folder",
+            variable=self.watch_var,
+            command=self.toggle_watch,
+            font=ctk.CTkFont(size=14)
+        )
+        self.watch_switch.pack(side="left", padx=(20, 0))
+        
         # Progress section (give it more space)
         progress_frame = ctk.CTkFrame(main_frame)
         progress_frame.pack(padx=20, pady=(0, 10), fill="both", expand=True)
@@ -175,14 +502,23 @@ class FileSorterGUI:
         self.progress_bar.pack(padx=20, pady=(5, 10))
         self.progress_bar.set(0)
         
-        # Progress text area
-        self.progress_text = ctk.CTkTextbox(
+        # Log filter
+        self.log_filter = ctk.CTkSegmentedButton(
             progress_frame,
-            height=500,
+            values=["All", "Warnings & Errors"],
+            command=lambda value: self.progress_view.set_issues_only(value != "All")
+        )
+        self.log_filter.set("All")
+        self.log_filter.pack(padx=20, pady=(0, 5), anchor="e")
+        
+        # Progress log (bounded, renders only the visible lines)
+        self.progress_view = VirtualLogView(
+            progress_frame,
+            self.log_buffer,
             font=ctk.CTkFont(size=11),
-            wrap="word"
+            height=500
         )
-        self.progress_text.pack(padx=20, pady=(0, 10), fill="both", expand=True)
+        self.progress_view.pack(padx=20, pady=(0, 10), fill="both", expand=True)
         
         # Status bar
         self.status_label = ctk.CTkLabel(
@@ -203,34 +539,101 @@ class FileSorterGUI:
         if folder_path:
             self.folder_path_var.set(folder_path)
             self.update_file_count()
-            self.progress_text.delete("1.0", "end")
-            self.progress_text.insert("1.0", f"Selected folder: {folder_path}\n")
+            self.log_buffer.clear()
+            self.log_buffer.append(f"Selected folder: {folder_path}")
+            self.progress_view.refresh()
             self.status_label.configure(text=f"Selected: {os.path.basename(folder_path)}")
             
-    def update_file_count(self):
-        """Update the file count display."""
+    def update_file_count(self, refresh=False):
+        """
+        Count the files of the selected folder on a background thread.
+        
+        The count updates live while the folder is walked. The scan ends up in
+        the sorter's scan cache, so preview and sort do not walk it again.
+        """
+        if self.count_token is not None:
+            self.count_token.cancel()
+            self.count_token = None
+            self.count_thread = None
+        
         folder_path = self.folder_path_var.get()
-        if folder_path and os.path.exists(folder_path):
-            try:
-                file_list = self.sorter.scan_files(folder_path)
-                count = len(file_list)
-                self.file_count_label.configure(
-                    text=f"Found {count} files in selected folder",
-                    text_color="white" if count > 0 else "gray"
-                )
-            except Exception as e:
-                self.file_count_label.configure(
-                    text=f"Error reading folder: {str(e)}",
-                    text_color="red"
-                )
-        else:
+        if not folder_path or not os.path.exists(folder_path):
+            self.preview_pending = False
             self.file_count_label.configure(
                 text="Select a folder to see file count",
                 text_color="gray"
             )
+            return
+        
+        self.file_count_label.configure(text="Counting files...", text_color="gray")
+        token = CancellationToken()
+        # A separate FileSorterApp, so the count has its own token and events
+        # while it shares the sorter's scan cache
+        counter = FileSorterApp(
+            progress_callback=self.update_progress,
+            event_callback=lambda event: self.root.after(0, self._update_count_gui, token, event.files_done),
+            max_event_rate=10,
+            log_each_file=False,
+            scan_cache=self.sorter.scan_cache
+        )
+        counter.cancel_token = token
+        
+        def count_files():
+            try:
+                file_list = counter.scan_files(folder_path, compact=True, refresh=refresh)
+                self.root.after(0, self._count_finished, token, folder_path, file_list, None)
+            except Exception as e:
+                self.root.after(0, self._count_finished, token, folder_path, None, str(e))
+        
+        self.count_token = token
+        self.count_thread = threading.Thread(target=count_files, daemon=True)
+        self.count_thread.start()
+    
+    def refresh_file_count(self):
+        """Discard the cached scan and count the selected folder again."""
+        if self.is_sorting or self.watcher is not None:
+            return
+        self.update_file_count(refresh=True)
+    
+    def _update_count_gui(self, token, count):
+        """Show the running count (runs in main thread)."""
+        if token is self.count_token:
+            self.file_count_label.configure(text=f"Counting files... {count} found so far", text_color="gray")
+    
+    def _count_finished(self, token, folder_path, file_list, error):
+        """Show the final count and open a preview that was waiting for it (runs in main thread)."""
+        if token is not self.count_token:
+            return
+        self.count_token = None
+        self.count_thread = None
+        if self.preview_pending and self.status_label.cget("text") == self.PREVIEW_WAIT_TEXT:
+            self.status_label.configure(text="Ready")
+        if error is not None:
+            self.preview_pending = False
+            self.file_count_label.configure(
+                text=f"Error reading folder: {error}",
+                text_color="red"
+            )
+            return
+        count = len(file_list)
+        self.file_count_label.configure(
+            text=f"Found {count} files in selected folder",
+            text_color="white" if count > 0 else "gray"
+        )
+        if self.preview_pending:
+            self.preview_pending = False
+            self._show_preview(folder_path, file_list)
     
     def preview_files(self):
-        """Preview files that will be sorted."""
+        """
+        Preview files that will be sorted.
+        
+        The folder is scanned by the background count (from the scan cache
+        if it is still valid), and the preview opens once the count is done,
+        so the window never waits on the filesystem.
+        """
+        if self.watcher is not None:
+            return
         folder_path = self.folder_path_var.get()
         if not folder_path:
             messagebox.showwarning("No Folder", "Please select a folder first.")
@@ -240,8 +643,15 @@ class FileSorterGUI:
             messagebox.showerror("Invalid Folder", "Selected folder is not valid or accessible.")
             return
         
+        # Open the preview from the count's scan once it is done
+        self.preview_pending = True
+        self.status_label.configure(text=self.PREVIEW_WAIT_TEXT)
+        if self.count_thread is None:
+            self.update_file_count()
+    
+    def _show_preview(self, folder_path, file_list):
+        """Open the preview window for a finished scan (runs in main thread)."""
         try:
-            file_list = self.sorter.scan_files(folder_path)
             if not file_list:
                 messagebox.showinfo("No Files", "No files found in the selected folder.")
                 return
@@ -282,11 +692,147 @@ class FileSorterGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Error previewing files: {str(e)}")
     
+    def toggle_watch(self):
+        """
+        Start or stop keeping the selected folder sorted as files arrive.
+        
+        The watcher runs on its own FileSorterApp and thread. Controls that
+        scan or move files stay disabled until that thread has stopped.
+        """
+        if not self.watch_var.get():
+            if self.watcher is not None:
+                self.watcher.stop()
+                self.watch_switch.configure(state="disabled")
+                self.status_label.configure(text="Stopping watch...")
+                self._wait_for_watcher()
+            return
+        
+        folder_path = self.folder_path_var.get()
+        if self.is_sorting or not folder_path or not os.path.isdir(folder_path):
+            self.watch_var.set(False)
+            messagebox.showwarning("Watch Folder", "Please select a valid folder and wait for any sort to finish.")
+            return
+        
+        if not self.load_rules():
+            self.watch_var.set(False)
+            return
+        
+        from watcher import FolderWatcher
+        # Its own sorter, so watch batches never share scan state or a
+        # cancellation token with the GUI's sorter. Each batch is journaled as
+        # a run of its own, so Undo Last Sort undoes the last batch only.
+        watch_sorter = FileSorterApp(
+            progress_callback=self.update_progress,
+            log_each_file=False,
+            journal_path=self.JOURNAL_PATH,
+            scan_cache=self.sorter.scan_cache
+        )
+        watch_sorter.rules = self.sorter.rules
+        if self.count_token is not None:
+            self.count_token.cancel()
+        self.preview_pending = False
+        self.watcher = FolderWatcher(watch_sorter, folder_path, self.method_var.get())
+        self.sort_button.configure(state="disabled")
+        self.undo_button.configure(state="disabled")
+        self.browse_button.configure(state="disabled")
+        self.preview_button.configure(state="disabled")
+        self.refresh_button.configure(state="disabled")
+        self.method_dropdown.configure(state="disabled")
+        self.status_label.configure(text=f"Watching: {os.path.basename(folder_path)}")
+        self.watch_thread = threading.Thread(target=self.watcher.run, daemon=True)
+        self.watch_thread.start()
+    
+    def _wait_for_watcher(self):
+        """Re-enable the controls once the watch thread has stopped (runs in main thread)."""
+        if self.watch_thread is not None and self.watch_thread.is_alive():
+            self.root.after(100, self._wait_for_watcher)
+            return
+        self.watcher = None
+        self.watch_thread = None
+        # Watch batches moved files the cached scan still lists
+        self.sorter.scan_cache.invalidate()
+        self.sort_button.configure(state="normal")
+        self.undo_button.configure(state="normal")
+        self.browse_button.configure(state="normal")
+        self.preview_button.configure(state="normal")
+        self.refresh_button.configure(state="normal")
+        self.method_dropdown.configure(state="normal")
+        self.watch_switch.configure(state="normal")
+        self.status_label.configure(text="Ready")
+        self.update_file_count()
+    
+    def check_interrupted_sort(self):
+        """Ask whether to resume if the journal shows an unfinished sort."""
+        run = self.sorter.journal.read()
+        if run is None or run.complete:
+            return
+        if messagebox.askyesno(
+            "Resume Sorting",
+            f"A previous {'watch batch in' if run.kind == 'watch' else 'sort of'}:\n{run.plan['root']}"
+            f"\n\nwas interrupted. Finish it now?",
+            icon="question"
+        ):
+            self.start_journal_operation(self.sorter.resume, "Resuming...")
+    
+    def undo_last_sort(self):
+        """Move the files of the last sort back where they came from."""
+        if self.is_sorting or self.watcher is not None:
+            messagebox.showinfo("Busy", "Please wait for the current operation to finish.")
+            return
+        
+        run = self.sorter.journal.read()
+        if run is None or not run.done:
+            messagebox.showinfo("Undo", "There is no sort to undo.")
+            return
+        
+        if run.kind == 'watch':
+            # Watch mode journals every batch separately
+            what = "sorted in the last batch of watch mode"
+        else:
+            what = "in"
+        if messagebox.askyesno(
+            "Confirm Undo",
+            f"Move {len(run.done)} files {what}:\n{run.plan['root']}\n\nback to where they were?",
+            icon="question"
+        ):
+            self.start_journal_operation(self.sorter.undo, "Undoing...")
+    
+    def start_journal_operation(self, operation, button_text):
+        """Run resume or undo in a separate thread, like a sort."""
+        self.is_sorting = True
+        self.start_run_controls()
+        self.sort_button.configure(text=button_text, state="disabled")
+        self.undo_button.configure(state="disabled")
+        self.browse_button.configure(state="disabled")
+        self.preview_button.configure(state="disabled")
+        self.method_dropdown.configure(state="disabled")
+        
+        self.log_buffer.clear()
+        self.log_buffer.open_log_file(os.path.join(
+            self.LOG_DIR,
+            time.strftime("sort_%Y%m%d_%H%M%S.log")
+        ))
+        self.progress_view.refresh()
+        self.progress_bar.set(0)
+        
+        cancel_token = self.cancel_token
+        
+        def run_operation():
+            try:
+                self.root.after(0, self.sorting_complete, operation(cancel_token=cancel_token))
+            except Exception as e:
+                self.root.after(0, self.sorting_error, str(e))
+        
+        threading.Thread(target=run_operation, daemon=True).start()
+    
     def start_sorting(self):
         """Start the file sorting process in a separate thread."""
         if self.is_sorting:
             messagebox.showinfo("Already Sorting", "Sorting is already in progress.")
             return
+        if self.watcher is not None:
+            messagebox.showinfo("Watching", "Stop watching the folder before sorting it.")
+            return
         
         folder_path = self.folder_path_var.get()
         if not folder_path:
@@ -294,6 +840,8 @@ class FileSorterGUI:
             return
             
         method = self.method_var.get()
+        if not self.load_rules():
+            return
         
         # Confirm action
         result = messagebox.askyesno(
@@ -305,27 +853,103 @@ class FileSorterGUI:
         if result:
             # Disable buttons during sorting
             self.is_sorting = True
+            self.start_run_controls()
             self.sort_button.configure(text="Sorting...", state="disabled")
+            self.undo_button.configure(state="disabled")
             self.browse_button.configure(state="disabled")
             self.preview_button.configure(state="disabled")
             self.method_dropdown.configure(state="disabled")
             
-            # Clear progress
-            self.progress_text.delete("1.0", "end")
+            # Clear progress and save this run's log to disk
+            self.log_buffer.clear()
+            self.log_buffer.open_log_file(os.path.join(
+                self.LOG_DIR,
+                time.strftime("sort_%Y%m%d_%H%M%S.log")
+            ))
+            self.progress_view.refresh()
             self.progress_bar.set(0)
             
             # Start sorting in a separate thread
+            self.preview_pending = False
             thread = threading.Thread(
                 target=self.sort_files_thread,
-                args=(folder_path, method),
+                args=(folder_path, method, self.cancel_token, self.count_thread),
                 daemon=True
             )
             thread.start()
     
-    def sort_files_thread(self, folder_path, method):
+    def load_rules(self):
+        """
+        Load the rule file when the selected method sorts by rules.
+        
+        The file is read again before every run, so edits to it take effect.
+        Returns False if no valid rule file was loaded.
+        """
+        methods = FileSorterApp.split_sorting_method(self.method_var.get())
+        if all(FileSorterApp.SORTING_METHODS[method] != 'sort_by_rules' for method in methods):
+            return True
+        
+        rules_path = self.rules_path
+        if rules_path is None and os.path.isfile(self.RULES_PATH):
+            rules_path = self.RULES_PATH
+        if rules_path is None:
+            rules_path = filedialog.askopenfilename(
+                title="Select Rule File",
+                filetypes=[("Rule files", "*.toml *.json"), ("All files", "*.*")]
+            )
+        if not rules_path:
+            return False
+        
+        from rules import RuleSet
+        try:
+            self.sorter.rules = RuleSet.load(rules_path)
+        except (OSError, ValueError) as e:
+            self.rules_path = None
+            messagebox.showerror("Invalid Rules", f"Could not load rules from {rules_path}:\n{e}")
+            return False
+        self.rules_path = rules_path
+        return True
+    
+    def start_run_controls(self):
+        """Create the cancellation token of a new run and enable Pause and Cancel."""
+        self.cancel_token = CancellationToken()
+        self.pause_button.configure(text="Pause", state="normal")
+        self.cancel_button.configure(state="normal")
+    
+    def stop_run_controls(self):
+        """Disable Pause and Cancel once a run has ended."""
+        self.pause_button.configure(text="Pause", state="disabled")
+        self.cancel_button.configure(state="disabled")
+    
+    def toggle_pause(self):
+        """Pause the running sort at its next checkpoint, or let it continue."""
+        if self.cancel_token is None:
+            return
+        if self.cancel_token.paused:
+            self.cancel_token.resume()
+            self.pause_button.configure(text="Pause")
+            self.status_label.configure(text="Continuing...")
+        else:
+            self.cancel_token.pause()
+            self.pause_button.configure(text="Resume")
+            self.status_label.configure(text="Paused")
+    
+    def cancel_sorting(self):
+        """Stop the running sort at its next checkpoint."""
+        if self.cancel_token is None:
+            return
+        self.cancel_token.cancel()
+        self.pause_button.configure(text="Pause", state="disabled")
+        self.cancel_button.configure(state="disabled")
+        self.status_label.configure(text="Cancelling...")
+    
+    def sort_files_thread(self, folder_path, method, cancel_token=None, count_thread=None):
         """Run sorting in a separate thread to prevent GUI freezing."""
         try:
-            success = self.sorter.sort_files(folder_path, method)
+            if count_thread is not None:
+                # Let a running count finish, so the sort reuses its scan
+                count_thread.join()
+            success = self.sorter.sort_files(folder_path, method, cancel_token=cancel_token)
             
             # Update GUI in main thread
             self.root.after(0, self.sorting_complete, success)
@@ -336,14 +960,22 @@ class FileSorterGUI:
     def sorting_complete(self, success):
         """Handle sorting completion."""
         self.is_sorting = False
+        self.stop_run_controls()
+        self.log_buffer.append(f"Full log saved to: {self.log_buffer.log_path}")
+        self.progress_view.refresh()
+        self.log_buffer.close_log_file()
         
         # Re-enable buttons
         self.sort_button.configure(text="Start Sorting", state="normal")
+        self.undo_button.configure(state="normal")
         self.browse_button.configure(state="normal")
         self.preview_button.configure(state="normal")
         self.method_dropdown.configure(state="normal")
         
-        if success:
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            self.status_label.configure(text="Sorting cancelled")
+            messagebox.showinfo("Cancelled", "Sorting was cancelled. Files moved so far stay in their new folders.")
+        elif success:
             self.progress_bar.set(1.0)
             self.status_label.configure(text="Sorting completed successfully!")
             messagebox.showinfo("Success", "Files have been sorted successfully!")
@@ -357,9 +989,12 @@ class FileSorterGUI:
     def sorting_error(self, error_message):
         """Handle sorting errors."""
         self.is_sorting = False
+        self.stop_run_controls()
+        self.log_buffer.close_log_file()
         
         # Re-enable buttons
         self.sort_button.configure(text="Start Sorting", state="normal")
+        self.undo_button.configure(state="normal")
         self.browse_button.configure(state="normal")
         self.preview_button.configure(state="normal")
         self.method_dropdown.configure(state="normal")
@@ -369,25 +1004,15 @@ class FileSorterGUI:
     
     def update_progress(self, message):
         """Update progress display (called from FileSorterApp)."""
-        # This method is called from the sorting thread, so we need to use after()
-        self.root.after(0, self._update_progress_gui, message)
+        # Called from worker threads; batched with progress events, so a burst
+        # of messages costs one after() call
+        self.updates.put_message(message)
     
     def _update_progress_gui(self, message):
         """Update progress GUI elements (runs in main thread)."""
-        # Add message to progress text
-        self.progress_text.insert("end", message + "\n")
-        self.progress_text.see("end")  # Scroll to bottom
-        
-        # Update progress bar based on message content
-        if "Progress:" in message:
-            try:
-                # Extract progress numbers (e.g., "Progress: 5/20")
-                progress_part = message.split("Progress:")[1].split("-")[0].strip()
-                current, total = map(int, progress_part.split("/"))
-                progress_value = current / total
-                self.progress_bar.set(progress_value)
-            except (ValueError, IndexError):
-                pass  # Ignore if can't parse progress
+        # Add message to the log; the view redraws at most once per refresh interval
+        self.log_buffer.append(message)
+        self.progress_view.refresh()
         
         # Update status
         if "Error:" in message or "Warning:" in message:
@@ -399,6 +1024,27 @@ class FileSorterGUI:
         elif "Deleting empty folders" in message:
             self.status_label.configure(text="Cleaning up...")
     
+    def update_progress_event(self, event):
+        """Update progress bar from a ProgressEvent (called from FileSorterApp)."""
+        # Throttled by FileSorterApp, and batched with the text messages
+        self.updates.put_event(event)
+    
+    def _update_progress_event_gui(self, event):
+        """Update progress bar and status from a ProgressEvent (runs in main thread)."""
+        if event.phase == "scan":
+            self.status_label.configure(text=f"Scanning files... {event.files_done} found")
+        elif event.phase == "move":
+            if event.files_total:
+                self.progress_bar.set(event.files_done / event.files_total)
+                self.status_label.configure(
+                    text=f"Moving files... {event.files_done}/{event.files_total} "
+                         f"({event.bytes_done / (1024 * 1024):.1f} MB)"
+                )
+            else:
+                self.status_label.configure(text=f"Moving files... {event.files_done} moved")
+        elif event.phase == "cleanup":
+            self.status_label.configure(text="Cleaning up...")
+    
     def run(self):
         """Start the GUI application."""
         self.root.mainloop()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Move Journal
+
+Append-only, crash-safe record of a sorting run: the full plan is written
+(and fsynced) before the first file moves, then one line per finished move.
+Move records are fsynced in batches, so a crash can lose the last few of
+them; FileSorterApp.resume recognizes those moves by their source being gone
+and their destination being present.
+
+Each line is a JSON object:
+    {"event": "plan", "kind": "sort", "plan": {...}}
+    {"event": "done", "index": 12}
+    {"event": "failed", "index": 13}
+    {"event": "complete"}
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import json
+import time
+from typing import Dict, Optional, Set, NamedTuple
+
+
+class JournalRun(NamedTuple):
+    """The last run recorded in a journal."""
+    kind: str
+    plan: Dict
+    done: Set[int]
+    failed: Set[int]
+    complete: bool
+
+
+class MoveJournal:
+    """
+    Writes and reads a move journal file.
+
+    A new sort replaces the journal; resuming or undoing appends to it, so the
+    file always describes the most recent sort and what happened since. Watch
+    mode journals each batch as a sort of its own (kind 'watch').
+    """
+
+    def __init__(self, path: str, sync_interval: float = 0.5, sync_every: int = 1024):
+        """
+        Args:
+            path: Journal file path
+            sync_interval: Maximum seconds between fsyncs while moving
+            sync_every: Maximum number of move records between fsyncs
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.sync_every = sync_every
+        self._file = None
+        self._pending = 0
+        self._last_sync = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Whether a run is currently being recorded."""
+        return self._file is not None
+
+    def _open(self, mode: str):
+        """Open the journal file for writing."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, mode, encoding='utf-8')
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _write(self, record: Dict):
+        """Append one record without syncing."""
+        self._file.write(json.dumps(record) + '\n')
+
+    def sync(self):
+        """Flush buffered records and fsync them to disk."""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def begin(self, plan_json: str, kind: str = 'sort'):
+        """
+        Start recording a run; returns once the plan is on disk.
+
+        Args:
+            plan_json: The run's MovePlan, serialized with MovePlan.to_json
+            kind: 'undo' is appended after the previous run; anything else
+                ('sort', or 'watch' for a batch sorted by watch mode)
+                replaces the journal
+        """
+        self.close()
+        self._open('a' if kind == 'undo' else 'w')
+        self._file.write(f'{{"event": "plan", "kind": {json.dumps(kind)}, "plan": {plan_json}}}\n')
+        self.sync()
+
+    def reopen(self):
+        """Continue recording the last run in the journal (used when resuming)."""
+        self.close()
+        self._open('a')
+
+    def record(self, index: int, error: Optional[str] = None):
+        """Record that the move with this record index finished (or failed)."""
+        if self._file is None:
+            return
+        self._write({'event': 'failed' if error else 'done', 'index': index})
+        self._pending += 1
+        if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def finish(self):
+        """Mark the run as complete and close the file."""
+        if self._file is None:
+            return
+        self._write({'event': 'complete'})
+        self.sync()
+        self.close()
+
+    def close(self):
+        """Sync and close the file without marking the run complete."""
+        if self._file is None:
+            return
+        try:
+            self.sync()
+        finally:
+            self._file.close()
+            self._file = None
+
+    def read(self) -> Optional[JournalRun]:
+        """
+        Return the last run in the journal, or None if there is none.
+
+        A partly written last line (from a crash) is ignored.
+        """
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        run = None
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                event = record.get('event')
+                if event == 'plan':
+                    run = JournalRun(record['kind'], record['plan'], set(), set(), False)
+                elif run is None:
+                    continue
+                elif event == 'done':
+                    run.done.add(record['index'])
+                elif event == 'failed':
+                    run.failed.add(record['index'])
+                elif event == 'complete':
+                    run = run._replace(complete=True)
+        return run
@@ -12,15 +12,1062 @@ License: MIT
 """
 
 import os
+import errno
+import hashlib
 import time
 import re
-from pathlib import Path
+import json
+import stat
+import fnmatch
 import shutil
-from typing import List, Dict, Callable, Optional, Tuple
+import sys
+import queue
+import bisect
+import threading
+from array import array
+from datetime import date, datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Callable, Optional, Tuple, Set, Iterator, Iterable, Union, NamedTuple
+
+from metrics import SortMetrics
+
+# Chunk size for cross-device copies
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# MoveResult error of planned moves that were not attempted because the sort stopped
+SKIPPED_MOVE = 'Skipped: sorting was stopped'
+
+# Final log message for each CancellationToken stop reason
+STOP_MESSAGES = {
+    'cancelled': 'Sorting operation cancelled.',
+    'time_budget': 'Time budget reached; the remaining files are left for the next run.',
+    'file_budget': 'File budget reached; the remaining files are left for the next run.',
+}
+
+
+def _copy_file_data(src, dst, size: int):
+    """
+    Copy file contents between two open files, in the kernel where possible.
+    
+    Tries os.copy_file_range, then os.sendfile, then a large-buffer userspace
+    copy. Each method falls through to the next if the platform or filesystem
+    rejects it before any data has been copied.
+    """
+    src_fd = src.fileno()
+    dst_fd = dst.fileno()
+    offset = 0
+    
+    for name in ('copy_file_range', 'sendfile'):
+        copy_func = getattr(os, name, None)
+        if copy_func is None:
+            continue
+        try:
+            while offset < size:
+                if name == 'copy_file_range':
+                    copied = copy_func(src_fd, dst_fd, COPY_CHUNK_SIZE)
+                else:
+                    copied = copy_func(dst_fd, src_fd, offset, COPY_CHUNK_SIZE)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError as e:
+            if offset or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                         errno.EOPNOTSUPP, errno.ENOTSOCK, errno.EBADF):
+                raise
+            continue
+        # A method that copies nothing from a non-empty file is treated as unsupported
+        if offset or not size:
+            return
+    
+    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+
+# renameat2() flag that makes the rename fail with EEXIST instead of replacing
+_RENAME_NOREPLACE = 1
+_AT_FDCWD = -100
+_renameat2 = None
+
+
+def _load_renameat2():
+    """Return libc's renameat2 (Linux, glibc 2.28+), or False where it is missing."""
+    global _renameat2
+    if _renameat2 is None:
+        _renameat2 = False
+        if sys.platform.startswith('linux'):
+            try:
+                import ctypes
+                function = ctypes.CDLL(None, use_errno=True).renameat2
+                function.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint)
+                function.restype = ctypes.c_int
+                _renameat2 = function
+            except (OSError, AttributeError):
+                pass
+    return _renameat2
+
+
+def _rename_noreplace(source: str, destination: str):
+    """
+    Rename a file, raising FileExistsError instead of replacing the destination.
+    
+    On Windows os.rename never replaces. On Linux renameat2 with
+    RENAME_NOREPLACE checks and renames atomically; on filesystems without it,
+    and on other systems, the destination is checked just before the rename.
+    """
+    if os.name != 'nt':
+        renameat2 = _load_renameat2()
+        if renameat2:
+            import ctypes
+            if renameat2(_AT_FDCWD, os.fsencode(source), _AT_FDCWD, os.fsencode(destination),
+                         _RENAME_NOREPLACE) == 0:
+                return
+            error = ctypes.get_errno()
+            if error not in (errno.EINVAL, errno.ENOSYS, errno.ENOTSUP):
+                raise OSError(error, os.strerror(error), source, None, destination)
+        if os.path.lexists(destination):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination)
+    os.rename(source, destination)
+
+
+def _free_name(filename: str, taken: Set[str]) -> str:
+    """
+    Return the first of "name (1).ext", "name (2).ext", ... not in taken.
+    
+    Args:
+        filename: Name that is taken
+        taken: os.path.normcase names already used in the folder
+    """
+    stem, extension = os.path.splitext(filename)
+    number = 1
+    while True:
+        candidate = f'{stem} ({number}){extension}'
+        if os.path.normcase(candidate) not in taken:
+            return candidate
+        number += 1
+
+
+def _create_temp_link(source: str, path: str, suffix: str = '.link') -> str:
+    """
+    Hard link source under a new name next to path and return that name.
+    
+    The name gets a random part, drawn again while it is taken, so an
+    existing file is never touched.
+    """
+    while True:
+        temp_path = f'{path}.{os.urandom(4).hex()}{suffix}'
+        try:
+            os.link(source, temp_path)
+            return temp_path
+        except FileExistsError:
+            continue
+
+
+def _unlink_quietly(path: str):
+    """Remove a file if it can be removed."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _create_temp_file(path: str, suffix: str = '.partial'):
+    """
+    Create and open (for binary writing) a new file next to path.
+    
+    Like _create_temp_link, the name gets a random part drawn again while it
+    is taken. Returns (temporary path, open file).
+    """
+    while True:
+        temp_path = f'{path}.{os.urandom(4).hex()}{suffix}'
+        try:
+            return temp_path, open(temp_path, 'xb')
+        except FileExistsError:
+            continue
+
+
+def _file_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DateBucketer:
+    """
+    Maps timestamps to date folder names with a cache of period boundaries.
+    
+    The first timestamp that falls into a new period (year, month, ISO week or
+    day, in local time) computes that period's start, end and folder name once.
+    After that a timestamp costs a range check against the last period used,
+    or a binary search over the known period starts.
+    """
+    
+    GRANULARITIES = ('year', 'month', 'week', 'day')
+    LAYOUTS = ('flat', 'nested')
+    MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+    
+    def __init__(self, granularity: str = 'month', layout: str = 'flat'):
+        """
+        Args:
+            granularity: One of GRANULARITIES
+            layout: 'flat' for single folders (Oct_2026, 2026-W42, 2026-10-16) or
+                'nested' for one folder level per unit (2026/10, 2026/W42, 2026/10/16)
+        """
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f'Invalid date granularity "{granularity}"')
+        if layout not in self.LAYOUTS:
+            raise ValueError(f'Invalid date layout "{layout}"')
+        self.granularity = granularity
+        self.layout = layout
+        self._starts = []
+        self._ends = []
+        self._labels = []
+        self._last = (0.0, 0.0, '')
+    
+    def _period(self, timestamp: float) -> Tuple[float, float, str]:
+        """Compute (start, end, folder name) of the period containing a timestamp."""
+        day = datetime.fromtimestamp(timestamp).date()
+        nested = self.layout == 'nested'
+        if self.granularity == 'year':
+            start, end = date(day.year, 1, 1), date(day.year + 1, 1, 1)
+            label = str(day.year)
+        elif self.granularity == 'month':
+            start = date(day.year, day.month, 1)
+            end = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+            if nested:
+                label = os.path.join(str(day.year), f'{day.month:02d}')
+            else:
+                label = f'{self.MONTH_NAMES[day.month - 1]}_{day.year}'
+        elif self.granularity == 'week':
+            iso_year, iso_week, iso_weekday = day.isocalendar()
+            start = day - timedelta(days=iso_weekday - 1)
+            end = start + timedelta(days=7)
+            if nested:
+                label = os.path.join(str(iso_year), f'W{iso_week:02d}')
+            else:
+                label = f'{iso_year}-W{iso_week:02d}'
+        else:
+            start, end = day, day + timedelta(days=1)
+            if nested:
+                label = os.path.join(str(day.year), f'{day.month:02d}', f'{day.day:02d}')
+            else:
+                label = day.isoformat()
+        return (time.mktime(start.timetuple()), time.mktime(end.timetuple()), label)
+    
+    def bucket(self, timestamp: float) -> str:
+        """Return the folder name for a timestamp."""
+        start, end, label = self._last
+        if start <= timestamp < end:
+            return label
+        
+        index = bisect.bisect_right(self._starts, timestamp) - 1
+        if index >= 0 and timestamp < self._ends[index]:
+            self._last = (self._starts[index], self._ends[index], self._labels[index])
+            return self._labels[index]
+        
+        start, end, label = self._period(timestamp)
+        index = bisect.bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+        self._labels.insert(index, label)
+        self._last = (start, end, label)
+        return label
+
+
+class CompositeKey:
+    """
+    Key function nesting the folders of several key functions, outermost
+    first: file type, then date gives ``pdf/Oct_2026``.
+    
+    Each distinct combination of folder names is joined once, so files that
+    share a destination share one path string. A file that any of the
+    functions leaves in place (None) is left in place.
+    """
+    
+    def __init__(self, functions: Iterable[Callable[[Dict], Optional[str]]]):
+        self.functions = tuple(functions)
+        self._paths = {}
+    
+    def __call__(self, file: Dict) -> Optional[str]:
+        parts = []
+        for function in self.functions:
+            part = function(file)
+            if part is None:
+                return None
+            parts.append(part)
+        parts = tuple(parts)
+        path = self._paths.get(parts)
+        if path is None:
+            path = os.path.join(*parts)
+            self._paths[parts] = path
+        return path
+
+
+class FileRecord:
+    """
+    Lightweight view of one row in a FileRecordStore.
+    
+    Supports the same item access as the scan dictionaries (``record['size']``,
+    ``record['filepath'] = new_path``), so it can be passed anywhere a file
+    dictionary is expected. Assigning a new filepath updates the store.
+    """
+    
+    __slots__ = ('_store', '_index')
+    
+    KEYS = ('filepath', 'filename', 'modified_time', 'file_extension', 'size', 'device', 'inode',
+            'changed_time', 'birth_time')
+    
+    def __init__(self, store: 'FileRecordStore', index: int):
+        self._store = store
+        self._index = index
+    
+    def __getitem__(self, key: str):
+        store = self._store
+        index = self._index
+        if key == 'filepath':
+            return os.path.join(store._dirs[store._dir_ids[index]], store._names[index])
+        if key == 'filename':
+            return store._names[index]
+        if key == 'modified_time':
+            return store._mtimes[index]
+        if key == 'file_extension':
+            return store._exts[store._ext_ids[index]]
+        if key == 'size':
+            return store._sizes[index]
+        if key == 'device':
+            return store._devices[index]
+        if key == 'inode':
+            return store._inodes[index]
+        if key == 'changed_time':
+            return store._ctimes[index]
+        if key == 'birth_time':
+            value = store._birthtimes[index]
+            return None if value != value else value  # NaN marks "not available"
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value):
+        if key != 'filepath':
+            raise KeyError(f'{key} is read-only in a FileRecordStore')
+        store = self._store
+        directory, filename = os.path.split(value)
+        store._dir_ids[self._index] = store._intern_dir(directory)
+        store._names[self._index] = filename
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS
+    
+    def __repr__(self) -> str:
+        return f'FileRecord({self.to_dict()!r})'
+    
+    def get(self, key: str, default=None):
+        """Return a field, or default if the key is unknown."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self) -> Tuple[str, ...]:
+        """Return the available field names."""
+        return self.KEYS
+    
+    def to_dict(self) -> Dict:
+        """Return the record as a regular scan dictionary."""
+        return {key: self[key] for key in self.KEYS}
+
+
+class FileRecordStore:
+    """
+    Compact, column-oriented storage for scan results.
+    
+    Instead of one dictionary per file, numeric fields live in typed arrays and
+    directory paths and extensions are stored once and referenced by index. File
+    names are the only per-file Python objects. Indexing and iteration return
+    FileRecord views, so the store can be used wherever a list of file
+    dictionaries is accepted (all sort_by_* methods and the GUI preview).
+    
+    Measured on CPython 3.11, 64-bit Linux, for 1,000,000 records built by
+    _make_file_record from synthetic stat results (1,000 directories, 5
+    extensions, 17-character names). The figure is tracemalloc's traced
+    memory after building the list or the store, divided by the file count:
+    
+        list of dicts:     ~596 bytes per file (~596 MB)
+        FileRecordStore:   ~131 bytes per file (~131 MB)
+    
+    Most of what remains is the file name strings themselves.
+    """
+    
+    def __init__(self):
+        self._dirs = []
+        self._dir_lookup = {}
+        self._exts = []
+        self._ext_lookup = {}
+        self._dir_ids = array('I')
+        self._ext_ids = array('I')
+        self._names = []
+        self._mtimes = array('d')
+        self._sizes = array('q')
+        self._devices = array('q')
+        self._inodes = array('Q')
+        self._ctimes = array('d')
+        self._birthtimes = array('d')
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'FileRecordStore':
+        """Build a store from file dictionaries, consuming them one at a time."""
+        store = cls()
+        for record in records:
+            store.append(record)
+        return store
+    
+    def _intern_dir(self, directory: str) -> int:
+        index = self._dir_lookup.get(directory)
+        if index is None:
+            index = len(self._dirs)
+            self._dirs.append(directory)
+            self._dir_lookup[directory] = index
+        return index
+    
+    def _intern_ext(self, extension: str) -> int:
+        index = self._ext_lookup.get(extension)
+        if index is None:
+            index = len(self._exts)
+            self._exts.append(sys.intern(extension))
+            self._ext_lookup[extension] = index
+        return index
+    
+    def append(self, record: Dict):
+        """Add a file dictionary (or FileRecord) to the store."""
+        directory, filename = os.path.split(record['filepath'])
+        self._dir_ids.append(self._intern_dir(directory))
+        self._ext_ids.append(self._intern_ext(record['file_extension']))
+        self._names.append(filename)
+        self._mtimes.append(record['modified_time'])
+        self._sizes.append(record['size'])
+        self._devices.append(record.get('device', -1))
+        self._inodes.append(record.get('inode', 0))
+        self._ctimes.append(record.get('changed_time', record['modified_time']))
+        birth_time = record.get('birth_time')
+        self._birthtimes.append(float('nan') if birth_time is None else birth_time)
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[FileRecord, List[FileRecord]]:
+        if isinstance(index, slice):
+            return [FileRecord(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('FileRecordStore index out of range')
+        return FileRecord(self, index)
+    
+    def __iter__(self) -> Iterator[FileRecord]:
+        for index in range(len(self._names)):
+            yield FileRecord(self, index)
+    
+    def __bool__(self) -> bool:
+        return bool(self._names)
+    
+    def to_list(self) -> List[Dict]:
+        """Expand the store into a list of regular file dictionaries."""
+        return [record.to_dict() for record in self]
+
+
+def _is_within(path: str, folder: str) -> bool:
+    """Whether path is folder or lies below it (both absolute and normalized)."""
+    return path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+
+
+class ScanFilter:
+    """
+    Decides during a scan which directories are entered and which files are kept.
+    
+    Directories are judged from their entry in the parent's listing, before
+    they are listed themselves, so an excluded tree costs nothing but that
+    entry. Patterns are shell globs matched against entry names, or against
+    the path relative to the scanned folder when they contain a '/'. All
+    patterns of a kind are compiled into one regular expression.
+    """
+    
+    # hidden: 'include' keeps hidden files and folders, 'exclude' skips them
+    HIDDEN_POLICIES = ('include', 'exclude')
+    # symlinks: 'files' sorts symlinked files but does not enter symlinked
+    # folders (like os.walk), 'skip' ignores all symlinks, 'follow' also
+    # enters symlinked folders outside the tree, each target once
+    SYMLINK_POLICIES = ('files', 'skip', 'follow')
+    
+    # Folders that tools keep their own data in, for callers that want to skip them
+    COMMON_EXCLUDES = ('.git', '.hg', '.svn', 'node_modules', '__pycache__', '.cache',
+                       '.venv', '.tox', '.idea', '.DS_Store', 'Thumbs.db')
+    
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 max_depth: Optional[int] = None, hidden: str = 'include', symlinks: str = 'files',
+                 output_folders: Iterable[str] = (), output_pattern: Optional[str] = None):
+        """
+        Args:
+            include: Patterns a file must match to be kept (all files if empty)
+            exclude: Patterns of files and folders to skip
+            max_depth: Folder levels to descend below the scanned folder
+                (0 only scans its own files); None for no limit
+            hidden: One of HIDDEN_POLICIES
+            symlinks: One of SYMLINK_POLICIES
+            output_folders: Names of folders made by earlier sorts, skipped
+                directly below the scanned folder
+            output_pattern: Regular expression for more such folder names
+                (e.g. date folders)
+        """
+        if hidden not in self.HIDDEN_POLICIES:
+            raise ValueError(f'Invalid hidden file policy "{hidden}"')
+        if symlinks not in self.SYMLINK_POLICIES:
+            raise ValueError(f'Invalid symlink policy "{symlinks}"')
+        if max_depth is not None and max_depth < 0:
+            raise ValueError('max_depth must not be negative')
+        include = tuple(include)
+        exclude = tuple(exclude)
+        output_folders = frozenset(output_folders)
+        self.signature = repr((include, exclude, max_depth, hidden, symlinks,
+                               sorted(output_folders), output_pattern))
+        self.include_names, self.include_paths = self._compile(include)
+        self.exclude_names, self.exclude_paths = self._compile(exclude)
+        self.has_include = bool(include)
+        self.max_depth = max_depth
+        self.skip_hidden = hidden == 'exclude'
+        self.symlinks = symlinks
+        self.output_folders = output_folders
+        self.output_pattern = re.compile(output_pattern) if output_pattern else None
+        self.root = ''
+        self._prefix_length = 0
+        self._real_root = ''
+        self._followed = set()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _compile(patterns: Tuple[str, ...]) -> Tuple[Optional['re.Pattern'], Optional['re.Pattern']]:
+        """Compile name patterns and path patterns (containing '/') into one regex each."""
+        # Match case-insensitively where the filesystem usually is (Windows)
+        flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+        names = [fnmatch.translate(p) for p in patterns if '/' not in p]
+        paths = [fnmatch.translate(p.strip('/')) for p in patterns if '/' in p]
+        return (re.compile('|'.join(names), flags) if names else None,
+                re.compile('|'.join(paths), flags) if paths else None)
+    
+    @property
+    def prunes_output(self) -> bool:
+        return bool(self.output_folders or self.output_pattern)
+    
+    def start(self, root: str):
+        """Begin a scan of root; relative paths and depths are measured from it."""
+        self.root = root.rstrip(os.sep) or root
+        self._prefix_length = len(self.root if self.root.endswith(os.sep) else self.root + os.sep)
+        if self.symlinks == 'follow':
+            self._real_root = os.path.realpath(root)
+        with self._lock:
+            self._followed = set()
+    
+    def depth(self, dir_path: str) -> int:
+        """Folder level of a directory reached by the scan (the root is level 0)."""
+        if len(dir_path) <= len(self.root):
+            return 0
+        return dir_path.count(os.sep, self._prefix_length) + 1
+    
+    def _relative(self, path: str) -> str:
+        return path[self._prefix_length:].replace(os.sep, '/')
+    
+    def _excluded(self, name: str, path: str, is_dir: bool, depth: int) -> bool:
+        """Check the rules shared by directories and files; depth is the entry's level."""
+        if self.skip_hidden and name.startswith('.'):
+            return True
+        if self.exclude_names is not None and self.exclude_names.match(name):
+            return True
+        if self.exclude_paths is not None and self.exclude_paths.match(self._relative(path)):
+            return True
+        if is_dir:
+            if self.max_depth is not None and depth > self.max_depth:
+                return True
+            if depth == 1 and (name in self.output_folders or
+                               (self.output_pattern is not None and self.output_pattern.match(name))):
+                return True
+        return False
+    
+    @staticmethod
+    def _hidden_attribute(entry: os.DirEntry) -> bool:
+        """Windows hidden attribute; the stat of a DirEntry is free there."""
+        attributes = getattr(entry.stat(follow_symlinks=False), 'st_file_attributes', 0)
+        return bool(attributes & getattr(stat, 'FILE_ATTRIBUTE_HIDDEN', 0))
+    
+    def enter(self, entry: os.DirEntry, depth: int) -> bool:
+        """Whether to scan a subdirectory entry at the given level."""
+        if entry.is_symlink():
+            if self.symlinks != 'follow':
+                return False
+            try:
+                target = os.stat(entry.path)
+            except OSError:
+                return False
+            real_path = os.path.realpath(entry.path)
+            # Targets inside the tree are scanned anyway, and links to a folder
+            # containing the link would loop
+            if _is_within(real_path, self._real_root) or \
+                    _is_within(os.path.realpath(os.path.dirname(entry.path)), real_path):
+                return False
+            with self._lock:
+                key = (target.st_dev, target.st_ino)
+                if key in self._followed:
+                    return False
+                self._followed.add(key)
+        if self._excluded(entry.name, entry.path, True, depth):
+            return False
+        if self.skip_hidden and os.name == 'nt' and self._hidden_attribute(entry):
+            return False
+        return True
+    
+    def keep(self, entry: os.DirEntry) -> bool:
+        """Whether to keep a file entry."""
+        if self.symlinks == 'skip' and entry.is_symlink():
+            return False
+        if self._excluded(entry.name, entry.path, False, 0):
+            return False
+        if self.has_include:
+            if not ((self.include_names is not None and self.include_names.match(entry.name)) or
+                    (self.include_paths is not None and self.include_paths.match(self._relative(entry.path)))):
+                return False
+        if self.skip_hidden and os.name == 'nt' and self._hidden_attribute(entry):
+            return False
+        return True
+    
+    def accepts_path(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Whether a path below the root would be scanned, checking every folder
+        on the way to it. Slower than enter/keep; meant for single paths such
+        as filesystem events.
+        """
+        relative = self._relative(path)
+        if not relative:
+            return True
+        parts = relative.split('/')
+        current = self.root
+        for depth, name in enumerate(parts[:-1] if not is_dir else parts, start=1):
+            current = os.path.join(current, name)
+            if self._excluded(name, current, True, depth):
+                return False
+            if os.path.islink(current) and self.symlinks != 'follow':
+                return False
+        if is_dir:
+            return True
+        name = parts[-1]
+        if self.symlinks == 'skip' and os.path.islink(path):
+            return False
+        if self._excluded(name, path, False, 0):
+            return False
+        if self.has_include:
+            return bool((self.include_names is not None and self.include_names.match(name)) or
+                        (self.include_paths is not None and self.include_paths.match(relative)))
+        return True
+
+
+class ScanCache:
+    """
+    The last scan result, reusable until the scanned tree changes.
+    
+    Along with the records, the mtime of every directory that was listed is
+    kept. Creating, deleting or renaming a file changes the mtime of its
+    directory, so checking the cached result costs one stat per directory
+    instead of a full walk. Changes to the contents of existing files are not
+    noticed; call invalidate() (or scan with refresh=True) to force a rescan.
+    
+    One cache can be shared by several FileSorterApp instances, e.g. a
+    background file counter and the sorter itself.
+    """
+    
+    def __init__(self):
+        self._root = None
+        self._variant = ''
+        self._records = None
+        self._dir_mtimes = {}
+        self._lock = threading.Lock()
+    
+    def get(self, folder_path: str, variant: str = '') -> Optional[Union[List[Dict], 'FileRecordStore']]:
+        """
+        Return the cached records of a folder if no scanned directory has
+        changed, else None. variant tells apart scans of the same folder made
+        with different options (such as scan filters).
+        """
+        root = os.path.normpath(os.path.abspath(folder_path))
+        with self._lock:
+            if root != self._root or variant != self._variant:
+                return None
+            records = self._records
+            dir_mtimes = self._dir_mtimes
+        for directory, mtime_ns in dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime_ns:
+                    break
+            except OSError:
+                break
+        else:
+            return records
+        self.invalidate(folder_path)
+        return None
+    
+    def put(self, folder_path: str, records: Union[List[Dict], 'FileRecordStore'],
+            dir_mtimes: Dict[str, int], variant: str = ''):
+        """Replace the cached result with the scan of a folder."""
+        with self._lock:
+            self._root = os.path.normpath(os.path.abspath(folder_path))
+            self._variant = variant
+            self._records = records
+            self._dir_mtimes = dir_mtimes
+    
+    def invalidate(self, folder_path: Optional[str] = None):
+        """Drop the cached result (only if it is for folder_path, when given)."""
+        with self._lock:
+            if folder_path is None or self._root == os.path.normpath(os.path.abspath(folder_path)):
+                self._root = None
+                self._records = None
+                self._dir_mtimes = {}
+    
+    @property
+    def directory_count(self) -> int:
+        """Number of directories the cached result covers (checked on every get)."""
+        return len(self._dir_mtimes)
+
+
+class ProgressEvent(NamedTuple):
+    """Structured progress update passed to FileSorterApp's event_callback."""
+    phase: str
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    current_path: str
+
+
+class ProgressThrottle:
+    """
+    Rate limiter for progress events.
+    
+    Events arriving faster than max_rate per second are coalesced: callers ask
+    ready() before building an event, and phase changes or final states are sent
+    with force=True so the last state is never lost.
+    """
+    
+    def __init__(self, callback: Callable[[ProgressEvent], None], max_rate: float = 20.0):
+        self.callback = callback
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+    
+    def ready(self) -> bool:
+        """Return True if an event sent now would not exceed the rate limit."""
+        return time.monotonic() - self._last_emit >= self.interval
+    
+    def emit(self, event: ProgressEvent, force: bool = False):
+        """Send an event if the rate limit allows it (or force is set)."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+        self.callback(event)
+
+
+def progress_events_to_text(callback: Callable[[str], None]) -> Callable[[ProgressEvent], None]:
+    """
+    Adapt a text progress callback to receive ProgressEvents.
+    
+    Each event is rendered as a "Progress: done/total - phase path" line, which
+    is the format FileSorterGUI and older callers already understand.
+    """
+    def adapter(event: ProgressEvent):
+        if event.files_total:
+            callback(f'Progress: {event.files_done}/{event.files_total} - {event.phase} {event.current_path}'.rstrip())
+        else:
+            callback(f'Progress: {event.files_done} - {event.phase} {event.current_path}'.rstrip())
+    return adapter
+
+
+class CancellationToken:
+    """
+    Stops or pauses a running sort from another thread, and bounds how much it does.
+    
+    The scan, move and cleanup loops call checkpoint() between directories,
+    move batches and folders. checkpoint() blocks while the token is paused and
+    returns False once the sort should stop: after cancel(), once the time
+    budget has run out, or once the file budget has been used up. Work that
+    was not done is left for the next run.
+    """
+    
+    # Values of stop_reason
+    CANCELLED = 'cancelled'
+    TIME_BUDGET = 'time_budget'
+    FILE_BUDGET = 'file_budget'
+    
+    def __init__(self, time_budget: Optional[float] = None, max_files: Optional[int] = None):
+        """
+        Args:
+            time_budget: Seconds, from now, after which the sort stops
+            max_files: Maximum number of files to move
+        """
+        self.deadline = time.monotonic() + time_budget if time_budget else None
+        self.max_files = max_files
+        self.files_done = 0
+        self.stop_reason = None
+        self._running = threading.Event()
+        self._running.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called."""
+        return self.stop_reason == self.CANCELLED
+    
+    @property
+    def stopped(self) -> bool:
+        """Whether the sort was cancelled or ran out of budget."""
+        return self.stop_reason is not None
+    
+    @property
+    def paused(self) -> bool:
+        """Whether the sort is paused."""
+        return not self._running.is_set()
+    
+    def cancel(self):
+        """Stop the sort at its next checkpoint (also ends a pause)."""
+        self.stop(self.CANCELLED)
+        self._running.set()
+    
+    def pause(self):
+        """Hold the sort at its next checkpoint until resume() or cancel()."""
+        if not self.cancelled:
+            self._running.clear()
+    
+    def resume(self):
+        """Continue a paused sort."""
+        self._running.set()
+    
+    def stop(self, reason: str):
+        """Record why the sort stops; the first reason wins, except that cancel() always does."""
+        if self.stop_reason is None or reason == self.CANCELLED:
+            self.stop_reason = reason
+    
+    def checkpoint(self, budget: bool = True) -> bool:
+        """
+        Wait while paused, then return whether the sort may continue.
+        
+        Args:
+            budget: Whether running out of budget stops this loop. Cleanup
+                passes False, so the folders emptied so far are still removed.
+        """
+        if not self._running.is_set():
+            self._running.wait()
+        reason = self.stop_reason
+        if reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.stop(self.TIME_BUDGET)
+            reason = self.stop_reason
+        if reason is None:
+            return True
+        return not budget and reason != self.CANCELLED
+    
+    def files_left(self) -> Optional[int]:
+        """Number of files that may still be moved, or None without a file budget."""
+        if self.max_files is None:
+            return None
+        return max(0, self.max_files - self.files_done)
+
+
+class PlannedMove(NamedTuple):
+    """A single file move in a MovePlan."""
+    source: str
+    destination: str
+    filename: str
+    bucket: str
+    record_index: int
+    source_device: int = -1
+    size: int = 0
+
+
+class MoveResult(NamedTuple):
+    """Outcome of one planned move; error holds the logged warning, if any."""
+    move: PlannedMove
+    error: Optional[str]
+
+
+class MovePlan(NamedTuple):
+    """
+    Immutable result of FileSorterApp.plan_moves.
+    
+    Holds every destination folder once and only the moves that actually change
+    a file's location, so it can be inspected (dry run), saved, and executed later.
+    """
+    root: str
+    buckets: Tuple[str, ...]
+    directories: Tuple[str, ...]
+    moves: Tuple[PlannedMove, ...]
+    total_files: int
+    
+    def to_json(self) -> str:
+        """Serialize the plan to a JSON string."""
+        return json.dumps({
+            'root': self.root,
+            'buckets': list(self.buckets),
+            'directories': list(self.directories),
+            'moves': [list(move) for move in self.moves],
+            'total_files': self.total_files
+        })
+    
+    @classmethod
+    def from_json(cls, data: str) -> 'MovePlan':
+        """Load a plan serialized with to_json."""
+        return cls.from_dict(json.loads(data))
+    
+    @classmethod
+    def from_dict(cls, raw: Dict) -> 'MovePlan':
+        """Build a plan from the decoded JSON object written by to_json."""
+        return cls(
+            raw['root'],
+            tuple(raw['buckets']),
+            tuple(raw['directories']),
+            tuple(PlannedMove(*move) for move in raw['moves']),
+            raw['total_files']
+        )
+    
+    def save(self, path: str):
+        """Write the plan to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+    
+    @classmethod
+    def load(cls, path: str) -> 'MovePlan':
+        """Read a plan written with save."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_json(f.read())
+
+
+class _ParallelScanner:
+    """
+    Work-stealing directory walker used by FileSorterApp.scan_files.
+    
+    Each worker owns a deque of directories. A worker pops from the tail of its
+    own deque (depth-first, good locality) and steals from the head of the other
+    workers' deques when it runs dry, so deep and shallow subtrees balance out
+    without a central queue. Every directory carries an order key (its index
+    path from the root) so results can be put back into os.walk order.
+    """
+    
+    def __init__(self, sorter: 'FileSorterApp', workers: int):
+        self.sorter = sorter
+        self.workers = max(1, workers)
+        self.queues = [deque() for _ in range(self.workers)]
+        self.worker_stats = [sorter._new_scan_stats() for _ in range(self.workers)]
+        self.batches = []
+        self.pending = 0
+        self.condition = threading.Condition()
+
+    def _push(self, worker_id: int, parent_key: Tuple[int, ...], subdirs: List[str]):
+        """Queue subdirectories on a worker's own deque."""
+        if not subdirs:
+            return
+        with self.condition:
+            self.pending += len(subdirs)
+            # Reversed so that popping from the tail visits children in order
+            for index in range(len(subdirs) - 1, -1, -1):
+                self.queues[worker_id].append((subdirs[index], parent_key + (index,)))
+            self.condition.notify_all()
+
+    def _next_task(self, worker_id: int) -> Optional[Tuple[str, Tuple[int, ...]]]:
+        """Get the next directory for a worker, stealing if needed. None means done."""
+        own = self.queues[worker_id]
+        while True:
+            try:
+                return own.pop()
+            except IndexError:
+                pass
+            for offset in range(1, self.workers):
+                victim = self.queues[(worker_id + offset) % self.workers]
+                try:
+                    return victim.popleft()
+                except IndexError:
+                    continue
+            with self.condition:
+                if self.pending == 0:
+                    return None
+                self.condition.wait(0.05)
+
+    def _finish_task(self):
+        """Mark one directory as fully processed."""
+        with self.condition:
+            self.pending -= 1
+            if self.pending == 0:
+                self.condition.notify_all()
+
+    def _worker(self, worker_id: int):
+        stats = self.worker_stats[worker_id]
+        while True:
+            task = self._next_task(worker_id)
+            if task is None:
+                return
+            dir_path, key = task
+            if not self.sorter.cancel_token.checkpoint():
+                # Drain the queues without listing anything
+                self._finish_task()
+                continue
+            try:
+                records, subdirs = self.sorter._scan_directory(dir_path, stats)
+            except (OSError, PermissionError) as e:
+                stats['errors'] += 1
+                self.sorter._log_progress(f'Warning: Could not access folder {dir_path}: {e}')
+                self._finish_task()
+                continue
+            if records:
+                self.batches.append((key, records))
+            self._push(worker_id, key, subdirs)
+            self._finish_task()
+
+    def run(self, root_subdirs: List[str], ordered: bool) -> Tuple[List[Dict], Dict[str, int]]:
+        """
+        Walk everything below the already-scanned root.
+        
+        Args:
+            root_subdirs: Subdirectories of the root, in listing order
+            ordered: Return records in os.walk order instead of completion order
+            
+        Returns:
+            Tuple of (file records, merged scan counters)
+        """
+        # Deal the root's children out round-robin so every worker starts busy
+        with self.condition:
+            self.pending = len(root_subdirs)
+            for index, dir_path in enumerate(root_subdirs):
+                self.queues[index % self.workers].appendleft((dir_path, (index,)))
+        
+        threads = [
+            threading.Thread(target=self._worker, args=(worker_id,), daemon=True)
+            for worker_id in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        if ordered:
+            self.batches.sort(key=lambda batch: batch[0])
+        file_list = []
+        for _, records in self.batches:
+            file_list.extend(records)
+        
+        merged = self.sorter._new_scan_stats()
+        for stats in self.worker_stats:
+            for name, value in stats.items():
+                merged[name] += value
+        return file_list, merged
+
 
 class FileSorterApp:
     """
-    A file sorting application that can organize files by type, date, alphabetically, or size.
+    A file sorting application that can organize files by type, date, alphabetically, size,
+    or user-defined rules.
     Designed to be GUI-friendly with callback support for progress updates.
     """
     
@@ -29,358 +1076,1780 @@ class FileSorterApp:
         'By File Type': 'sort_by_file_type',
         'By Date': 'sort_by_date', 
         'Alphabetically': 'sort_alphabetically',
-        'By Size': 'sort_by_size'
+        'By Size': 'sort_by_size',
+        'By Rules': 'sort_by_rules'
     }
     
-    def __init__(self, progress_callback: Optional[Callable[[str], None]] = None):
+    # Per-file destination folder (key) functions for each sorting method
+    BUCKET_FUNCTIONS = {
+        'sort_by_file_type': 'file_type_bucket',
+        'sort_by_date': 'date_bucket',
+        'sort_alphabetically': 'alphabetical_bucket',
+        'sort_by_size': 'size_bucket',
+        'sort_by_rules': 'rule_bucket'
+    }
+    
+    # Separates the methods of a composite sorting method, e.g. 'By File Type > By Date'
+    COMPOSITE_SEPARATOR = ' > '
+    
+    # Composite methods offered alongside the single ones; any combination is accepted
+    COMPOSITE_PRESETS = (
+        'By File Type > By Date',
+        'By Date > By File Type',
+        'By File Type > By Size',
+    )
+    
+    # Timestamps that sort_by_date can use
+    DATE_SOURCES = ('ctime', 'mtime', 'birthtime', 'media')
+    
+    # Same-device renames handed to a move worker at a time
+    RENAME_BATCH_SIZE = 64
+    
+    def __init__(self, progress_callback: Optional[Callable[[str], None]] = None,
+                 scan_workers: int = 0, move_workers: int = 0, verify_copies: bool = False,
+                 event_callback: Optional[Callable[[ProgressEvent], None]] = None,
+                 max_event_rate: float = 20.0, log_each_file: bool = True,
+                 index_path: Optional[str] = None, full_cleanup: bool = False,
+                 date_source: str = 'ctime', date_granularity: str = 'month',
+                 date_layout: str = 'flat', duplicates: Optional[str] = None,
+                 hash_workers: int = 0, content_types: bool = False,
+                 metadata_cache: Optional[str] = None, metadata_workers: int = 8,
+                 journal_path: Optional[str] = None, metrics_path: Optional[str] = None,
+                 time_budget: Optional[float] = None, max_files: Optional[int] = None,
+                 scan_cache: Optional[ScanCache] = None, rules_path: Optional[str] = None,
+                 include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 max_depth: Optional[int] = None, hidden_files: str = 'include',
+                 symlinks: str = 'files', skip_output_folders: bool = False):
         """
         Initialize the FileSorter application.
         
         Args:
-            progress_callback: Optional function to call with progress messages for GUI updates
+            progress_callback: Optional function to call with progress messages for GUI updates
+            scan_workers: Number of threads used to walk directory trees (0 or 1 scans serially)
+            move_workers: Number of files moved concurrently (0 or 1 moves serially)
+            verify_copies: Compare checksums of source and copy before removing
+                the source of a cross-device move
+            event_callback: Optional function receiving ProgressEvent updates
+            max_event_rate: Maximum number of events per second sent to event_callback
+            log_each_file: Send a text message to progress_callback for every
+                moved file. Turn off when event_callback drives the progress display.
+            index_path: Optional SQLite database used to re-sort incrementally;
+                sort_files then only scans changed directories and only plans
+                new or changed files (see file_index.py)
+            full_cleanup: After sorting, walk the whole tree for empty folders
+                instead of only checking the folders that files were moved out of
+            date_source: Timestamp used when sorting by date: 'ctime', 'mtime',
+                'birthtime', or 'media' for the capture date of photos and
+                videos (EXIF or MP4 header), falling back to ctime
+            date_granularity: Date folder size: 'year', 'month', 'week' (ISO) or 'day'
+            date_layout: 'flat' folders such as Oct_2026, or 'nested' folders
+                such as 2026/10
+            duplicates: What to do with files whose contents match an earlier
+                file: 'report' them, 'skip' them (leave them where they are),
+                'hardlink' them to the original before sorting, or 'move' them
+                to a Duplicates folder. None disables duplicate detection.
+            hash_workers: Number of processes hashing files for duplicate
+                detection (0 or 1 hashes in this process)
+            content_types: When sorting by type, recognize files from their
+                first bytes, so files with no extension or an unknown one land
+                in the folder of their real type (see metadata.py)
+            metadata_cache: Optional SQLite database caching header results by
+                (inode, size, mtime) between runs
+            metadata_workers: Number of threads reading file headers
+            journal_path: Optional file recording every planned and finished
+                move, so an interrupted sort can be resumed and a sort can be
+                undone (see journal.py and the resume and undo methods)
+            metrics_path: Optional Prometheus textfile rewritten with the
+                metrics of every run (see metrics.py); the metrics of the last
+                run are always available in ``self.metrics``
+            time_budget: Seconds a sort may run before it stops at the next
+                checkpoint, leaving the remaining files for the next run
+            max_files: Maximum number of files moved per sort
+            scan_cache: Optional ScanCache that scan_files reuses while the
+                scanned directories are unchanged. Pass the same cache to
+                several instances to share scans between them.
+            rules_path: Optional TOML or JSON rule file used by the 'By Rules'
+                sorting method (see rules.py)
+            include: Glob patterns a file must match to be sorted; patterns
+                with a '/' match the path below the sorted folder
+            exclude: Glob patterns of files and folders to leave alone;
+                excluded folders are never listed
+            max_depth: Folder levels to scan below the sorted folder (0 only
+                sorts the files directly in it); None for no limit
+            hidden_files: 'include' or 'exclude' hidden files and folders
+            symlinks: 'files' sorts symlinked files without entering
+                symlinked folders, 'skip' ignores symlinks, 'follow' also
+                enters symlinked folders
+            skip_output_folders: Do not scan folders that sorting creates
+                (No_Extension, size and date folders, Duplicates, rule
+                folders), so files that were already sorted are not looked at
+                again. With an index, changing any scan option lists every
+                folder again on the next run.
+        """
+        if date_source not in self.DATE_SOURCES:
+            raise ValueError(f'Invalid date source "{date_source}"')
+        if duplicates is not None:
+            from duplicates import DUPLICATE_ACTIONS
+            if duplicates not in DUPLICATE_ACTIONS:
+                raise ValueError(f'Invalid duplicate action "{duplicates}"')
+        self.progress_callback = progress_callback or self._default_progress_callback
+        self.progress_throttle = ProgressThrottle(event_callback, max_event_rate) if event_callback else None
+        self.log_each_file = log_each_file
+        self.file_index = None
+        if index_path:
+            from file_index import FileIndex
+            self.file_index = FileIndex(index_path)
+        self.scan_workers = scan_workers
+        self.move_workers = move_workers
+        self.verify_copies = verify_copies
+        self.move_results = []
+        self.vacated_dirs = set()
+        self.removed_folders = []
+        self.full_cleanup = full_cleanup
+        self.date_source = date_source
+        self.date_granularity = date_granularity
+        self.date_layout = date_layout
+        self.date_bucketer = DateBucketer(date_granularity, date_layout)
+        self.duplicates = duplicates
+        self.hash_workers = hash_workers
+        self.duplicate_groups = []
+        self.duplicate_stats = {}
+        self.content_types = content_types
+        self.metadata_extractor = None
+        if content_types or date_source == 'media':
+            from metadata import MetadataCache, MetadataExtractor
+            self.metadata_extractor = MetadataExtractor(MetadataCache(metadata_cache), metadata_workers)
+        self.media_info = {}
+        self.journal = None
+        if journal_path:
+            from journal import MoveJournal
+            self.journal = MoveJournal(journal_path)
+        self.metrics_path = metrics_path
+        self.metrics = SortMetrics()
+        self.time_budget = time_budget
+        self.max_files = max_files
+        self.cancel_token = CancellationToken()
+        self.scan_cache = scan_cache
+        self.rules = None
+        if rules_path:
+            from rules import RuleSet
+            self.rules = RuleSet.load(rules_path)
+        self.scan_filter = None
+        if include or exclude or max_depth is not None or hidden_files != 'include' \
+                or symlinks != 'files' or skip_output_folders:
+            output_folders, output_pattern = self._output_folders() if skip_output_folders else ((), None)
+            self.scan_filter = ScanFilter(include, exclude, max_depth, hidden_files, symlinks,
+                                          output_folders, output_pattern)
+        # Directory mtimes recorded by _scan_directory while filling the scan cache
+        self._dir_mtimes = None
+        self.file_list = []
+        self.folder_path = ""
+        self.scan_stats = self._new_scan_stats()
+        self.last_plan = None
+        # IncrementalRun.stats of the last sort with an index
+        self.incremental_stats = None
+        
+    def _default_progress_callback(self, message: str):
+        """Default progress callback that prints to console."""
+        print(message)
+        
+    def _log_progress(self, message: str):
+        """Log progress using the callback."""
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def _emit_progress(self, phase: str, files_done: int = 0, files_total: int = 0,
+                       bytes_done: int = 0, bytes_total: int = 0, current_path: str = '',
+                       force: bool = False):
+        """Send a ProgressEvent to the event callback, subject to the rate limit."""
+        throttle = self.progress_throttle
+        if throttle is None or not (force or throttle.ready()):
+            return
+        throttle.emit(ProgressEvent(phase, files_done, files_total, bytes_done, bytes_total, current_path), force)
+
+    def validate_folder_path(self, folder_path: str) -> bool:
+        """
+        Validate if the folder path exists and is accessible.
+        
+        Args:
+            folder_path: Path to validate
+            
+        Returns:
+            bool: True if valid, False otherwise
+        """
+        if not folder_path or not folder_path.strip():
+            self._log_progress('Error: No folder path provided.')
+            return False
+            
+        if not os.path.exists(folder_path):
+            self._log_progress('Error: Path does not exist or is invalid!')
+            return False
+            
+        if not os.path.isdir(folder_path):
+            self._log_progress('Error: Path is not a directory!')
+            return False
+            
+        self._log_progress('Path validated successfully.')
+        return True
+
+    def _output_folders(self) -> Tuple[Set[str], str]:
+        """Return the names of folders that sorting creates, and a regex for date folders."""
+        from duplicates import DUPLICATES_FOLDER
+        KB = 1024; MB = KB * 1024; GB = MB * 1024
+        names = {'No_Extension', DUPLICATES_FOLDER}
+        names.update(self.classify_file_size(size) for size in (0, 10 * KB, MB, 100 * MB, GB))
+        if self.rules is not None:
+            # Only the top folder of nested rule folders sits directly below the root
+            for folder in self.rules.folders + [self.rules.default]:
+                if folder:
+                    names.add(folder.replace('\\', '/').split('/')[0])
+        # Flat month, week and day folders (Oct_2026, 2026-W42, 2026-10-16)
+        months = '|'.join(DateBucketer.MONTH_NAMES)
+        pattern = rf'(?:(?:{months})_\d{{4}}|\d{{4}}-W\d{{2}}|\d{{4}}-\d{{2}}-\d{{2}})\Z'
+        if self.date_layout == 'nested':
+            # Year folders of the nested layout (2026/10)
+            pattern = rf'(?:{pattern}|\d{{4}}\Z)'
+        return names, pattern
+
+    def _new_scan_stats(self) -> Dict[str, int]:
+        """Return a fresh set of scan counters."""
+        return {
+            'directories': 0,
+            'files': 0,
+            'scandir_calls': 0,
+            'stat_calls': 0,
+            'errors': 0,
+            'directories_pruned': 0,
+            'files_excluded': 0
+        }
+
+    def _make_file_record(self, file_path: str, filename: str, stat_result: os.stat_result) -> Dict:
+        """
+        Build a file record from a single stat result.
+        
+        Args:
+            file_path: Full path of the file
+            filename: Base name of the file
+            stat_result: Result of the one stat call made for this file
+            
+        Returns:
+            File dictionary with metadata
+        """
+        return {
+            'filepath': file_path,
+            'filename': filename,
+            'modified_time': stat_result.st_mtime,
+            'file_extension': os.path.splitext(filename)[1],
+            'size': stat_result.st_size,
+            'device': stat_result.st_dev,
+            'inode': stat_result.st_ino,
+            'changed_time': stat_result.st_ctime,
+            'birth_time': getattr(stat_result, 'st_birthtime', None)
+        }
+
+    def _scan_directory(self, dir_path: str, stats: Dict[str, int]) -> Tuple[List[Dict], List[str]]:
+        """
+        List a single directory with os.scandir and stat each file once.
+        
+        The directory listing is read completely before any record is returned so
+        that callers may safely modify the directory afterwards.
+        
+        Subdirectories and files rejected by ``self.scan_filter`` are left out;
+        the filter must have been started with the scanned root.
+        
+        Args:
+            dir_path: Directory to list
+            stats: Scan counters to update
+            
+        Returns:
+            Tuple of (file records, subdirectory paths) in listing order
+        """
+        records = []
+        subdirs = []
+        if self._dir_mtimes is not None:
+            # Taken before listing, so changes made during the listing invalidate the cache
+            stats['stat_calls'] += 1
+            self._dir_mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+        stats['scandir_calls'] += 1
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+        stats['directories'] += 1
+        scan_filter = self.scan_filter
+        if scan_filter is not None:
+            child_depth = scan_filter.depth(dir_path) + 1
+        
+        for entry in entries:
+            try:
+                # is_dir() is answered from d_type on most platforms, so it only
+                # costs a syscall for symlinks and exotic filesystems
+                if entry.is_dir():
+                    if scan_filter is None:
+                        # Match os.walk(): symlinked directories are not followed
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif scan_filter.enter(entry, child_depth):
+                        subdirs.append(entry.path)
+                    else:
+                        # Pruned here, so nothing below it is ever listed
+                        stats['directories_pruned'] += 1
+                    continue
+                if scan_filter is not None and not scan_filter.keep(entry):
+                    stats['files_excluded'] += 1
+                    continue
+                stats['stat_calls'] += 1
+                records.append(self._make_file_record(entry.path, entry.name, entry.stat()))
+                stats['files'] += 1
+            except (OSError, PermissionError) as e:
+                stats['errors'] += 1
+                self._log_progress(f'Warning: Could not access file {entry.path}: {e}')
+                continue
+        
+        return records, subdirs
+
+    def scan_files(self, folder_path: str, workers: Optional[int] = None,
+                   ordered: bool = True, compact: bool = False,
+                   refresh: bool = False) -> Union[List[Dict], FileRecordStore]:
+        """
+        Scan folder and generate list of all files with metadata.
+        
+        Uses os.scandir so each file costs exactly one stat call. Syscall
+        counters for the last scan are available in ``self.scan_stats``.
+        With a scan cache, the previous result for the same folder is returned
+        as long as none of its directories changed; it is the same object, so
+        callers that modify records should invalidate the cache.
+        
+        Args:
+            folder_path: Path to scan
+            workers: Threads used for the walk; defaults to ``self.scan_workers``.
+                More than one spreads subdirectories over a work-stealing pool,
+                which mostly helps on high-latency network mounts.
+            ordered: Return files in os.walk order. Only matters for parallel
+                scans, which otherwise return files in completion order.
+            compact: Return a FileRecordStore instead of a list of dictionaries,
+                which uses a fraction of the memory on very large trees
+            refresh: Scan again even if the scan cache holds a valid result
+            
+        Returns:
+            List of file dictionaries with metadata, or a FileRecordStore
+        """
+        cache = self.scan_cache
+        if cache is None:
+            return self._scan_files(folder_path, workers, ordered, compact)
+        
+        # Scans with different filters find different files
+        variant = self.scan_filter.signature if self.scan_filter is not None else ''
+        if not refresh:
+            directory_count = cache.directory_count
+            records = cache.get(folder_path, variant)
+            if records is not None:
+                self.scan_stats = self._new_scan_stats()
+                self.scan_stats['stat_calls'] = directory_count
+                self.scan_stats['files'] = len(records)
+                self._emit_progress('scan', len(records), current_path=folder_path, force=True)
+                if compact and not isinstance(records, FileRecordStore):
+                    return FileRecordStore.from_records(records)
+                if not compact and isinstance(records, FileRecordStore):
+                    return records.to_list()
+                return records
+        
+        self._dir_mtimes = {}
+        try:
+            records = self._scan_files(folder_path, workers, ordered, compact)
+            dir_mtimes = self._dir_mtimes
+        finally:
+            self._dir_mtimes = None
+        # A stopped scan is incomplete, and an unreadable root has nothing worth keeping
+        if not self.cancel_token.stopped and dir_mtimes:
+            cache.put(folder_path, records, dir_mtimes, variant)
+        return records
+
+    def _scan_files(self, folder_path: str, workers: Optional[int], ordered: bool,
+                    compact: bool) -> Union[List[Dict], FileRecordStore]:
+        """Walk a folder as described in scan_files, without the cache."""
+        if workers is None:
+            workers = self.scan_workers
+        if workers <= 1:
+            if compact:
+                return FileRecordStore.from_records(self.iter_files(folder_path))
+            return list(self.iter_files(folder_path))
+        
+        file_list = []
+        stats = self._new_scan_stats()
+        self.scan_stats = stats
+        if self.scan_filter is not None:
+            self.scan_filter.start(folder_path)
+        
+        try:
+            records, subdirs = self._scan_directory(folder_path, stats)
+        except (OSError, PermissionError) as e:
+            self._log_progress(f'Error accessing folder {folder_path}: {e}')
+            return FileRecordStore() if compact else []
+        file_list.extend(records)
+        
+        if subdirs:
+            scanner = _ParallelScanner(self, workers)
+            records, worker_stats = scanner.run(subdirs, ordered)
+            file_list.extend(records)
+            for name, value in worker_stats.items():
+                stats[name] += value
+        self._emit_progress('scan', stats['files'], force=True)
+        if compact:
+            return FileRecordStore.from_records(file_list)
+        return file_list
+
+    def iter_files(self, folder_path: str, skip_dirs: Optional[Set[str]] = None) -> Iterator[Dict]:
+        """
+        Lazily scan a folder, yielding one file record at a time.
+        
+        Files come out in os.walk order. Only one directory listing is held in
+        memory at a time, and each listing is read completely before its records
+        are yielded, so callers may move files while iterating.
+        
+        Args:
+            folder_path: Path to scan
+            skip_dirs: Optional set of normalized directory paths not to descend
+                into. It is checked lazily, so callers may add to it while iterating.
+            
+        Yields:
+            File dictionaries with metadata
+        """
+        stats = self._new_scan_stats()
+        self.scan_stats = stats
+        if self.scan_filter is not None:
+            self.scan_filter.start(folder_path)
+        
+        try:
+            records, subdirs = self._scan_directory(folder_path, stats)
+        except (OSError, PermissionError) as e:
+            self._log_progress(f'Error accessing folder {folder_path}: {e}')
+            return
+        self._emit_progress('scan', stats['files'], current_path=folder_path, force=True)
+        
+        # Depth-first, pushing children in reverse to keep os.walk ordering
+        stack = list(reversed(subdirs))
+        for record in records:
+            yield record
+        del records
+        
+        while stack:
+            dir_path = stack.pop()
+            if skip_dirs and os.path.normpath(dir_path) in skip_dirs:
+                continue
+            if not self.cancel_token.checkpoint():
+                break
+            try:
+                records, subdirs = self._scan_directory(dir_path, stats)
+            except (OSError, PermissionError) as e:
+                stats['errors'] += 1
+                self._log_progress(f'Warning: Could not access folder {dir_path}: {e}')
+                continue
+            self._emit_progress('scan', stats['files'], current_path=dir_path)
+            stack.extend(reversed(subdirs))
+            for record in records:
+                yield record
+            del records
+        self._emit_progress('scan', stats['files'], force=True)
+
+    def delete_empty_folders(self, folder_path: str,
+                             directories: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Delete empty folders in the directory tree.
+        
+        Args:
+            folder_path: Root of the tree; the root itself is never deleted
+            directories: Optional folders that may have become empty (usually
+                the source folders of moved files). Only these and their parents
+                up to folder_path are tried, deepest first. When omitted, the
+                whole tree is walked.
+            
+        Returns:
+            List of deleted folders (also kept in ``self.removed_folders``)
+        """
+        with self.metrics.phase('cleanup'):
+            removed = self._delete_empty_folders(folder_path, directories)
+        self.metrics.count('folders_removed', len(removed))
+        self.removed_folders = removed
+        return removed
+
+    def _delete_empty_folders(self, folder_path: str, directories: Optional[Iterable[str]]) -> List[str]:
+        """Delete empty folders as described in delete_empty_folders."""
+        removed = []
+        metrics = self.metrics
+        if directories is None:
+            for dirpath, dirs, files in os.walk(folder_path, topdown=False):
+                if not self.cancel_token.checkpoint(budget=False):
+                    break
+                metrics.count_syscall('scandir')
+                if not dirs and not files:
+                    metrics.count_syscall('rmdir')
+                    try:
+                        os.rmdir(dirpath)
+                        removed.append(dirpath)
+                        self._log_progress(f'Deleted empty folder: {dirpath}')
+                    except OSError as e:
+                        metrics.count('errors')
+                        self._log_progress(f'Error deleting folder: {e}')
+            return removed
+        
+        root = os.path.normpath(folder_path)
+        root_prefix = os.path.join(root, '')
+        candidates = set()
+        for directory in directories:
+            directory = os.path.normpath(directory)
+            while directory.startswith(root_prefix) and directory not in candidates:
+                candidates.add(directory)
+                directory = os.path.dirname(directory)
+        
+        # Deepest first, so a parent is only tried after its children
+        for directory in sorted(candidates, key=lambda path: path.count(os.sep), reverse=True):
+            if not self.cancel_token.checkpoint(budget=False):
+                break
+            metrics.count_syscall('rmdir')
+            try:
+                os.rmdir(directory)
+            except OSError as e:
+                if e.errno not in (errno.ENOTEMPTY, errno.EEXIST, errno.ENOENT):
+                    metrics.count('errors')
+                    self._log_progress(f'Error deleting folder: {e}')
+                continue
+            removed.append(directory)
+            self._log_progress(f'Deleted empty folder: {directory}')
+        return removed
+
+    def _make_directories(self, directories: Iterable[str], existing: Set[str]) -> int:
+        """
+        Create folders together with any missing parents.
+        
+        Unlike one os.makedirs call per folder, parents shared by several
+        folders (pdf/ and pdf/2026/ of pdf/2026/Oct and pdf/2026/Nov) are
+        created, or found to exist, only once: each level costs a single
+        mkdir, and folders in ``existing`` are not touched again.
+        
+        Args:
+            directories: Normalized folder paths
+            existing: Normalized folders known to exist, such as the sorted
+                folder itself; updated with every folder made or found
+            
+        Returns:
+            Number of folders that were created
+        """
+        created = 0
+        for directory in directories:
+            missing = []
+            path = directory
+            while path not in existing:
+                missing.append(path)
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+            for path in reversed(missing):
+                self.metrics.count_syscall('mkdir')
+                try:
+                    os.mkdir(path)
+                    created += 1
+                except FileExistsError:
+                    if not os.path.isdir(path):
+                        raise
+                existing.add(path)
+        return created
+
+    def _folder_names(self, folder: str) -> Set[str]:
+        """Return the os.path.normcase names in a folder (empty if it does not exist yet)."""
+        self.metrics.count_syscall('scandir')
+        try:
+            return {os.path.normcase(name) for name in os.listdir(folder)}
+        except OSError:
+            return set()
+
+    def plan_moves(self, folder_path: str, file_list: Iterable[Dict],
+                   key_func: Callable[[Dict], str],
+                   overrides: Optional[Dict[int, Optional[str]]] = None) -> 'MovePlan':
+        """
+        Work out where every file should go.
+        
+        Nothing is moved or created. Each destination folder is listed once, so
+        that a file whose name is already taken there, by a file on disk or by
+        another file of the plan, gets a numbered name ("report (1).pdf")
+        instead of replacing it.
+        
+        Args:
+            folder_path: Target directory path
+            file_list: File dictionaries (or a FileRecordStore)
+            key_func: Function mapping a file record to its destination folder
+                name, relative to folder_path, or to None to leave it in place
+            overrides: Optional {record index: bucket} taking precedence over
+                key_func; a bucket of None leaves that file where it is
+            
+        Returns:
+            MovePlan with the folders to create and the moves to make. Files that
+            are already in their destination folder are left out.
+        """
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        folder_path = os.path.normpath(folder_path)
+        bucket_folders = {}
+        normalized_parents = {}
+        # Names taken in each destination folder, by os.path.normcase
+        taken_names = {}
+        moves = []
+        total_files = 0
+        renamed = 0
+        
+        for index, file in enumerate(file_list):
+            total_files += 1
+            if overrides is not None and index in overrides:
+                bucket = overrides[index]
+                if bucket is None:
+                    continue
+            else:
+                bucket = key_func(file)
+                if bucket is None:
+                    continue
+            target_folder = bucket_folders.get(bucket)
+            if target_folder is None:
+                target_folder = os.path.normpath(os.path.join(folder_path, bucket))
+                bucket_folders[bucket] = target_folder
+            
+            source = file['filepath']
+            parent = os.path.dirname(source)
+            normalized_parent = normalized_parents.get(parent)
+            if normalized_parent is None:
+                normalized_parent = os.path.normpath(parent)
+                normalized_parents[parent] = normalized_parent
+            
+            # Only move if not already in correct location
+            if normalized_parent != target_folder:
+                filename = file['filename']
+                names = taken_names.get(target_folder)
+                if names is None:
+                    names = taken_names[target_folder] = self._folder_names(target_folder)
+                target_name = filename
+                if os.path.normcase(target_name) in names:
+                    target_name = _free_name(filename, names)
+                    renamed += 1
+                names.add(os.path.normcase(target_name))
+                moves.append(PlannedMove(source, os.path.join(target_folder, target_name),
+                                         filename, bucket, index, file.get('device', -1), file['size']))
+        
+        needed = {move.bucket for move in moves}
+        directories = tuple(folder for bucket, folder in bucket_folders.items() if bucket in needed)
+        if renamed:
+            self._log_progress(f'{renamed} files get a numbered name because their name is already '
+                               f'taken in their destination folder.')
+        self.metrics.count('files_planned', total_files)
+        self.metrics.count('moves_planned', len(moves))
+        self.metrics.count('files_renamed', renamed)
+        self.metrics.add_phase_time('plan', time.perf_counter() - start_wall, time.process_time() - start_cpu)
+        return MovePlan(folder_path, tuple(bucket_folders), directories, tuple(moves), total_files)
+
+    def find_duplicates(self, file_list: List[Dict]) -> List['DuplicateGroup']:
+        """
+        Find files with identical contents (see duplicates.py).
+        
+        Args:
+            file_list: File dictionaries (or a FileRecordStore) from a scan
+            
+        Returns:
+            DuplicateGroup list, also stored in ``self.duplicate_groups``
+        """
+        from duplicates import DuplicateFinder
+        
+        finder = DuplicateFinder(self.hash_workers)
+        self._emit_progress('duplicates', current_path=self.folder_path, force=True)
+        self.duplicate_groups = finder.find(file_list)
+        self.duplicate_stats = finder.stats
+        self._log_progress(f'Found {finder.stats["duplicates"]} duplicate files in '
+                           f'{finder.stats["groups"]} groups ({finder.stats["full_hashes"]} files fully hashed).')
+        if self.duplicates == 'report' or self.log_each_file:
+            for group in self.duplicate_groups:
+                original = file_list[group.original]['filepath']
+                for index in group.duplicates:
+                    self._log_progress(f'Duplicate: {file_list[index]["filepath"]} is identical to {original}')
+        return self.duplicate_groups
+
+    def load_media_info(self, file_list: Iterable[Dict]) -> Dict[str, 'MediaInfo']:
+        """
+        Read the header metadata of many files in one batch.
+        
+        Results are stored in ``self.media_info`` (keyed by filepath), where
+        the bucket functions look them up.
+        """
+        self._emit_progress('metadata', current_path=self.folder_path, force=True)
+        self.media_info = self.metadata_extractor.extract(file_list)
+        stats = self.metadata_extractor.stats
+        self._log_progress(f'Read {stats["header_reads"]} file headers ({stats["cache_hits"]} cached).')
+        return self.media_info
+
+    def _get_media_info(self, file: Dict) -> 'MediaInfo':
+        """Return the header metadata of one file, reading it if it was not batch-loaded."""
+        info = self.media_info.get(file['filepath'])
+        if info is None:
+            info = self.metadata_extractor.get(file)
+        return info
+
+    def _plan_sort(self, folder_path: str, file_list: List[Dict],
+                   key_func: Callable[[Dict], str]) -> 'MovePlan':
+        """
+        Plan a sort, first handling duplicates according to ``self.duplicates``
+        and loading any header metadata the bucket function needs.
+        """
+        self.media_info = {}
+        key_functions = getattr(key_func, 'functions', (key_func,))
+        needs_dates = self.date_source == 'media' and self.date_bucket in key_functions
+        if needs_dates:
+            with self.metrics.phase('metadata'):
+                self.load_media_info(file_list)
+        elif self.content_types and self.file_type_bucket in key_functions:
+            from metadata import is_known_extension
+            # Known extensions are kept, so only the other files are sniffed
+            with self.metrics.phase('metadata'):
+                self.load_media_info(file for file in file_list
+                                     if not is_known_extension(file['file_extension'].lstrip('.')))
+        self.duplicate_groups = []
+        overrides = None
+        if self.duplicates:
+            with self.metrics.phase('duplicates'):
+                groups = self.find_duplicates(file_list)
+            if self.duplicates in ('skip', 'move'):
+                from duplicates import DUPLICATES_FOLDER
+                bucket = None if self.duplicates == 'skip' else DUPLICATES_FOLDER
+                overrides = {index: bucket for group in groups for index in group.duplicates}
+        return self.plan_moves(folder_path, file_list, key_func, overrides)
+
+    def _link_duplicates(self, file_list: List[Dict], dry_run: bool) -> int:
+        """
+        Replace every duplicate in ``self.duplicate_groups`` with a hard link to its original.
+        
+        Each link is created under a temporary name and renamed over the
+        duplicate, so the duplicate is never missing. Files on a different
+        device from their original are left alone.
+        
+        Returns:
+            Number of files replaced (or that would be replaced in a dry run)
+        """
+        linked = 0
+        for group in self.duplicate_groups:
+            original = file_list[group.original]
+            for index in group.duplicates:
+                duplicate = file_list[index]
+                if duplicate.get('inode') and (duplicate.get('device'), duplicate['inode']) == \
+                        (original.get('device'), original.get('inode')):
+                    continue
+                if dry_run:
+                    self._log_progress(f'Would link {duplicate["filepath"]} to {original["filepath"]}')
+                    linked += 1
+                    continue
+                try:
+                    temp_path = _create_temp_link(original['filepath'], duplicate['filepath'])
+                except OSError as e:
+                    self._log_progress(f'Warning: Could not link {duplicate["filename"]}: {e}')
+                    continue
+                try:
+                    os.replace(temp_path, duplicate['filepath'])
+                except OSError as e:
+                    self._log_progress(f'Warning: Could not link {duplicate["filename"]}: {e}')
+                    _unlink_quietly(temp_path)
+                    continue
+                linked += 1
+        self._log_progress(f'{"Would replace" if dry_run else "Replaced"} {linked} duplicates with hard links.')
+        return linked
+
+    def _move_file(self, source: str, destination: str,
+                   source_device: int = -1, destination_device: int = -1):
+        """
+        Move a single file.
+        
+        Files on the same device are moved with one atomic rename. When the
+        devices are known to differ, or the rename fails with EXDEV, the file is
+        copied across devices instead and the source removed afterwards. An
+        existing destination is never replaced: the move fails with
+        FileExistsError and the source is left where it is.
+        
+        Args:
+            source: Current path of the file
+            destination: New path of the file
+            source_device: st_dev of the source, or -1 if unknown
+            destination_device: st_dev of the destination folder, or -1 if unknown
         """
-        self.progress_callback = progress_callback or self._default_progress_callback
-        self.file_list = []
-        self.folder_path = ""
+        if source_device < 0 or destination_device < 0 or source_device == destination_device:
+            self.metrics.count_syscall('rename')
+            try:
+                _rename_noreplace(source, destination)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # The rename is retried as a copy
+                self.metrics.count('retries')
+        self._move_across_devices(source, destination)
+
+    def _move_to_free_name(self, file: Dict, target_folder: str, destination_device: int) -> str:
+        """
+        Move a file into a folder, numbering its name if the name is taken there.
         
-    def _default_progress_callback(self, message: str):
-        """Default progress callback that prints to console."""
-        print(message)
+        Used by streaming sorts, which have no plan to pick names in advance.
         
-    def _log_progress(self, message: str):
-        """Log progress using the callback."""
-        if self.progress_callback:
-            self.progress_callback(message)
+        Returns:
+            The new path of the file
+        """
+        filename = file['filename']
+        target_name = filename
+        taken = None
+        while True:
+            target = os.path.join(target_folder, target_name)
+            try:
+                self._move_file(file['filepath'], target, file.get('device', -1), destination_device)
+                return target
+            except FileExistsError:
+                if taken is None:
+                    taken = self._folder_names(target_folder)
+                    self.metrics.count('files_renamed')
+                target_name = _free_name(filename, taken)
+                taken.add(os.path.normcase(target_name))
 
-    def validate_folder_path(self, folder_path: str) -> bool:
+    def _move_across_devices(self, source: str, destination: str):
         """
-        Validate if the folder path exists and is accessible.
+        Copy a file to another device with kernel-side copies, then remove the source.
+        
+        The data is written to a new temporary file next to the destination
+        (never one that already exists), which is renamed into place only once the copy (and the optional checksum
+        comparison) has succeeded, so an interrupted move never leaves a
+        truncated destination or loses the source.
+        """
+        # Checked before copying, so a clash does not cost a whole copy
+        if os.path.lexists(destination):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination)
+        if os.path.islink(source):
+            # Recreating links is shutil's job
+            shutil.move(source, destination)
+            return
+        
+        # A fresh name, so only a file created here is ever removed again
+        temp_destination, dst = _create_temp_file(destination)
+        self.metrics.count_syscall('copy')
+        try:
+            with open(source, 'rb') as src, dst:
+                _copy_file_data(src, dst, os.fstat(src.fileno()).st_size)
+            shutil.copystat(source, temp_destination)
+            if self.verify_copies and _file_digest(source) != _file_digest(temp_destination):
+                raise OSError(f'Checksum mismatch after copying {source}')
+            _rename_noreplace(temp_destination, destination)
+        except BaseException:
+            _unlink_quietly(temp_destination)
+            raise
+        self.metrics.count_syscall('unlink')
+        os.unlink(source)
+
+    def _try_move(self, move: 'PlannedMove', destination_device: int = -1) -> Optional[str]:
+        """Move one planned file, returning a warning message on failure."""
+        start_time = time.perf_counter()
+        try:
+            self._move_file(move.source, move.destination, move.source_device, destination_device)
+        except (OSError, PermissionError, shutil.Error) as e:
+            return f'Warning: Could not move {move.filename}: {e}'
+        finally:
+            self.metrics.move_latency.observe(time.perf_counter() - start_time)
+        return None
+
+    def _run_concurrent_moves(self, moves: Tuple['PlannedMove', ...], workers: int,
+                              destination_devices: Dict[str, int]) -> Iterator[Tuple['PlannedMove', Optional[str]]]:
+        """
+        Run moves on a thread pool, grouped by (source device, destination device).
+        
+        Same-device moves are plain renames, so they are handed to workers in
+        batches to keep scheduling overhead low. Cross-device moves are copies
+        and each one becomes its own task so that they overlap. Moves that could
+        clash with another move (same destination, or a destination that is
+        another move's source) are held back and run serially afterwards in plan
+        order. A move into a path that another move frees therefore runs after
+        that move, even where a serial run would have tried it first and failed;
+        of several moves to one destination, the first in plan order wins and
+        the others fail with FileExistsError. Plans from plan_moves contain
+        neither case, so for them the outcome is the same as a serial run.
+        Workers check ``self.cancel_token`` before each move; moves skipped
+        after a stop are not yielded.
+        
+        Yields:
+            Tuples of (move, warning message or None) in completion order
+        """
+        device_cache = dict(destination_devices)
+        
+        def device_of(directory: str) -> int:
+            device = device_cache.get(directory)
+            if device is None:
+                try:
+                    device = os.stat(directory).st_dev
+                except OSError:
+                    device = -1
+                device_cache[directory] = device
+            return device
+        
+        sources = {move.source for move in moves}
+        seen_destinations = set()
+        queues = {}
+        deferred = []
+        for move in moves:
+            if move.destination in seen_destinations or move.destination in sources:
+                deferred.append(move)
+                continue
+            seen_destinations.add(move.destination)
+            source_device = move.source_device
+            if source_device < 0:
+                source_device = device_of(os.path.dirname(move.source))
+            key = (source_device, device_of(os.path.dirname(move.destination)))
+            queues.setdefault(key, []).append((move, key[1]))
+        del sources, seen_destinations
+        
+        results = queue.Queue()
+        token = self.cancel_token
+        skipped = object()
+        
+        def run_batch(batch: List[Tuple['PlannedMove', int]]):
+            for move, destination_device in batch:
+                if not token.checkpoint():
+                    results.put((move, skipped))
+                    continue
+                try:
+                    results.put((move, self._try_move(move, destination_device)))
+                except Exception as e:
+                    results.put((move, f'Warning: Could not move {move.filename}: {e}'))
+        
+        submitted = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Start the slow cross-device copies first so they overlap with the renames
+            for (source_device, destination_device), group in sorted(
+                    queues.items(), key=lambda item: item[0][0] == item[0][1]):
+                if source_device == destination_device:
+                    for start in range(0, len(group), self.RENAME_BATCH_SIZE):
+                        executor.submit(run_batch, group[start:start + self.RENAME_BATCH_SIZE])
+                else:
+                    for item in group:
+                        executor.submit(run_batch, [item])
+                submitted += len(group)
+            
+            for _ in range(submitted):
+                outcome = results.get()
+                if outcome[1] is not skipped:
+                    yield outcome
+        
+        for move in deferred:
+            if not token.checkpoint():
+                return
+            yield move, self._try_move(move, device_of(os.path.dirname(move.destination)))
+
+    def _run_serial_moves(self, moves: Tuple['PlannedMove', ...],
+                          destination_devices: Dict[str, int]) -> Iterator[Tuple['PlannedMove', Optional[str]]]:
+        """Run moves one at a time in plan order, until ``self.cancel_token`` stops them."""
+        token = self.cancel_token
+        for move in moves:
+            if not token.checkpoint():
+                return
+            yield move, self._try_move(move, destination_devices.get(os.path.dirname(move.destination), -1))
+
+    def execute_plan(self, plan: 'MovePlan', file_list: Optional[List[Dict]] = None,
+                     workers: Optional[int] = None) -> int:
+        """
+        Carry out a MovePlan.
+        
+        The outcome of every move is stored in ``self.move_results`` as a
+        MoveResult whose error is the same warning text that is logged. Folders
+        that files were moved out of are collected in ``self.vacated_dirs``.
+        While a journal run is active (see _run_journaled), every outcome is
+        also written to the journal.
+        
+        Moves stop early when ``self.cancel_token`` is cancelled or out of
+        budget. The moves that were not attempted get a MoveResult with the
+        SKIPPED_MOVE error, but are not logged or journaled.
         
         Args:
-            folder_path: Path to validate
+            plan: Plan produced by plan_moves (or loaded with MovePlan.load)
+            file_list: The records the plan was made from. When given, their
+                filepath is updated after each successful move.
+            workers: Number of concurrent moves; defaults to ``self.move_workers``
+                (0 or 1 moves files one at a time)
             
         Returns:
-            bool: True if valid, False otherwise
+            Number of files moved
         """
-        if not folder_path or not folder_path.strip():
-            self._log_progress('Error: No folder path provided.')
-            return False
-            
-        if not os.path.exists(folder_path):
-            self._log_progress('Error: Path does not exist or is invalid!')
-            return False
+        if workers is None:
+            workers = self.move_workers
+        metrics = self.metrics
+        destination_devices = {}
+        with metrics.phase('mkdir'):
+            created = self._make_directories(plan.directories, {os.path.normpath(plan.root)})
+            for directory in plan.directories:
+                destination_devices[directory] = os.stat(directory).st_dev
+        metrics.count('directories_created', created)
+        metrics.count_syscall('stat', len(plan.directories))
+        
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        token = self.cancel_token
+        moves = plan.moves
+        files_left = token.files_left()
+        if files_left is not None and files_left < len(moves):
+            moves = moves[:files_left]
+        if workers > 1:
+            outcomes = self._run_concurrent_moves(moves, workers, destination_devices)
+        else:
+            outcomes = self._run_serial_moves(moves, destination_devices)
+        
+        total_files = plan.total_files
+        moves_total = len(plan.moves)
+        bytes_total = sum(move.size for move in plan.moves)
+        processed_files = 0
+        attempted_files = 0
+        bytes_done = 0
+        self.move_results = []
+        self.vacated_dirs = set()
+        self._emit_progress('move', 0, moves_total, 0, bytes_total, force=True)
+        for move, error in outcomes:
+            self.move_results.append(MoveResult(move, error))
+            if self.journal is not None:
+                self.journal.record(move.record_index, error)
+            attempted_files += 1
+            if error:
+                metrics.count('errors')
+                self._log_progress(error)
+                continue
+            if file_list is not None:
+                record = file_list[move.record_index]
+                record['filepath'] = move.destination
+                if isinstance(record, dict):
+                    # Renamed to avoid a clash; FileRecords take the name from the path
+                    record['filename'] = os.path.basename(move.destination)
+            processed_files += 1
+            bytes_done += move.size
+            self.vacated_dirs.add(os.path.dirname(move.source))
+            if self.log_each_file:
+                self._log_progress(f'Progress: {processed_files}/{total_files} - Moved {move.filename} to {move.bucket}/')
+            self._emit_progress('move', attempted_files, moves_total, bytes_done, bytes_total, move.destination)
+        self._emit_progress('move', attempted_files, moves_total, bytes_done, bytes_total, force=True)
+        token.files_done += attempted_files
+        if attempted_files < moves_total:
+            if not token.stopped:
+                token.stop(CancellationToken.FILE_BUDGET)
+            attempted = {result.move.record_index for result in self.move_results}
+            self.move_results.extend(MoveResult(move, SKIPPED_MOVE) for move in plan.moves
+                                     if move.record_index not in attempted)
+        metrics.count('files_moved', processed_files)
+        metrics.count('bytes_moved', bytes_done)
+        metrics.add_phase_time('move', time.perf_counter() - start_wall, time.process_time() - start_cpu)
+        return processed_files
+
+    def _run_journaled(self, plan: 'MovePlan', file_list: Optional[List[Dict]] = None,
+                       kind: Optional[str] = 'sort') -> int:
+        """
+        Execute a plan, recording it in the journal if there is one.
+        
+        Args:
+            plan: Plan to execute
+            file_list: Records to update, as for execute_plan
+            kind: Journal run kind ('sort', 'watch' or 'undo'), or None to
+                continue the last run in the journal (resume)
             
-        if not os.path.isdir(folder_path):
-            self._log_progress('Error: Path is not a directory!')
-            return False
+        Returns:
+            Number of files moved
+        """
+        if self.journal is None:
+            return self.execute_plan(plan, file_list)
+        if kind is None:
+            self.journal.reopen()
+        else:
+            self.journal.begin(plan.to_json(), kind)
+        try:
+            processed_files = self.execute_plan(plan, file_list)
+        except BaseException:
+            self.journal.close()
+            raise
+        if self.cancel_token.stopped:
+            # Leave the run open so that resume can finish it
+            self.journal.close()
+        else:
+            self.journal.finish()
+        return processed_files
+
+    def _read_journal(self, action: str):
+        """Return (journal run, its MovePlan), or (None, None) after logging why not."""
+        if self.journal is None:
+            self._log_progress(f'Error: Cannot {action} without a journal.')
+            return None, None
+        run = self.journal.read()
+        if run is None:
+            self._log_progress(f'Nothing to {action}: the journal is empty.')
+            return None, None
+        return run, MovePlan.from_dict(run.plan)
+
+    def resume(self, cancel_token: Optional[CancellationToken] = None) -> bool:
+        """
+        Finish the last journaled run if it was interrupted, without rescanning.
+        
+        Moves that the journal records as done or failed are not attempted
+        again. Moves whose source is gone and whose destination exists were
+        finished before their record reached the disk, and are recorded now.
+        
+        Args:
+            cancel_token: Token to stop or pause the run with (see sort_files)
             
-        self._log_progress('Path validated successfully.')
+        Returns:
+            bool: True if there was nothing to resume or the run was finished
+        """
+        self._begin_run('', 'resume', cancel_token)
+        success = False
+        try:
+            success = self._resume()
+        finally:
+            if self.scan_cache is not None:
+                self.scan_cache.invalidate()
+            self._finish_metrics(success)
+        return success
+
+    def _resume(self) -> bool:
+        """Finish the last journaled run, as described in resume."""
+        run, plan = self._read_journal('resume')
+        if run is None:
+            return self.journal is not None
+        self.metrics.root = plan.root
+        if run.complete:
+            self._log_progress('Nothing to resume: the last run completed.')
+            return True
+        
+        finished = set(run.done)
+        remaining = []
+        for move in plan.moves:
+            if move.record_index in run.done or move.record_index in run.failed:
+                continue
+            if not os.path.lexists(move.source) and os.path.lexists(move.destination):
+                finished.add(move.record_index)
+                continue
+            remaining.append(move)
+        
+        self._log_progress(f'Resuming {run.kind}: {len(remaining)} of {len(plan.moves)} moves left.')
+        self.journal.reopen()
+        for move in plan.moves:
+            if move.record_index in finished and move.record_index not in run.done:
+                self.journal.record(move.record_index)
+        self.journal.close()
+        
+        processed_files = self._run_journaled(plan._replace(moves=tuple(remaining)), kind=None)
+        self._log_progress(f'Files moved successfully. Processed {processed_files} out of {len(remaining)} files.')
+        
+        self._log_progress('Deleting empty folders...')
+        vacated_dirs = {os.path.dirname(move.source) for move in plan.moves if move.record_index in finished}
+        vacated_dirs.update(self.vacated_dirs)
+        self.delete_empty_folders(plan.root, None if self.full_cleanup else vacated_dirs)
+        if self.cancel_token.stopped:
+            self._log_progress(STOP_MESSAGES[self.cancel_token.stop_reason])
+            return not self.cancel_token.cancelled
+        self._log_progress('Resume completed successfully!')
+        self._emit_progress('done', processed_files, len(remaining), force=True)
         return True
 
-    def scan_files(self, folder_path: str) -> List[Dict]:
+    def undo(self, cancel_token: Optional[CancellationToken] = None) -> bool:
         """
-        Scan folder and generate list of all files with metadata.
+        Move every file of the last journaled run back where it came from.
+        
+        The reverse moves run in reverse order on the normal executor (so
+        ``move_workers`` applies) and are journaled as an 'undo' run; undoing
+        again redoes the run. A file whose original path has been taken in
+        the meantime is left where it is, with a warning. An undo that is
+        stopped early can be finished with resume.
         
         Args:
-            folder_path: Path to scan
+            cancel_token: Token to stop or pause the run with (see sort_files)
             
         Returns:
-            List of file dictionaries with metadata
+            bool: True if every file was moved back
         """
-        file_list = []
+        self._begin_run('', 'undo', cancel_token)
+        success = False
         try:
-            for root, dirs, files in os.walk(folder_path):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    try:
-                        file_list.append({
-                                'filepath': file_path,
-                                'filename': os.path.basename(file_path),
-                                'modified_time': os.path.getmtime(file_path),
-                                'file_extension': os.path.splitext(file_path)[1],
-                                'size': os.path.getsize(file_path)
-                            })
-                    except (OSError, PermissionError) as e:
-                        self._log_progress(f'Warning: Could not access file {file_path}: {e}')
-                        continue
-        except (OSError, PermissionError) as e:
-            self._log_progress(f'Error accessing folder {folder_path}: {e}')
-            return []
+            success = self._undo()
+        finally:
+            if self.scan_cache is not None:
+                self.scan_cache.invalidate()
+            self._finish_metrics(success)
+        return success
 
-        return file_list
+    def _undo(self) -> bool:
+        """Move the files of the last journaled run back, as described in undo."""
+        run, plan = self._read_journal('undo')
+        if run is None:
+            return False
+        self.metrics.root = plan.root
+        
+        moves = []
+        for move in reversed(plan.moves):
+            if move.record_index in run.done:
+                source_dir = os.path.dirname(move.source)
+                moves.append(PlannedMove(move.destination, move.source, move.filename,
+                                         os.path.relpath(source_dir, plan.root) if source_dir != plan.root else '.',
+                                         len(moves), -1, move.size))
+        if not moves:
+            self._log_progress('Nothing to undo: the last run moved no files.')
+            return True
+        
+        directories = tuple(sorted({os.path.dirname(move.destination) for move in moves}))
+        undo_plan = MovePlan(plan.root, (), directories, tuple(moves), len(moves))
+        self._log_progress(f'Undoing {run.kind}: moving {len(moves)} files back...')
+        processed_files = self._run_journaled(undo_plan, kind='undo')
+        self._log_progress(f'Moved {processed_files} out of {len(moves)} files back.')
+        self._log_progress('Deleting empty folders...')
+        self.delete_empty_folders(plan.root, None if self.full_cleanup else self.vacated_dirs)
+        if self.cancel_token.stopped:
+            self._log_progress(STOP_MESSAGES[self.cancel_token.stop_reason])
+        self._emit_progress('done', processed_files, len(moves), force=True)
+        return processed_files == len(moves)
 
-    def delete_empty_folders(self, folder_path: str):
-        """Delete empty folders in the directory tree."""
-        for dirpath, dirs, files in os.walk(folder_path, topdown=False):
-            if not dirs and not files:
-                try:
-                    os.rmdir(dirpath)
-                    self._log_progress(f'Deleted empty folder: {dirpath}')
-                except OSError as e:
-                    self._log_progress(f'Error deleting folder: {e}')
+    def _run_plan(self, plan: 'MovePlan', file_list: List[Dict], dry_run: bool) -> bool:
+        """Execute (or just report) a plan, then clean up empty folders."""
+        self.last_plan = plan
+        if self.duplicates == 'hardlink' and self.duplicate_groups:
+            self._link_duplicates(file_list, dry_run)
+        if dry_run:
+            self._log_progress('Dry run: no files will be moved.')
+            for move in plan.moves:
+                self._log_progress(f'Would move {move.source} to {move.bucket}/')
+            self._log_progress(f'Dry run complete. {len(plan.moves)} out of {plan.total_files} files would be moved.')
+            return True
+        
+        self._log_progress('Moving files to respective folders...')
+        processed_files = self._run_journaled(plan, file_list)
+        self._log_progress(f'Files moved successfully. Processed {processed_files} out of {plan.total_files} files.')
+        self._log_progress('Deleting empty folders...')
+        self._emit_progress('cleanup', processed_files, processed_files, current_path=plan.root, force=True)
+        self.delete_empty_folders(plan.root, None if self.full_cleanup else self.vacated_dirs)
+        return not self.cancel_token.cancelled
 
-    def sort_by_file_type(self, folder_path: str, file_list: List[Dict]) -> bool:
+    def sort_by_file_type(self, folder_path: str, file_list: List[Dict], dry_run: bool = False) -> bool:
         """
         Sort files by their file extensions.
         
         Args:
             folder_path: Target directory path
             file_list: List of file dictionaries
+            dry_run: Only report what would be moved
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
             self._log_progress('Sorting by file type...')
-            file_extensions = [file['file_extension'] for file in file_list]
-            
-            unique_extensions = set(file_extensions)
-            unique_extensions.discard('')  # Remove empty string for files with no extension
-            self._log_progress(f'Unique file extensions found: {unique_extensions}')
-            
-            self._log_progress('Moving files to respective folders...')
-            total_files = len(file_list)
-            processed_files = 0
-            
-            # Create No_Extension folder
-            no_ext_folder = os.path.join(folder_path, 'No_Extension')
-            os.makedirs(no_ext_folder, exist_ok=True)
-            
-            # Create extension folders
-            for ext in unique_extensions:
-                ext_folder = os.path.join(folder_path, ext.lstrip('.'))
-                os.makedirs(ext_folder, exist_ok=True)
-            
-            # Process each file
-            for file in file_list:
-                try:
-                    if file['file_extension']:  # File has extension
-                        target_folder = os.path.join(folder_path, file['file_extension'].lstrip('.'))
-                        target = os.path.join(target_folder, file['filename'])
-                        folder_name = file['file_extension'].lstrip('.')
-                    else:  # File has no extension
-                        target = os.path.join(no_ext_folder, file['filename'])
-                        folder_name = 'No_Extension'
-                    
-                    # Only move if not already in correct location
-                    if Path(file['filepath']).parent != Path(target).parent:
-                        shutil.move(file['filepath'], str(target))
-                        file['filepath'] = str(target)
-                        processed_files += 1
-                        self._log_progress(f'Progress: {processed_files}/{total_files} - Moved {file["filename"]} to {folder_name}/')
-                        
-                except (OSError, PermissionError, shutil.Error) as e:
-                    self._log_progress(f'Warning: Could not move {file["filename"]}: {e}')
-                    continue
-            
-            self._log_progress(f'Files moved successfully. Processed {processed_files} out of {total_files} files.')
-            self._log_progress('Deleting empty folders...')
-            self.delete_empty_folders(folder_path)
-            return True
+            plan = self._plan_sort(folder_path, file_list, self.file_type_bucket)
+            self._log_progress(f'Unique file extensions found: {set(plan.buckets)}')
+            return self._run_plan(plan, file_list, dry_run)
             
         except Exception as e:
             self._log_progress(f'Error during file type sorting: {e}')
             return False
 
-    def sort_by_date(self, folder_path: str, file_list: List[Dict]) -> bool:
+    def sort_by_date(self, folder_path: str, file_list: List[Dict], dry_run: bool = False) -> bool:
         """
         Sort files by their creation date.
         
         Args:
             folder_path: Target directory path
             file_list: List of file dictionaries
+            dry_run: Only report what would be moved
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
             self._log_progress('Sorting by date...')
-            date_to_files = {}
-            
-            for file in file_list:
-                creation_time = os.path.getctime(file['filepath'])
-                readable_time = time.ctime(creation_time)
-                file_date = readable_time[4:7] + '_' + readable_time[-4:]
-                if file_date not in date_to_files:
-                    date_to_files[file_date] = []
-                date_to_files[file_date].append(file)
-            
-            unique_dates = set(date_to_files.keys())
-            self._log_progress(f'Unique dates found: {unique_dates}')
-            self._log_progress('Moving files to respective folders...')
-            
-            total_files = len(file_list)
-            processed_files = 0
-            
-            for date, files in date_to_files.items():
-                date_folder = os.path.join(folder_path, date)
-                os.makedirs(date_folder, exist_ok=True)
-                for file in files:
-                    try:
-                        target = os.path.join(date_folder, file['filename'])
-                        target_path = Path(target)
-                        if Path(file['filepath']).parent != target_path.parent:
-                            shutil.move(file['filepath'], str(target))
-                            file['filepath'] = str(target)
-                            processed_files += 1
-                            self._log_progress(f'Progress: {processed_files}/{total_files} - Moved {file["filename"]} to {date}/')
-                    except (OSError, PermissionError, shutil.Error) as e:
-                        self._log_progress(f'Warning: Could not move {file["filename"]}: {e}')
-                        continue
-            
-            self._log_progress(f'Files moved successfully. Processed {processed_files} out of {total_files} files.')
-            self._log_progress('Deleting empty folders...')
-            self.delete_empty_folders(folder_path)
-            return True
+            plan = self._plan_sort(folder_path, file_list, self.date_bucket)
+            self._log_progress(f'Unique dates found: {set(plan.buckets)}')
+            return self._run_plan(plan, file_list, dry_run)
             
         except Exception as e:
             self._log_progress(f'Error during date sorting: {e}')
             return False
 
-    def sort_alphabetically(self, folder_path: str, file_list: List[Dict]) -> bool:
+    def sort_alphabetically(self, folder_path: str, file_list: List[Dict], dry_run: bool = False) -> bool:
         """
         Sort files alphabetically by their first character.
         
         Args:
             folder_path: Target directory path
             file_list: List of file dictionaries
+            dry_run: Only report what would be moved
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
             self._log_progress('Sorting alphabetically...')
-            file_names = [file['filename'] for file in file_list]
-            
-            alphabet_list = []
-            for file_name in file_names:
-                first_char = file_name[0].upper()
-                if first_char not in alphabet_list:
-                    alphabet_list.append(first_char)
-            
-            alphabet_list = sorted(alphabet_list)
-            self._log_progress(f'Unique starting characters found: {alphabet_list}')
-            self._log_progress('Moving files to respective folders...')
-            
-            total_files = len(file_list)
-            processed_files = 0
-            
-            # Create folders for each character
-            for char in alphabet_list:
-                char_folder = os.path.join(folder_path, char)
-                os.makedirs(char_folder, exist_ok=True)
-            
-            for file in file_list:
-                try:
-                    first_char = file['filename'][0].upper()
-                    char_folder = os.path.join(folder_path, first_char)
-                    target = os.path.join(char_folder, file['filename'])
-                    target_path = Path(target)
-                    
-                    if Path(file['filepath']).parent != target_path.parent:
-                        shutil.move(file['filepath'], str(target))
-                        file['filepath'] = str(target)
-                        processed_files += 1
-                        self._log_progress(f'Progress: {processed_files}/{total_files} - Moved {file["filename"]} to {first_char}/')
-                except (OSError, PermissionError, shutil.Error) as e:
-                    self._log_progress(f'Warning: Could not move {file["filename"]}: {e}')
-                    continue
-            
-            self._log_progress(f'Files moved successfully. Processed {processed_files} out of {total_files} files.')
-            self._log_progress('Deleting empty folders...')
-            self.delete_empty_folders(folder_path)
-            return True
+            plan = self._plan_sort(folder_path, file_list, self.alphabetical_bucket)
+            self._log_progress(f'Unique starting characters found: {sorted(plan.buckets)}')
+            return self._run_plan(plan, file_list, dry_run)
             
         except Exception as e:
             self._log_progress(f'Error during alphabetical sorting: {e}')
             return False
 
-    def sort_by_size(self, folder_path: str, file_list: List[Dict]) -> bool:
+    def sort_by_size(self, folder_path: str, file_list: List[Dict], dry_run: bool = False) -> bool:
         """
         Sort files by their size.
         
         Args:
             folder_path: Target directory path
             file_list: List of file dictionaries
+            dry_run: Only report what would be moved
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
             self._log_progress('Sorting by file size...')
+            plan = self._plan_sort(folder_path, file_list, self.size_bucket)
+            self._log_progress(f'Size categories found: {set(plan.buckets)}')
+            return self._run_plan(plan, file_list, dry_run)
             
-            def classify_file_size(size):
-                KB = 1024; MB = KB * 1024; GB = MB * 1024
-                if size < 10 * KB:
-                    return 'Tiny (<10KB)'
-                elif size < 1 * MB:
-                    return 'Small (10KB-1MB)'
-                elif size < 100 * MB:
-                    return 'Medium (1MB-100MB)'
-                elif size < 1 * GB:
-                    return 'Large (100MB-1GB)'
-                else:
-                    return 'Huge (>1GB)'
+        except Exception as e:
+            self._log_progress(f'Error during size sorting: {e}')
+            return False
+
+    def sort_by_rules(self, folder_path: str, file_list: List[Dict], dry_run: bool = False) -> bool:
+        """
+        Sort files with the rules loaded from ``rules_path``.
+        
+        Args:
+            folder_path: Target directory path
+            file_list: List of file dictionaries
+            dry_run: Only report what would be moved
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            self._log_progress(f'Sorting by rules from {self.rules.name}...')
+            plan = self._plan_sort(folder_path, file_list, self.rule_bucket)
+            self._log_progress(f'Rule folders used: {set(plan.buckets)}')
+            return self._run_plan(plan, file_list, dry_run)
+            
+        except Exception as e:
+            self._log_progress(f'Error during rule sorting: {e}')
+            return False
 
-            total_files = len(file_list)
-            processed_files = 0
+    def sort_hierarchically(self, folder_path: str, file_list: List[Dict], sorting_methods: List[str],
+                            dry_run: bool = False) -> bool:
+        """
+        Sort files into nested folders, one level per sorting method.
+        
+        The key functions of the methods are combined into one, so every file
+        is moved once, straight into its final folder (e.g. pdf/Oct_2026), and
+        each folder of the hierarchy is created once.
+        
+        Args:
+            folder_path: Target directory path
+            file_list: List of file dictionaries
+            sorting_methods: Keys of SORTING_METHODS, outermost level first
+            dry_run: Only report what would be moved
             
-            # Get all categories and create folders
-            categories = set()
-            for file in file_list:
-                categories.add(classify_file_size(file['size']))
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            sorting_method = self.COMPOSITE_SEPARATOR.join(sorting_methods)
+            self._log_progress(f'Sorting {sorting_method}...')
+            plan = self._plan_sort(folder_path, file_list, self.key_function(sorting_method))
+            self._log_progress(f'Nested folders found: {len(set(plan.buckets))}')
+            return self._run_plan(plan, file_list, dry_run)
             
-            for category in categories:
-                category_folder = os.path.join(folder_path, category)
-                os.makedirs(category_folder, exist_ok=True)
+        except Exception as e:
+            self._log_progress(f'Error during hierarchical sorting: {e}')
+            return False
+
+    @staticmethod
+    def classify_file_size(size: int) -> str:
+        """Get the size category folder name for a file size in bytes."""
+        KB = 1024; MB = KB * 1024; GB = MB * 1024
+        if size < 10 * KB:
+            return 'Tiny (<10KB)'
+        elif size < 1 * MB:
+            return 'Small (10KB-1MB)'
+        elif size < 100 * MB:
+            return 'Medium (1MB-100MB)'
+        elif size < 1 * GB:
+            return 'Large (100MB-1GB)'
+        else:
+            return 'Huge (>1GB)'
+
+    def file_type_bucket(self, file: Dict) -> str:
+        """
+        Get the destination folder name for a file when sorting by type.
+        
+        With content_types on, a file without an extension, or with one that
+        names no known format, goes to the folder of the type its header
+        identifies. A known extension is always kept, even if the header
+        suggests another type.
+        """
+        extension = file['file_extension'].lstrip('.')
+        if self.content_types:
+            from metadata import is_known_extension
+            if not (extension and is_known_extension(extension)):
+                kind = self._get_media_info(file).kind
+                if kind:
+                    return kind
+        if extension:
+            return extension
+        return 'No_Extension'
+
+    def date_bucket(self, file: Dict) -> str:
+        """
+        Get the destination folder name for a file when sorting by date.
+        
+        Uses the timestamp selected by ``self.date_source`` from the scan
+        record, so no extra stat is needed. 'birthtime' falls back to ctime on
+        platforms that do not report a creation time (e.g. Linux), and 'media'
+        falls back to ctime for files without a capture date in their header.
+        """
+        if self.date_source == 'mtime':
+            timestamp = file['modified_time']
+        else:
+            timestamp = None
+            if self.date_source == 'birthtime':
+                timestamp = file.get('birth_time')
+            elif self.date_source == 'media':
+                timestamp = self._get_media_info(file).capture_time
+            if timestamp is None:
+                timestamp = file.get('changed_time')
+            if timestamp is None:
+                timestamp = os.path.getctime(file['filepath'])
+        return self.date_bucketer.bucket(timestamp)
+
+    def method_signature(self, method_name: str) -> str:
+        """Describe a sorting method together with the options that change its buckets."""
+        if method_name == 'sort_by_date':
+            return f'{method_name}:{self.date_source}:{self.date_granularity}:{self.date_layout}'
+        if method_name == 'sort_by_file_type' and self.content_types:
+            from metadata import SNIFF_VERSION
+            return f'{method_name}:content:{SNIFF_VERSION}'
+        if method_name == 'sort_by_rules' and self.rules is not None:
+            return f'{method_name}:{self.rules.signature}'
+        return method_name
+
+    @classmethod
+    def split_sorting_method(cls, sorting_method: str) -> List[str]:
+        """Split a composite sorting method such as 'By File Type > By Date' into its methods."""
+        return [method.strip() for method in sorting_method.split(cls.COMPOSITE_SEPARATOR.strip())]
+
+    @classmethod
+    def is_valid_sorting_method(cls, sorting_method: str) -> bool:
+        """Check a sorting method, which may combine several different methods."""
+        methods = cls.split_sorting_method(sorting_method)
+        return all(method in cls.SORTING_METHODS for method in methods) and len(set(methods)) == len(methods)
+
+    def key_function(self, sorting_method: str) -> Callable[[Dict], Optional[str]]:
+        """Return the per-file destination folder function of a single or composite sorting method."""
+        functions = [getattr(self, self.BUCKET_FUNCTIONS[self.SORTING_METHODS[method]])
+                     for method in self.split_sorting_method(sorting_method)]
+        return functions[0] if len(functions) == 1 else CompositeKey(functions)
+
+    def sorting_signature(self, sorting_method: str) -> str:
+        """
+        Describe a single or composite sorting method together with its
+        options and the scan filter, which decides which files a run sees.
+        """
+        signature = '>'.join(self.method_signature(self.SORTING_METHODS[method])
+                             for method in self.split_sorting_method(sorting_method))
+        if self.scan_filter is not None:
+            signature += f'|scan:{self.scan_filter.signature}'
+        return signature
+
+    def _run_sorting_method(self, sorting_method: str, folder_path: str, file_list: List[Dict],
+                            dry_run: bool) -> bool:
+        """Sort scanned files with a single method, or hierarchically with a composite one."""
+        methods = self.split_sorting_method(sorting_method)
+        if len(methods) > 1:
+            return self.sort_hierarchically(folder_path, file_list, methods, dry_run=dry_run)
+        return getattr(self, self.SORTING_METHODS[methods[0]])(folder_path, file_list, dry_run=dry_run)
+
+    def alphabetical_bucket(self, file: Dict) -> str:
+        """Get the destination folder name for a file when sorting alphabetically."""
+        return file['filename'][0].upper()
+
+    def size_bucket(self, file: Dict) -> str:
+        """Get the destination folder name for a file when sorting by size."""
+        return self.classify_file_size(file['size'])
+
+    def rule_bucket(self, file: Dict) -> Optional[str]:
+        """
+        Get the destination folder name for a file when sorting by rules.
+        
+        Files that no rule matches go to the rule file's default folder, or
+        stay where they are if it has none (None).
+        """
+        return self.rules.classify(file)
+
+    def sort_files_streaming(self, folder_path: str, sorting_method: str) -> bool:
+        """
+        Sort files while the folder is still being scanned.
+        
+        Records from iter_files are moved as soon as they are produced, so memory
+        use does not grow with the size of the tree and the first file is moved
+        right after the first directory has been listed. Destination folders are
+        created on first use and never descended into.
+        
+        Scanning and moving are interleaved, so the time spent creating folders
+        and moving files is measured per call and the rest of the loop is
+        counted as the scan phase.
+        
+        Args:
+            folder_path: Path to the folder to sort
+            sorting_method: One of the keys from SORTING_METHODS, or several of
+                them joined by COMPOSITE_SEPARATOR ('By File Type > By Date')
             
-            for file in file_list:
+        Returns:
+            bool: True if sorting was successful, False otherwise
+        """
+        if not self._validate_sort(folder_path, sorting_method):
+            return False
+        
+        bucket_func = self.key_function(sorting_method)
+        self._log_progress('Scanning and moving files...')
+        
+        start_time = time.perf_counter()
+        self.stream_stats = {'files_seen': 0, 'files_moved': 0, 'bytes_moved': 0, 'first_move_seconds': None}
+        created_folders = set()
+        existing_folders = {os.path.normpath(folder_path)}
+        folder_devices = {}
+        vacated_dirs = set()
+        bytes_moved = 0
+        metrics = self.metrics
+        token = self.cancel_token
+        # Wall and CPU seconds of the mkdir and move calls
+        mkdir_time = [0.0, 0.0]
+        move_time = [0.0, 0.0]
+        loop_wall = time.perf_counter()
+        loop_cpu = time.process_time()
+        
+        try:
+            for file in self.iter_files(folder_path, skip_dirs=created_folders):
+                if not token.checkpoint():
+                    break
+                self.stream_stats['files_seen'] += 1
                 try:
-                    category = classify_file_size(file['size'])
-                    category_folder = os.path.join(folder_path, category)
-                    target = os.path.join(category_folder, file['filename'])
-                    target_path = Path(target)
+                    bucket = bucket_func(file)
+                    if bucket is None:
+                        continue
+                    target_folder = os.path.normpath(os.path.join(folder_path, bucket))
+                    if target_folder not in created_folders:
+                        call_wall = time.perf_counter()
+                        call_cpu = time.process_time()
+                        created = self._make_directories((target_folder,), existing_folders)
+                        created_folders.add(target_folder)
+                        folder_devices[target_folder] = os.stat(target_folder).st_dev
+                        mkdir_time[0] += time.perf_counter() - call_wall
+                        mkdir_time[1] += time.process_time() - call_cpu
+                        metrics.count('directories_created', created)
+                        metrics.count_syscall('stat')
                     
-                    if Path(file['filepath']).parent != target_path.parent:
-                        shutil.move(file['filepath'], str(target))
-                        file['filepath'] = str(target)
-                        processed_files += 1
-                        self._log_progress(f'Progress: {processed_files}/{total_files} - Moved {file["filename"]} to {category}/')
+                    # Only move if not already in correct location
+                    if os.path.normpath(os.path.dirname(file['filepath'])) != target_folder:
+                        if token.files_left() == 0:
+                            token.stop(CancellationToken.FILE_BUDGET)
+                            break
+                        token.files_done += 1
+                        call_wall = time.perf_counter()
+                        call_cpu = time.process_time()
+                        try:
+                            target = self._move_to_free_name(file, target_folder, folder_devices[target_folder])
+                        finally:
+                            elapsed = time.perf_counter() - call_wall
+                            move_time[0] += elapsed
+                            move_time[1] += time.process_time() - call_cpu
+                            metrics.move_latency.observe(elapsed)
+                        vacated_dirs.add(os.path.dirname(file['filepath']))
+                        file['filepath'] = target
+                        file['filename'] = os.path.basename(target)
+                        self.stream_stats['files_moved'] += 1
+                        bytes_moved += file['size']
+                        self.stream_stats['bytes_moved'] = bytes_moved
+                        if self.stream_stats['first_move_seconds'] is None:
+                            self.stream_stats['first_move_seconds'] = time.perf_counter() - start_time
+                        if self.log_each_file:
+                            self._log_progress(f'Progress: {self.stream_stats["files_moved"]} - Moved {file["filename"]} to {bucket}/')
+                        self._emit_progress('move', self.stream_stats['files_moved'], bytes_done=bytes_moved,
+                                            current_path=target)
                 except (OSError, PermissionError, shutil.Error) as e:
+                    metrics.count('errors')
                     self._log_progress(f'Warning: Could not move {file["filename"]}: {e}')
                     continue
-            
-            self._log_progress(f'Files moved successfully. Processed {processed_files} out of {total_files} files.')
-            self._log_progress('Deleting empty folders...')
-            self.delete_empty_folders(folder_path)
-            return True
-            
         except Exception as e:
-            self._log_progress(f'Error during size sorting: {e}')
+            self._log_progress(f'Error during streaming sort: {e}')
+            return False
+        finally:
+            metrics.add_phase_time('scan', time.perf_counter() - loop_wall - mkdir_time[0] - move_time[0],
+                                   time.process_time() - loop_cpu - mkdir_time[1] - move_time[1])
+            metrics.add_phase_time('mkdir', *mkdir_time)
+            metrics.add_phase_time('move', *move_time)
+            metrics.add_scan_stats(self.scan_stats)
+            metrics.count('files_moved', self.stream_stats['files_moved'])
+            metrics.count('bytes_moved', bytes_moved)
+        
+        if not self.stream_stats['files_seen'] and not token.stopped:
+            self._log_progress('No files found in the specified folder or unable to access files.')
+            return False
+        
+        self._log_progress(f'Files moved successfully. Processed {self.stream_stats["files_moved"]} out of {self.stream_stats["files_seen"]} files.')
+        self._log_progress('Deleting empty folders...')
+        self._emit_progress('cleanup', self.stream_stats['files_moved'], self.stream_stats['files_moved'],
+                            bytes_moved, bytes_moved, folder_path, force=True)
+        self.delete_empty_folders(folder_path, None if self.full_cleanup else vacated_dirs)
+        self._log_outcome(not token.cancelled)
+        if token.cancelled:
             return False
+        self._emit_progress('done', self.stream_stats['files_moved'], self.stream_stats['files_moved'],
+                            bytes_moved, bytes_moved, force=True)
+        return True
+
+    def _sort_files_incremental(self, folder_path: str, sorting_method: str,
+                                dry_run: bool, full_rescan: bool) -> bool:
+        """Sort only the files that are new or changed according to the index."""
+        from file_index import IncrementalRun
+        
+        if not self._validate_sort(folder_path, sorting_method):
+            return False
+        
+        run = IncrementalRun(self.file_index, self, folder_path,
+                             self.sorting_signature(sorting_method), full_rescan)
+        
+        self._log_progress('Scanning for new or changed files...')
+        with self.metrics.phase('scan'):
+            file_list = run.scan()
+        self.incremental_stats = run.stats
+        self.metrics.add_scan_stats(self.scan_stats)
+        if self.cancel_token.stopped:
+            # The index is left as it was, so the next run lists the same folders
+            self._log_outcome(False)
+            return not self.cancel_token.cancelled
+        self._log_progress(f'Listed {run.stats["directories_listed"]} folders, skipped '
+                           f'{run.stats["directories_skipped"]} unchanged folders.')
+        
+        if not file_list:
+            if not dry_run:
+                run.commit([], MovePlan(run.root, (), (), (), 0), [])
+            self._log_progress('No new or changed files since the last run.')
+            return True
+        
+        self._log_progress(f'Found {len(file_list)} new or changed files to sort.')
+        self.move_results = []
+        success = self._run_sorting_method(sorting_method, run.root, file_list, dry_run)
+        
+        # A cancelled run still records the files it moved; skipped ones count as failed
+        if (success or self.cancel_token.cancelled) and not dry_run:
+            run.commit(file_list, self.last_plan, self.move_results)
+        if success:
+            self._emit_progress('done', len(file_list), len(file_list), force=True)
+        self._log_outcome(success)
+        
+        return success
 
-    def sort_files(self, folder_path: str, sorting_method: str) -> bool:
+    def sort_files(self, folder_path: str, sorting_method: str, streaming: bool = False,
+                   dry_run: bool = False, full_rescan: bool = False,
+                   cancel_token: Optional[CancellationToken] = None) -> bool:
         """
         Main method to sort files using the specified method.
         
         Args:
             folder_path: Path to the folder to sort
-            sorting_method: One of the keys from SORTING_METHODS
+            sorting_method: One of the keys from SORTING_METHODS, or several of
+                them joined by COMPOSITE_SEPARATOR ('By File Type > By Date')
+            streaming: Move files while scanning instead of scanning everything first
+                (ignored when duplicate detection or the journal is on)
+            dry_run: Plan the sort and report it without moving anything
+                (takes precedence over streaming)
+            full_rescan: With an index, list every directory and re-check every
+                file instead of skipping unchanged ones
+            cancel_token: Token another thread can use to cancel or pause the
+                sort. By default a new token is made with ``self.time_budget``
+                and ``self.max_files``; the token in use is ``self.cancel_token``.
             
         Returns:
-            bool: True if sorting was successful, False otherwise
+            bool: True if sorting was successful, False otherwise. A sort that
+            ran out of budget counts as successful; a cancelled one does not.
         """
+        self._begin_run(folder_path, sorting_method, cancel_token)
+        success = False
+        try:
+            if self.file_index is not None:
+                success = self._sort_files_incremental(folder_path, sorting_method, dry_run, full_rescan)
+            # Duplicates can only be found, and moves only be journaled, once the
+            # whole tree has been scanned
+            elif streaming and not dry_run and not self.duplicates and self.journal is None:
+                success = self.sort_files_streaming(folder_path, sorting_method)
+            else:
+                success = self._sort_files_scanned(folder_path, sorting_method, dry_run)
+        finally:
+            if self.scan_cache is not None and not dry_run:
+                # The cached records now describe files that have been moved
+                self.scan_cache.invalidate(folder_path)
+            self._finish_metrics(success)
+        return success
+
+    def _begin_run(self, folder_path: str, method: str, cancel_token: Optional[CancellationToken]):
+        """Start fresh metrics and make the cancellation token of a new run current."""
+        self.metrics = SortMetrics(folder_path, method)
+        self.folder_path = folder_path
+        if self.rules is not None and folder_path:
+            self.rules.start(folder_path)
+        if cancel_token is None:
+            cancel_token = CancellationToken(self.time_budget, self.max_files)
+        self.cancel_token = cancel_token
+
+    def _log_outcome(self, success: bool):
+        """Log how a sort ended."""
+        if self.cancel_token.stopped:
+            self._log_progress(STOP_MESSAGES[self.cancel_token.stop_reason])
+        elif success:
+            self._log_progress('Sorting operation completed successfully!')
+        else:
+            self._log_progress('Sorting operation failed.')
+
+    def _validate_sort(self, folder_path: str, sorting_method: str) -> bool:
+        """Check the folder and the sorting method, timed as the validate phase."""
+        with self.metrics.phase('validate'):
+            if not self.validate_folder_path(folder_path):
+                return False
+            
+            if not self.is_valid_sorting_method(sorting_method):
+                self._log_progress(f'Error: Invalid sorting method "{sorting_method}"')
+                return False
+            
+            methods = self.split_sorting_method(sorting_method)
+            if self.rules is None and any(self.SORTING_METHODS[method] == 'sort_by_rules' for method in methods):
+                self._log_progress('Error: Sorting by rules needs a rule file')
+                return False
+        return True
+
+    def _finish_metrics(self, success: bool):
+        """Close the current run's metrics and write the Prometheus textfile, if configured."""
+        self.metrics.finish(success)
+        if self.metrics_path:
+            try:
+                self.metrics.write_prometheus(self.metrics_path)
+            except OSError as e:
+                self._log_progress(f'Warning: Could not write metrics to {self.metrics_path}: {e}')
+
+    def _sort_files_scanned(self, folder_path: str, sorting_method: str, dry_run: bool) -> bool:
+        """Scan the whole folder, then sort it with the chosen method."""
         # Validate inputs
-        if not self.validate_folder_path(folder_path):
-            return False
-        
-        if sorting_method not in self.SORTING_METHODS:
-            self._log_progress(f'Error: Invalid sorting method "{sorting_method}"')
+        if not self._validate_sort(folder_path, sorting_method):
             return False
         
         # Scan files
         self._log_progress('Scanning files...')
-        file_list = self.scan_files(folder_path)
+        with self.metrics.phase('scan'):
+            # Cached scans are kept compact, so reuse them in that form
+            file_list = self.scan_files(folder_path, compact=self.scan_cache is not None)
+        self.metrics.add_scan_stats(self.scan_stats)
+        
+        # Nothing has been moved yet, so a scan that was stopped is not sorted at all
+        if self.cancel_token.stopped:
+            self._log_outcome(False)
+            return not self.cancel_token.cancelled
         
         if not file_list:
             self._log_progress('No files found in the specified folder or unable to access files.')
@@ -389,21 +2858,18 @@ class FileSorterApp:
         self._log_progress(f'Found {len(file_list)} files to sort.')
         
         # Execute sorting method
-        method_name = self.SORTING_METHODS[sorting_method]
-        method = getattr(self, method_name)
-        success = method(folder_path, file_list)
+        success = self._run_sorting_method(sorting_method, folder_path, file_list, dry_run)
         
+        self._log_outcome(success)
         if success:
-            self._log_progress('Sorting operation completed successfully!')
-        else:
-            self._log_progress('Sorting operation failed.')
+            self._emit_progress('done', len(file_list), len(file_list), force=True)
             
         return success
 
     @staticmethod
     def get_available_sorting_methods() -> List[str]:
-        """Get list of available sorting methods."""
-        return list(FileSorterApp.SORTING_METHODS.keys())
+        """Get list of available sorting methods, followed by the composite presets."""
+        return list(FileSorterApp.SORTING_METHODS.keys()) + list(FileSorterApp.COMPOSITE_PRESETS)
 
 # CLI Interface Functions (for backward compatibility)
 def select_sorting_method():
@@ -429,14 +2895,31 @@ def select_sorting_method():
 
 
 def main():
-    """Main function for CLI usage."""
+    """
+    Main function for CLI usage.
+    
+    Without arguments, asks for a sorting method and folder. With arguments,
+    runs the non-interactive batch command (see batch.py).
+    """
+    if len(sys.argv) > 1:
+        from batch import main as batch_main
+        sys.exit(batch_main())
+    
     try:
         # Get user input
         sorting_method = select_sorting_method()
         folder_path = input('Type in your desired folder path: ').strip()
+        rules_path = None
+        if any(FileSorterApp.SORTING_METHODS[method] == 'sort_by_rules'
+               for method in FileSorterApp.split_sorting_method(sorting_method)):
+            rules_path = input('Type in the path of your rule file (TOML or JSON): ').strip()
         
         # Create FileSorter instance
-        sorter = FileSorterApp()
+        try:
+            sorter = FileSorterApp(rules_path=rules_path)
+        except (OSError, ValueError) as e:
+            print(f'Could not load rules: {e}')
+            exit(1)
         
         # Sort files
         success = sorter.sort_files(folder_path, sorting_method)
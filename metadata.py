@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Content Type and Media Date Extraction
+
+Reads a small, bounded part of each file to find out what it really is
+(magic bytes) and when a photo or video was taken (EXIF DateTimeOriginal,
+or the creation time in an MP4/QuickTime movie header). Results are cached
+by (inode, size, mtime), optionally in a SQLite database, so files that
+have not changed are never read again.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import time
+import struct
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Iterable, NamedTuple
+
+# Bytes read to recognize a file type
+SNIFF_SIZE = 4096
+
+# Bytes read from JPEG and TIFF files, whose EXIF block sits near the start
+HEADER_SIZE = 64 * 1024
+
+# Top-level atoms inspected when looking for an MP4 movie header
+MAX_ATOMS = 64
+
+# Seconds between the MP4 epoch (1904-01-01) and the Unix epoch
+MP4_EPOCH_OFFSET = 2082844800
+
+# Version of the detection rules below. Cached results and index entries made
+# with other rules are not reused.
+SNIFF_VERSION = 2
+
+# (offset, magic bytes, type) checked in order. Every signature is at least
+# four bytes, or three bytes that cannot start a text file, so that ordinary
+# text is never mistaken for a binary format. Shorter magic numbers (MZ, gzip,
+# MPEG audio frames, bzip2) are checked with their following fields in
+# sniff_type.
+MAGIC_NUMBERS = (
+    (0, b'\xff\xd8\xff', 'jpg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'png'),
+    (0, b'GIF87a', 'gif'),
+    (0, b'GIF89a', 'gif'),
+    (0, b'%PDF-', 'pdf'),
+    (0, b'II*\x00', 'tiff'),
+    (0, b'MM\x00*', 'tiff'),
+    (0, b'8BPS\x00\x01', 'psd'),
+    (0, b'8BPS\x00\x02', 'psd'),
+    (0, b'PK\x03\x04', 'zip'),
+    (0, b'PK\x05\x06', 'zip'),
+    (0, b'Rar!\x1a\x07', 'rar'),
+    (0, b"7z\xbc\xaf'\x1c", '7z'),
+    (0, b'\x1f\x8b\x08', 'gz'),
+    (0, b'\xfd7zXZ\x00', 'xz'),
+    (0, b'ID3\x02', 'mp3'),
+    (0, b'ID3\x03', 'mp3'),
+    (0, b'ID3\x04', 'mp3'),
+    (0, b'fLaC\x00', 'flac'),
+    (0, b'fLaC\x80', 'flac'),
+    (0, b'OggS\x00', 'ogg'),
+    (0, b'\x1a\x45\xdf\xa3', 'mkv'),
+    (0, b'SQLite format 3\x00', 'sqlite'),
+    (0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'doc'),
+    (0, b'\x7fELF', 'elf'),
+    (0, b'wOFF\x00\x01\x00\x00', 'woff'),
+    (0, b'wOFFOTTO', 'woff'),
+    (0, b'wOF2\x00\x01\x00\x00', 'woff2'),
+    (0, b'wOF2OTTO', 'woff2'),
+    (0, b'OTTO\x00', 'otf'),
+)
+
+# Block magic that follows "BZh" and the block size digit in a bzip2 stream,
+# for a first block and for an empty stream
+BZIP2_BLOCK_MAGICS = (b'1AY&SY', b'\x17rE8P\x90')
+
+# RIFF containers, by the form type at offset 8
+RIFF_TYPES = {b'WEBP': 'webp', b'WAVE': 'wav', b'AVI ': 'avi'}
+
+# ISO base media files, by the major brand at offset 8
+FTYP_BRANDS = {
+    b'qt  ': 'mov',
+    b'heic': 'heic', b'heix': 'heic', b'mif1': 'heic', b'msf1': 'heic',
+    b'avif': 'avif',
+    b'M4A ': 'm4a',
+}
+
+# Extensions that are correct for a detected type, other than the type itself.
+# A file whose extension is listed here keeps it.
+COMPATIBLE_EXTENSIONS = {
+    'jpg': {'jpeg', 'jpe', 'jfif'},
+    'pdf': {'ai'},
+    'tiff': {'tif', 'dng', 'cr2', 'nef', 'arw', 'orf', 'rw2', 'pef', 'srw'},
+    'zip': {'docx', 'docm', 'dotx', 'dotm', 'xlsx', 'xlsm', 'xlsb', 'xltx', 'xltm',
+            'pptx', 'pptm', 'potx', 'potm', 'ppsx', 'ppsm', 'vsdx', 'xps', 'oxps',
+            'odt', 'ods', 'odp', 'odg', 'odf', 'odc', 'odb', 'ott', 'ots', 'otp', 'otg',
+            'epub', 'jar', 'war', 'ear', 'aar', 'apk', 'aab', 'whl', 'xpi', 'crx', 'ipa',
+            'appx', 'msix', 'cbz', 'kmz', 'nupkg', 'vsix', 'numbers', 'pages', 'key',
+            'sketch', '3mf', 'usdz', 'kra', 'ora', 'idml'},
+    'mp4': {'m4v', 'm4a', 'm4b', '3gp', '3g2'},
+    'mov': {'qt'},
+    'heic': {'heif'},
+    'mkv': {'webm', 'mka', 'mk3d'},
+    'ogg': {'oga', 'ogv', 'opus', 'spx'},
+    'gz': {'tgz'},
+    'bz2': {'tbz', 'tbz2'},
+    'xz': {'txz'},
+    'exe': {'dll', 'sys', 'scr', 'ocx', 'cpl', 'efi'},
+    'doc': {'xls', 'xlt', 'xla', 'ppt', 'pot', 'pps', 'dot', 'msg', 'msi', 'vsd', 'pub'},
+    'elf': {'so', 'o', 'ko', 'out', 'bin'},
+    'sqlite': {'sqlite3', 'db', 'db3'},
+    'psd': {'psb'},
+    'mp3': {'mp2'},
+}
+
+# Common extensions of formats that have no magic number above (text, code,
+# markup and so on). Together with the detected types and COMPATIBLE_EXTENSIONS
+# they make up the known extensions, which a detected type never overrides.
+COMMON_EXTENSIONS = {
+    'txt', 'text', 'log', 'md', 'markdown', 'rst', 'csv', 'tsv', 'json', 'jsonl', 'xml',
+    'yaml', 'yml', 'toml', 'ini', 'cfg', 'conf', 'env', 'html', 'htm', 'xhtml', 'css',
+    'svg', 'rtf', 'tex', 'bib', 'srt', 'vtt', 'ics', 'vcf', 'eml', 'mbox',
+    'py', 'pyw', 'pyi', 'js', 'mjs', 'cjs', 'ts', 'tsx', 'jsx', 'c', 'h', 'cpp', 'cc',
+    'hpp', 'cs', 'java', 'kt', 'go', 'rs', 'rb', 'php', 'pl', 'lua', 'swift', 'sh',
+    'bash', 'zsh', 'ps1', 'bat', 'cmd', 'sql', 'r', 'ipynb',
+    'eps', 'ps', 'indd', 'raw', 'ico', 'icns', 'cur', 'ttf', 'ttc',
+    'aac', 'aiff', 'aif', 'wma', 'mid', 'midi', 'wmv', 'flv', 'mpg', 'mpeg', 'm2ts',
+    'iso', 'img', 'dmg', 'tar', 'deb', 'rpm', 'cab', 'torrent', 'lnk', 'url', 'dat', 'tmp',
+    'bak', 'part', 'crdownload', 'download', 'pem', 'crt', 'key', 'pub', 'asc', 'gpg',
+}
+
+KNOWN_EXTENSIONS = frozenset(
+    COMMON_EXTENSIONS | {kind for _, _, kind in MAGIC_NUMBERS}
+    | set(RIFF_TYPES.values()) | set(FTYP_BRANDS.values())
+    | {'mp4', 'exe', 'bz2', 'bmp'}
+    | {extension for extensions in COMPATIBLE_EXTENSIONS.values() for extension in extensions}
+)
+
+# EXIF tags
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+
+
+class MediaInfo(NamedTuple):
+    """What a file's header says about it."""
+    kind: Optional[str]
+    capture_time: Optional[float]
+
+
+UNKNOWN = MediaInfo(None, None)
+
+
+def sniff_type(header: bytes) -> Optional[str]:
+    """Return the type (as a lowercase extension) that a file header belongs to, if known."""
+    if header[:4] == b'RIFF':
+        return RIFF_TYPES.get(header[8:12])
+    if header[4:8] == b'ftyp':
+        return FTYP_BRANDS.get(header[8:12], 'mp4')
+    for offset, magic, kind in MAGIC_NUMBERS:
+        if header.startswith(magic, offset):
+            return kind
+    if header[:2] == b'MZ' and _is_portable_executable(header):
+        return 'exe'
+    if header[:3] == b'BZh' and header[3:4].isdigit() and header[4:10] in BZIP2_BLOCK_MAGICS:
+        return 'bz2'
+    if _is_mpeg_audio_frame(header):
+        return 'mp3'
+    if header[:2] == b'BM' and header[6:10] == b'\x00\x00\x00\x00' and len(header) > 26:
+        return 'bmp'
+    return None
+
+
+def _is_portable_executable(header: bytes) -> bool:
+    """Whether an MZ header points to a PE signature, as Windows programs do."""
+    if len(header) < 64:
+        return False
+    pe_offset = struct.unpack_from('<I', header, 60)[0]
+    return header[pe_offset:pe_offset + 4] == b'PE\x00\x00'
+
+
+def _is_mpeg_audio_frame(header: bytes) -> bool:
+    """Whether a header starts with a valid MPEG-1 Layer III frame header (an MP3 without ID3 tag)."""
+    if len(header) < 4 or header[0] != 0xFF or header[1] not in (0xFB, 0xFA):
+        return False
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x3
+    return 0 < bitrate_index < 15 and sample_rate_index != 3
+
+
+def is_known_extension(extension: str) -> bool:
+    """Whether an extension (without the dot) names a format well enough to be trusted over the header."""
+    return extension.lower() in KNOWN_EXTENSIONS
+
+
+def extension_matches(extension: str, kind: str) -> bool:
+    """Whether a file extension (without the dot) is correct for a detected type."""
+    extension = extension.lower()
+    return extension == kind or extension in COMPATIBLE_EXTENSIONS.get(kind, ())
+
+
+def _parse_exif_time(value: bytes) -> Optional[float]:
+    """Convert an EXIF 'YYYY:MM:DD HH:MM:SS' local time to a timestamp."""
+    try:
+        return time.mktime(time.strptime(value[:19].decode('ascii'), '%Y:%m:%d %H:%M:%S'))
+    except (ValueError, OverflowError, UnicodeDecodeError):
+        return None
+
+
+def _read_ifd(tiff: bytes, offset: int, order: str) -> Dict[int, Tuple[int, int, int]]:
+    """Return {tag: (type, count, value or offset)} for one TIFF image file directory."""
+    entries = {}
+    if offset <= 0 or offset + 2 > len(tiff):
+        return entries
+    count = struct.unpack_from(order + 'H', tiff, offset)[0]
+    for i in range(count):
+        start = offset + 2 + i * 12
+        if start + 12 > len(tiff):
+            break
+        tag, value_type, value_count, value = struct.unpack_from(order + 'HHII', tiff, start)
+        entries[tag] = (value_type, value_count, value)
+    return entries
+
+
+def exif_capture_time(tiff: bytes) -> Optional[float]:
+    """
+    Find the capture time in a TIFF-structured EXIF block.
+
+    Prefers DateTimeOriginal, then DateTimeDigitized, then the IFD0 DateTime.
+    """
+    if tiff[:2] == b'II':
+        order = '<'
+    elif tiff[:2] == b'MM':
+        order = '>'
+    else:
+        return None
+    try:
+        ifd0 = _read_ifd(tiff, struct.unpack_from(order + 'I', tiff, 4)[0], order)
+        exif_pointer = ifd0.get(TAG_EXIF_IFD)
+        exif_ifd = _read_ifd(tiff, exif_pointer[2], order) if exif_pointer else {}
+        for ifd, tag in ((exif_ifd, TAG_DATETIME_ORIGINAL), (exif_ifd, TAG_DATETIME_DIGITIZED),
+                         (ifd0, TAG_DATETIME)):
+            entry = ifd.get(tag)
+            # ASCII values of 19 characters plus a terminator live at an offset
+            if entry is not None and entry[1] >= 19:
+                timestamp = _parse_exif_time(tiff[entry[2]:entry[2] + 19])
+                if timestamp is not None:
+                    return timestamp
+    except struct.error:
+        pass
+    return None
+
+
+def jpeg_capture_time(header: bytes) -> Optional[float]:
+    """Find the EXIF capture time in the APP1 segment of a JPEG header."""
+    position = 2
+    while position + 4 <= len(header) and header[position] == 0xFF:
+        marker = header[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image, or start of the compressed data
+            break
+        length = struct.unpack_from('>H', header, position + 2)[0]
+        if marker == 0xE1 and header[position + 4:position + 10] == b'Exif\x00\x00':
+            return exif_capture_time(header[position + 10:position + 2 + length])
+        position += 2 + length
+    return None
+
+
+def mp4_capture_time(f) -> Optional[float]:
+    """Find the creation time in the movie header (moov/mvhd) of an open MP4 or QuickTime file."""
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    offset = 0
+    for _ in range(MAX_ATOMS):
+        if offset + 8 > file_size:
+            break
+        f.seek(offset)
+        atom = f.read(16)
+        size, atom_type = struct.unpack_from('>I4s', atom)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', atom, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_size:
+            break
+        if atom_type == b'moov':
+            f.seek(offset + header_size)
+            moov = f.read(min(size - header_size, SNIFF_SIZE))
+            child = 0
+            while child + 8 <= len(moov):
+                child_size, child_type = struct.unpack_from('>I4s', moov, child)
+                if child_type == b'mvhd':
+                    version = moov[child + 8]
+                    if version == 1:
+                        created = struct.unpack_from('>Q', moov, child + 12)[0]
+                    else:
+                        created = struct.unpack_from('>I', moov, child + 12)[0]
+                    # Zero means "not set"
+                    return created - MP4_EPOCH_OFFSET if created > MP4_EPOCH_OFFSET else None
+                if child_size < 8:
+                    break
+                child += child_size
+            return None
+        offset += size
+    return None
+
+
+def read_media_info(path: str) -> Optional[MediaInfo]:
+    """
+    Read a file's type and capture time from its header.
+
+    At most HEADER_SIZE bytes are read, plus a few atom headers for movies.
+    Returns None if the file cannot be read.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(SNIFF_SIZE)
+            kind = sniff_type(header)
+            capture_time = None
+            if kind == 'jpg':
+                header += f.read(HEADER_SIZE - len(header))
+                capture_time = jpeg_capture_time(header)
+            elif kind == 'tiff':
+                header += f.read(HEADER_SIZE - len(header))
+                capture_time = exif_capture_time(header)
+            elif kind in ('mp4', 'mov', 'm4a'):
+                capture_time = mp4_capture_time(f)
+    except OSError:
+        return None
+    except (struct.error, IndexError):
+        # Truncated or malformed metadata; the type is still known
+        return MediaInfo(kind, None)
+    return MediaInfo(kind, capture_time)
+
+
+class MetadataCache:
+    """
+    MediaInfo results keyed by (inode, size, mtime).
+
+    Always kept in memory; with a db_path, also stored in a SQLite database
+    so that later runs can reuse them.
+    """
+
+    # The table name carries SNIFF_VERSION, so results of older detection
+    # rules are never read back
+    TABLE = f'media_v{SNIFF_VERSION}'
+
+    SCHEMA = f'''
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            kind TEXT,
+            capture_time REAL,
+            PRIMARY KEY (inode, size, mtime)
+        );
+    '''
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Optional path of the SQLite database file
+        """
+        self.db_path = db_path
+        self.entries = {}
+        self._lock = threading.Lock()
+        self.connection = None
+        if db_path:
+            self.connection = sqlite3.connect(db_path, check_same_thread=False)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.executescript(self.SCHEMA)
+            self.connection.commit()
+
+    def get(self, key: Tuple[int, int, float]) -> Optional[MediaInfo]:
+        """Return the cached MediaInfo for a key, or None."""
+        info = self.entries.get(key)
+        if info is None and self.connection is not None:
+            with self._lock:
+                row = self.connection.execute(
+                    f'SELECT kind, capture_time FROM {self.TABLE} WHERE inode = ? AND size = ? AND mtime = ?', key
+                ).fetchone()
+            if row is not None:
+                info = MediaInfo(row[0], row[1])
+                self.entries[key] = info
+        return info
+
+    def put_many(self, items: List[Tuple[Tuple[int, int, float], MediaInfo]]):
+        """Store several results in a single transaction."""
+        for key, info in items:
+            self.entries[key] = info
+        if self.connection is not None and items:
+            with self._lock, self.connection:
+                self.connection.executemany(
+                    f'INSERT OR REPLACE INTO {self.TABLE} VALUES (?, ?, ?, ?, ?)',
+                    (key + tuple(info) for key, info in items)
+                )
+
+    def close(self):
+        """Close the database connection, if any."""
+        if self.connection is not None:
+            with self._lock:
+                self.connection.close()
+            self.connection = None
+
+
+class MetadataExtractor:
+    """Reads MediaInfo for many files at once, using the cache and a thread pool."""
+
+    def __init__(self, cache: Optional[MetadataCache] = None, workers: int = 8):
+        """
+        Args:
+            cache: Cache to read from and update (an in-memory one by default)
+            workers: Number of threads reading file headers
+        """
+        self.cache = cache or MetadataCache()
+        self.workers = workers
+        self.stats = {'cache_hits': 0, 'header_reads': 0}
+
+    @staticmethod
+    def cache_key(file: Dict) -> Tuple[int, int, float]:
+        """Return the cache key of a scan record."""
+        return (file.get('inode', 0), file['size'], file['modified_time'])
+
+    def get(self, file: Dict) -> MediaInfo:
+        """Return the MediaInfo of a single scan record."""
+        key = self.cache_key(file)
+        info = self.cache.get(key) if key[0] else None
+        if info is not None:
+            self.stats['cache_hits'] += 1
+            return info
+        info = read_media_info(file['filepath'])
+        self.stats['header_reads'] += 1
+        if info is None:
+            return UNKNOWN
+        if key[0]:
+            self.cache.put_many([(key, info)])
+        return info
+
+    def extract(self, file_list: Iterable[Dict]) -> Dict[str, MediaInfo]:
+        """
+        Return {filepath: MediaInfo} for every record.
+
+        Cached results are used as they are; the headers of all other files are
+        read on the thread pool and the results stored in one batch. Files that
+        could not be read are reported as unknown and not cached.
+        """
+        results = {}
+        missing = []
+        for file in file_list:
+            key = self.cache_key(file)
+            info = self.cache.get(key) if key[0] else None
+            if info is None:
+                missing.append((file['filepath'], key))
+            else:
+                results[file['filepath']] = info
+                self.stats['cache_hits'] += 1
+
+        if missing:
+            paths = [path for path, _ in missing]
+            if self.workers > 1 and len(missing) > 1:
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    infos = list(executor.map(read_media_info, paths))
+            else:
+                infos = [read_media_info(path) for path in paths]
+            self.stats['header_reads'] += len(missing)
+            self.cache.put_many([(key, info) for (_, key), info in zip(missing, infos)
+                                 if key[0] and info is not None])
+            results.update((path, info or UNKNOWN) for path, info in zip(paths, infos))
+        return results
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Run Metrics
+
+Per-phase wall and CPU timings, counters and a move latency histogram for one
+sorting run. FileSorterApp fills a SortMetrics object while it works and
+keeps it in ``sorter.metrics``. It can be exported as a JSON summary or as a
+Prometheus textfile for node-exporter's textfile collector:
+
+    file_sorter_phase_wall_seconds{phase="scan"} 1.27
+    file_sorter_last_run_files_moved 48210
+    file_sorter_move_duration_seconds_bucket{le="0.001"} 47902
+
+Every value describes the last run only and starts again from zero with the
+next one, so the counters are exported as gauges. The move duration histogram
+resets in the same way, which PromQL's rate() and increase() read as a
+counter reset.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import re
+import json
+import time
+import bisect
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Phases in the order a sort runs them
+PHASES = ('validate', 'scan', 'plan', 'mkdir', 'move', 'cleanup')
+
+COUNTERS = ('files_scanned', 'directories_scanned', 'files_planned', 'moves_planned',
+            'files_moved', 'bytes_moved', 'directories_created', 'folders_removed',
+            'retries', 'errors', 'directories_pruned', 'files_excluded', 'files_renamed')
+
+SYSCALLS = ('scandir', 'stat', 'mkdir', 'rename', 'copy', 'unlink', 'rmdir')
+
+METRIC_PREFIX = 'file_sorter'
+
+# Names Prometheus accepts for labels
+LABEL_NAME = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*\Z')
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of durations in seconds (Prometheus style).
+
+    Observations are thread-safe, because moves report their latency from the
+    move worker threads.
+    """
+
+    # Upper bounds in seconds; renames take microseconds, large copies seconds
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+               0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one duration."""
+        index = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile (0-1) as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.BUCKETS[index] if index < len(self.BUCKETS) else self.max
+        return self.max
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Return (upper bound, observations at or below it) pairs, ending with +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.BUCKETS + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def to_dict(self) -> Dict:
+        """Return the histogram as JSON-compatible data."""
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': {('+Inf' if bound == float('inf') else repr(bound)): count
+                        for bound, count in self.cumulative()}
+        }
+
+
+class SortMetrics:
+    """
+    Timings and counters of one sorting run.
+
+    CPU time is process time, so it includes every thread of the process
+    (scan, move and hash workers) that ran during the phase.
+    """
+
+    def __init__(self, root: str = '', method: str = ''):
+        self.root = root
+        self.method = method
+        self.started = time.time()
+        self.finished = None
+        self.success = None
+        self.phases = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.syscalls = dict.fromkeys(SYSCALLS, 0)
+        self.move_latency = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block and add it to a phase; a phase may be entered several times."""
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_phase_time(name, time.perf_counter() - start_wall, time.process_time() - start_cpu)
+
+    def add_phase_time(self, name: str, wall: float, cpu: float):
+        """Add measured wall and CPU seconds to a phase."""
+        with self._lock:
+            totals = self.phases.setdefault(name, [0.0, 0.0])
+            totals[0] += wall
+            totals[1] += cpu
+
+    def count(self, name: str, amount: int = 1):
+        """Increase a counter (thread-safe)."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def count_syscall(self, name: str, amount: int = 1):
+        """Increase a syscall counter (thread-safe)."""
+        with self._lock:
+            self.syscalls[name] = self.syscalls.get(name, 0) + amount
+
+    def add_scan_stats(self, stats: Dict[str, int]):
+        """Add the counters of a FileSorterApp scan (``sorter.scan_stats``)."""
+        self.count('files_scanned', stats.get('files', 0))
+        self.count('directories_scanned', stats.get('directories', 0))
+        self.count('errors', stats.get('errors', 0))
+        self.count('directories_pruned', stats.get('directories_pruned', 0))
+        self.count('files_excluded', stats.get('files_excluded', 0))
+        self.count_syscall('scandir', stats.get('scandir_calls', 0))
+        self.count_syscall('stat', stats.get('stat_calls', 0))
+
+    def finish(self, success: bool):
+        """Mark the run as finished."""
+        self.finished = time.time()
+        self.success = success
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to finish (or to now, while running)."""
+        return (self.finished or time.time()) - self.started
+
+    def to_dict(self) -> Dict:
+        """Return the metrics as JSON-compatible data."""
+        return {
+            'root': self.root,
+            'method': self.method,
+            'started': self.started,
+            'finished': self.finished,
+            'duration': round(self.duration, 6),
+            'success': self.success,
+            'phases': {name: {'wall': round(wall, 6), 'cpu': round(cpu, 6)}
+                       for name, (wall, cpu) in self._ordered_phases()},
+            'counters': dict(self.counters),
+            'syscalls': dict(self.syscalls),
+            'move_latency': self.move_latency.to_dict()
+        }
+
+    def to_json(self) -> str:
+        """Serialize the metrics to a JSON string."""
+        return json.dumps(self.to_dict())
+
+    def _ordered_phases(self) -> List[Tuple[str, List[float]]]:
+        """Return phases in run order, followed by any extra phases."""
+        known = [(name, self.phases[name]) for name in PHASES if name in self.phases]
+        extra = [(name, value) for name, value in self.phases.items() if name not in PHASES]
+        return known + extra
+
+    def to_prometheus(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            labels: Extra labels added to every sample; by default the root
+                folder and the sorting method
+
+        Raises:
+            ValueError: If a label name is not a valid Prometheus label name
+        """
+        if labels is None:
+            labels = {'root': self.root, 'method': self.method}
+        for key in labels:
+            if not LABEL_NAME.match(key) or key.startswith('__'):
+                raise ValueError(f'Invalid Prometheus label name "{key}"')
+        base = ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+        def sample(name: str, value, extra: str = '') -> str:
+            label_text = ','.join(part for part in (base, extra) if part)
+            return f'{METRIC_PREFIX}_{name}{{{label_text}}} {value}' if label_text \
+                else f'{METRIC_PREFIX}_{name} {value}'
+
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+
+        metric('phase_wall_seconds', 'gauge', 'Wall-clock seconds spent in each phase of the last run.')
+        for name, (wall, _) in self._ordered_phases():
+            lines.append(sample('phase_wall_seconds', f'{wall:.6f}', f'phase="{name}"'))
+        metric('phase_cpu_seconds', 'gauge', 'Process CPU seconds spent in each phase of the last run.')
+        for name, (_, cpu) in self._ordered_phases():
+            lines.append(sample('phase_cpu_seconds', f'{cpu:.6f}', f'phase="{name}"'))
+        for name, value in self.counters.items():
+            metric(f'last_run_{name}', 'gauge', f'{name.replace("_", " ").capitalize()} in the last run.')
+            lines.append(sample(f'last_run_{name}', value))
+        metric('last_run_syscalls', 'gauge', 'Filesystem calls made in the last run.')
+        for name, value in self.syscalls.items():
+            lines.append(sample('last_run_syscalls', value, f'call="{name}"'))
+
+        metric('move_duration_seconds', 'histogram',
+               'Duration of individual file moves in the last run (resets with every run).')
+        for bound, count in self.move_latency.cumulative():
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(sample('move_duration_seconds_bucket', count, f'le="{le}"'))
+        lines.append(sample('move_duration_seconds_sum', f'{self.move_latency.sum:.6f}'))
+        lines.append(sample('move_duration_seconds_count', self.move_latency.count))
+
+        metric('last_run_duration_seconds', 'gauge', 'Duration of the last run.')
+        lines.append(sample('last_run_duration_seconds', f'{self.duration:.6f}'))
+        metric('last_run_timestamp_seconds', 'gauge', 'Unix time the last run finished.')
+        lines.append(sample('last_run_timestamp_seconds', f'{self.finished or time.time():.3f}'))
+        metric('last_run_success', 'gauge', '1 if the last run succeeded, 0 otherwise.')
+        lines.append(sample('last_run_success', 1 if self.success else 0))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str, labels: Optional[Dict[str, str]] = None):
+        """
+        Write the metrics as a Prometheus textfile.
+
+        The file is written under a new temporary name in the same folder and
+        renamed into place, so node-exporter never reads a half-written file
+        and concurrent writers never share a temporary file. node-exporter only
+        reads files ending in .prom, so the temporary file is never collected.
+        """
+        text = self.to_prometheus(labels)
+        fd, temp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp',
+                                         dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Rule Engine
+
+Sorts files with user-defined rules read from a TOML or JSON file:
+
+    default = "Other"            # folder for files no rule matches (optional)
+
+    [groups]
+    images = ["jpg", "jpeg", "png", "heic"]
+
+    [[rules]]
+    folder = "Screenshots"
+    groups = ["images"]
+    names = ["Screenshot*", "Screen Shot*"]
+
+    [[rules]]
+    folder = "Installers"
+    source = ["Downloads"]
+    extensions = ["exe", "msi", "dmg"]
+    max_age = 30
+
+The first rule whose conditions all match decides the folder. Each condition
+is a list of alternatives, and a rule without a condition places no limit on
+it. Rule files are compiled once into lookup structures, so classifying a
+file costs a dict lookup for its extension, a bisect for its size and age,
+and at most one regular expression match for its name, however many rules
+there are:
+
+- every condition yields a bitmask of the rules it allows (bit i is rule i),
+  and a file matches the lowest rule allowed by all of them;
+- extensions map to their mask in a dict;
+- the size and age limits of all rules split the number line into ranges,
+  each with a precomputed mask, found with bisect;
+- the name patterns of all rules are joined into one alternation, which
+  returns the first rule whose names match (patterns that clash when joined,
+  through shared group names or numbered backreferences, are matched one
+  by one instead);
+- source folders are matched once per directory and cached.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import re
+import json
+import time
+import fnmatch
+import hashlib
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+# Keys allowed at the top level of a rule file and in a rule
+FILE_KEYS = ('default', 'ignore_case', 'age_from', 'groups', 'rules')
+RULE_KEYS = ('folder', 'extensions', 'groups', 'names', 'patterns', 'min_size', 'max_size',
+             'min_age', 'max_age', 'source')
+
+# Timestamps that ages can be measured from
+AGE_SOURCES = {'mtime': 'modified_time', 'ctime': 'changed_time'}
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+AGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+# A numbered backreference such as \1, which joining patterns would renumber
+NUMBERED_BACKREFERENCE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]')
+
+
+def _join_patterns(patterns: List[str], flags: int,
+                   names: Optional[List[str]] = None) -> Optional['re.Pattern']:
+    """
+    Compile patterns into one alternation, each alternative in a group named
+    after ``names`` if given. Returns None if they cannot be joined without
+    changing what they match.
+    """
+    if not patterns:
+        return re.compile('(?!)', flags)
+    # Named groups shift the numbers of the groups inside them
+    if (names is not None or len(patterns) > 1) and any(NUMBERED_BACKREFERENCE.search(pattern) for pattern in patterns):
+        return None
+    if names is None:
+        joined = '|'.join(f'(?:{pattern})' for pattern in patterns)
+    else:
+        joined = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in zip(names, patterns))
+    try:
+        return re.compile(joined, flags)
+    except re.error:
+        return None
+
+
+def parse_size(value) -> int:
+    """Parse a size in bytes, given as a number or a string such as 10K, 4MB or 1.5G."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().upper().rstrip('B').rstrip('I')
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ''
+    try:
+        return int(float(text[:-1] if unit else text) * SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f'Invalid size "{value}"') from None
+
+
+def parse_age(value) -> float:
+    """Parse an age in seconds, given as a number of days or a string such as 12h or 2w."""
+    if isinstance(value, (int, float)):
+        return float(value) * AGE_UNITS['d']
+    text = str(value).strip().lower()
+    unit = text[-1:] if text[-1:] in AGE_UNITS else 'd'
+    try:
+        return float(text[:-1] if text[-1:] in AGE_UNITS else text) * AGE_UNITS[unit]
+    except ValueError:
+        raise ValueError(f'Invalid age "{value}"') from None
+
+
+def _normalize_extension(extension: str) -> str:
+    return extension.lower().lstrip('.')
+
+
+def _as_list(where: str, key: str, value) -> List:
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list):
+        raise ValueError(f'{where}: "{key}" must be a string or a list')
+    return value
+
+
+def _range_masks(ranges: Dict[int, Tuple[float, float]], free_mask: int) -> Tuple[List[float], List[int]]:
+    """
+    Precompute rule bitmasks for a numeric value (a size or an age).
+
+    Each rule allows the range [low, high), with a low of 0 standing for no
+    lower limit. The limits of all rules split the number line; the mask of
+    the range a value falls in is ``masks[bisect_right(bounds, value)]``.
+
+    Args:
+        ranges: {rule index: (low, high)} for the rules limiting this value
+        free_mask: Rules without a limit on this value
+
+    Returns:
+        (bounds, masks) with one more mask than bounds
+    """
+    ranges = {index: (low if low > 0 else float('-inf'), high) for index, (low, high) in ranges.items()}
+    bounds = sorted({limit for low, high in ranges.values()
+                     for limit in (low, high) if limit not in (float('-inf'), float('inf'))})
+    masks = []
+    for start in [float('-inf')] + bounds:
+        mask = free_mask
+        for index, (low, high) in ranges.items():
+            if low <= start < high:
+                mask |= 1 << index
+        masks.append(mask)
+    return bounds, masks
+
+
+class RuleSet:
+    """
+    Compiled sorting rules.
+
+    Call start() with the folder being sorted before classifying its files,
+    so that source folders and ages are measured from the right place and
+    time.
+    """
+
+    def __init__(self, config: Dict, name: str = ''):
+        """
+        Args:
+            config: Parsed rule file (see the module docstring)
+            name: Where the rules came from, used in error messages
+
+        Raises:
+            ValueError: If the rules are invalid
+        """
+        if not isinstance(config, dict):
+            raise ValueError('A rule file must contain a table (object) of settings')
+        unknown = set(config) - set(FILE_KEYS)
+        if unknown:
+            raise ValueError(f'Unknown setting(s) in {name or "rule file"}: {", ".join(sorted(unknown))}')
+        self.name = name
+        self.signature = hashlib.sha256(json.dumps(config, sort_keys=True, default=str)
+                                        .encode('utf-8')).hexdigest()[:16]
+        self.default = config.get('default')
+        if self.default is not None:
+            self.default = self._check_folder(0, self.default)
+        age_from = config.get('age_from', 'mtime')
+        if age_from not in AGE_SOURCES:
+            raise ValueError(f'Invalid age_from "{age_from}" (expected mtime or ctime)')
+        self.age_field = AGE_SOURCES[age_from]
+        flags = re.IGNORECASE if config.get('ignore_case') else 0
+
+        groups = config.get('groups', {})
+        if not isinstance(groups, dict):
+            raise ValueError('"groups" must be a table of extension lists')
+        groups = {group: [_normalize_extension(ext) for ext in _as_list('groups', group, extensions)]
+                  for group, extensions in groups.items()}
+
+        rules = config.get('rules', [])
+        if not isinstance(rules, list) or not rules:
+            raise ValueError('A rule file needs at least one [[rules]] entry')
+
+        self.folders = []
+        self.all_mask = (1 << len(rules)) - 1
+        extension_masks = {}
+        extension_free = 0
+        sizes = {}
+        ages = {}
+        name_patterns = []
+        self.name_rules = 0
+        self.source_patterns = []
+        self.source_rules = 0
+
+        for index, rule in enumerate(rules):
+            number = index + 1
+            where = f'Rule {number}'
+            if not isinstance(rule, dict):
+                raise ValueError(f'Rule {number} must be a table')
+            unknown = set(rule) - set(RULE_KEYS)
+            if unknown:
+                raise ValueError(f'Rule {number}: unknown key(s) {", ".join(sorted(unknown))}')
+            if 'folder' not in rule:
+                raise ValueError(f'Rule {number} has no "folder"')
+            self.folders.append(self._check_folder(number, rule['folder']))
+            bit = 1 << index
+
+            extensions = [_normalize_extension(ext) for ext in _as_list(where, 'extensions', rule.get('extensions', []))]
+            for group in _as_list(where, 'groups', rule.get('groups', [])):
+                if group not in groups:
+                    raise ValueError(f'Rule {number}: unknown group "{group}"')
+                extensions.extend(groups[group])
+            if 'extensions' in rule or 'groups' in rule:
+                for extension in extensions:
+                    extension_masks[extension] = extension_masks.get(extension, 0) | bit
+            else:
+                extension_free |= bit
+
+            if 'min_size' in rule or 'max_size' in rule:
+                sizes[index] = (parse_size(rule.get('min_size', 0)),
+                                parse_size(rule['max_size']) if 'max_size' in rule else float('inf'))
+            if 'min_age' in rule or 'max_age' in rule:
+                ages[index] = (parse_age(rule.get('min_age', 0)),
+                               parse_age(rule['max_age']) if 'max_age' in rule else float('inf'))
+
+            alternatives = [fnmatch.translate(glob) for glob in _as_list(where, 'names', rule.get('names', []))]
+            for pattern in _as_list(where, 'patterns', rule.get('patterns', [])):
+                try:
+                    re.compile(pattern, flags)
+                except re.error as e:
+                    raise ValueError(f'Rule {number}: invalid pattern "{pattern}": {e}') from None
+                # Patterns may match anywhere in the name, like re.search
+                alternatives.append(f'(?s:.*?)(?:{pattern})')
+            if 'names' in rule or 'patterns' in rule:
+                self.name_rules |= bit
+                joined = _join_patterns(alternatives, flags)
+                if joined is not None:
+                    name_patterns.append((index, joined))
+                else:
+                    name_patterns.extend((index, re.compile(alt, flags)) for alt in alternatives)
+
+            if 'source' in rule:
+                self.source_rules |= bit
+                for source in _as_list(where, 'source', rule['source']):
+                    source = source.strip('/').replace('\\', '/')
+                    # A source folder includes everything below it
+                    self.source_patterns.append((bit, re.compile(fnmatch.translate(source)),
+                                                 re.compile(fnmatch.translate(f'{source}/*'))))
+
+        self.extension_masks = {ext: mask | extension_free for ext, mask in extension_masks.items()}
+        self.extension_free = extension_free
+        self.size_bounds, self.size_masks = _range_masks(sizes, self.all_mask & ~self._bits(sizes))
+        self.age_bounds, self.age_masks = _range_masks(ages, self.all_mask & ~self._bits(ages))
+        self.limits_size = bool(sizes)
+        self.limits_age = bool(ages)
+        self.name_patterns = name_patterns
+        # One alternation finds the first matching rule in a single pass; rules
+        # whose patterns cannot be joined are matched one pattern at a time
+        indexes = [index for index, _ in name_patterns]
+        self.combined_names = None
+        if name_patterns and len(set(indexes)) == len(indexes):
+            self.combined_names = _join_patterns([pattern.pattern for _, pattern in name_patterns],
+                                                 flags, [f'r{index}' for index in indexes])
+
+        # Masks of raw scan extensions (e.g. '.JPG') and of directories, filled on first use
+        self._extension_cache = {}
+        self._directory_cache = {}
+        self.root = None
+        self.now = time.time()
+
+    @staticmethod
+    def _bits(ranges: Dict[int, Tuple[float, float]]) -> int:
+        mask = 0
+        for index in ranges:
+            mask |= 1 << index
+        return mask
+
+    @staticmethod
+    def _check_folder(number: int, folder) -> str:
+        where = f'Rule {number}' if number else 'default'
+        if not isinstance(folder, str) or not folder.strip():
+            raise ValueError(f'{where}: folder must be a non-empty string')
+        parts = folder.replace('\\', '/').split('/')
+        if os.path.isabs(folder) or '..' in parts:
+            raise ValueError(f'{where}: folder "{folder}" must stay inside the sorted folder')
+        return folder
+
+    @classmethod
+    def load(cls, path: str) -> 'RuleSet':
+        """
+        Read and compile a rule file. Files ending in .json are read as JSON,
+        everything else as TOML.
+
+        Raises:
+            ValueError: If the file cannot be parsed or the rules are invalid
+            OSError: If the file cannot be read
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.lower().endswith('.json'):
+            try:
+                config = json.loads(data.decode('utf-8'))
+            except ValueError as e:
+                raise ValueError(f'Invalid JSON in {path}: {e}') from None
+        else:
+            try:
+                import tomllib
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise ValueError('TOML rule files need Python 3.11 or the tomli package; '
+                                     'use a .json rule file instead') from None
+            try:
+                config = tomllib.loads(data.decode('utf-8'))
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f'Invalid TOML in {path}: {e}') from None
+        return cls(config, path)
+
+    def start(self, root: str, now: Optional[float] = None):
+        """Begin classifying the files of a folder, measuring ages from now."""
+        root = os.path.normpath(os.path.abspath(root))
+        if root != self.root:
+            self.root = root
+            self._directory_cache = {}
+        self.now = time.time() if now is None else now
+
+    def _extension_mask(self, extension: str) -> int:
+        mask = self.extension_masks.get(_normalize_extension(extension), self.extension_free)
+        self._extension_cache[extension] = mask
+        return mask
+
+    def _directory_mask(self, prefix: str) -> int:
+        relative = os.path.dirname(prefix)
+        if self.root is not None:
+            relative = os.path.relpath(os.path.abspath(relative), self.root)
+        relative = '' if relative == '.' else relative.replace(os.sep, '/')
+        mask = self.all_mask & ~self.source_rules
+        for bit, folder_pattern, below_pattern in self.source_patterns:
+            if folder_pattern.match(relative) or below_pattern.match(relative):
+                mask |= bit
+        self._directory_cache[prefix] = mask
+        return mask
+
+    def _name_match(self, filename: str, mask: int) -> int:
+        """Return the lowest rule in mask whose name patterns match, or -1."""
+        if self.combined_names is None:
+            for index, pattern in self.name_patterns:
+                if mask >> index & 1 and pattern.match(filename):
+                    return index
+            return -1
+        match = self.combined_names.match(filename)
+        if match is None:
+            return -1
+        first = int(match.lastgroup[1:])
+        if mask >> first & 1:
+            return first
+        # The first rule with matching names failed another condition; check the rest one by one
+        for index, pattern in self.name_patterns:
+            if index > first and mask >> index & 1 and pattern.match(filename):
+                return index
+        return -1
+
+    def match(self, file: Dict) -> int:
+        """Return the index of the first rule matching a file record, or -1."""
+        extension = file['file_extension']
+        mask = self._extension_cache.get(extension)
+        if mask is None:
+            mask = self._extension_mask(extension)
+        if mask and self.limits_size:
+            mask &= self.size_masks[bisect_right(self.size_bounds, file['size'])]
+        if mask and self.limits_age:
+            # Files dated in the future have a negative age and count as new
+            mask &= self.age_masks[bisect_right(self.age_bounds, self.now - file[self.age_field])]
+        if mask and self.source_rules:
+            # Keyed by the directory part of the path, without splitting it
+            filepath = file['filepath']
+            prefix = filepath[:len(filepath) - len(file['filename'])]
+            directory_mask = self._directory_cache.get(prefix)
+            if directory_mask is None:
+                directory_mask = self._directory_mask(prefix)
+            mask &= directory_mask
+        if not mask:
+            return -1
+
+        first = (mask & -mask).bit_length() - 1
+        if not self.name_rules >> first & 1:
+            return first
+        # Only rules before the first one without name patterns need a name match
+        plain = mask & ~self.name_rules
+        lowest_plain = (plain & -plain).bit_length() - 1
+        named = mask & self.name_rules
+        if lowest_plain >= 0:
+            named &= (1 << lowest_plain) - 1
+        named_index = self._name_match(file['filename'], named)
+        return named_index if named_index >= 0 else lowest_plain
+
+    def classify(self, file: Dict) -> Optional[str]:
+        """Return the destination folder for a file record, or the default (None leaves it in place)."""
+        index = self.match(file)
+        return self.folders[index] if index >= 0 else self.default
@@ -0,0 +1,56 @@
+"""
+Shared fixtures for the File Sorter tests.
+
+The modules live at the top of the repository rather than in a package, so
+the repository root is put on sys.path here.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import FileSorterApp  # noqa: E402
+
+
+def write(path, data='x'):
+    """Create a file (and its folders) with the given text or bytes."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    with open(path, mode) as f:
+        f.write(data)
+    return path
+
+
+def read(path):
+    """Return the text of a file."""
+    with open(path) as f:
+        return f.read()
+
+
+def tree(root):
+    """Return {relative path: text} for every file under root."""
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root).replace(os.sep, '/')] = f.read().decode('utf-8', 'replace')
+    return files
+
+
+@pytest.fixture
+def messages():
+    """List collecting the sorter's progress messages."""
+    return []
+
+
+@pytest.fixture
+def make_sorter(messages):
+    """Build a FileSorterApp that logs into ``messages``."""
+    def make(**options):
+        options.setdefault('log_each_file', False)
+        return FileSorterApp(progress_callback=messages.append, **options)
+    return make
@@ -0,0 +1,116 @@
+"""The asyncio API: SortExecutor limits and the sort_events stream."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from async_sorter import SortExecutor, sort_events, sort_files_async
+from conftest import tree, write
+
+
+class _Overlap:
+    """Blocking function that records how many of its calls ran at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.most = 0
+
+    def __call__(self):
+        with self.lock:
+            self.running += 1
+            self.most = max(self.most, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+
+
+def _run_together(executor, folders):
+    overlap = _Overlap()
+
+    async def main():
+        await asyncio.gather(*(executor.run(str(folder), overlap) for folder in folders))
+
+    asyncio.run(main())
+    return overlap.most
+
+
+@pytest.mark.parametrize('max_sorts, per_device, expected', [
+    (1, 4, 1),  # The global limit
+    (4, 1, 1),  # One filesystem, so the device limit
+    (4, 2, 2),
+])
+def test_limits(tmp_path, max_sorts, per_device, expected):
+    executor = SortExecutor(max_sorts=max_sorts, per_device=per_device)
+    try:
+        assert _run_together(executor, [tmp_path] * 4) == expected
+    finally:
+        executor.shutdown()
+
+
+def test_folders_that_cannot_be_stat_only_share_the_global_limit(tmp_path):
+    executor = SortExecutor(max_sorts=2, per_device=1)
+    try:
+        assert _run_together(executor, [tmp_path / 'missing'] * 2) == 2
+    finally:
+        executor.shutdown()
+
+
+def test_two_sorts_under_a_limit_of_one(tmp_path):
+    for folder in ('one', 'two'):
+        write(tmp_path / folder / 'a.txt', folder)
+    executor = SortExecutor(max_sorts=1)
+    log = []
+
+    def sort(folder):
+        return sort_files_async(str(tmp_path / folder), 'By File Type', executor=executor,
+                                progress_callback=lambda message: log.append(folder))
+
+    async def main():
+        return await asyncio.gather(sort('one'), sort('two'))
+
+    try:
+        assert asyncio.run(main()) == [True, True]
+    finally:
+        executor.shutdown()
+    assert tree(tmp_path) == {'one/txt/a.txt': 'one', 'two/txt/a.txt': 'two'}
+    # One sort logged everything before the other started
+    assert set(log) == {'one', 'two'}
+    assert log == sorted(log, key=lambda folder: folder != log[0])
+
+
+def test_sort_events_ends_with_the_result(tmp_path):
+    for name in ('a.txt', 'b.jpg'):
+        write(tmp_path / name)
+
+    async def main():
+        return [event async for event in sort_events(str(tmp_path), 'By File Type')]
+
+    events = asyncio.run(main())
+
+    kinds = {event.kind for event in events}
+    assert kinds == {'progress', 'message', 'result'}
+    result = events[-1]
+    assert result.kind == 'result' and result.success and result.stopped is None
+    assert result.metrics['counters']['files_moved'] == 2
+    assert all(event.folder_path == str(tmp_path) for event in events)
+
+
+def test_sort_events_raises_what_the_sort_raises(tmp_path):
+    async def main():
+        # The sorter is made in the worker thread, so its error surfaces there
+        return [event async for event in sort_events(str(tmp_path), 'By File Type', date_source='never')]
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_sort_events_rejects_callbacks(tmp_path):
+    async def main():
+        async for _ in sort_events(str(tmp_path), 'By File Type', progress_callback=print):
+            pass
+
+    with pytest.raises(ValueError, match='progress_callback'):
+        asyncio.run(main())
@@ -0,0 +1,81 @@
+"""The batch command line: argument checks, exit codes and summaries."""
+
+import json
+
+import pytest
+
+from batch import format_summary, main, resolve_method, sort_root
+from conftest import tree, write
+
+
+@pytest.mark.parametrize('argv, message', [
+    ([], 'no folders given'),
+    (['{root}', '--method', 'colour'], 'invalid sorting method'),
+    (['{root}', '--method', 'type > type'], 'invalid sorting method'),
+    (['{root}', '--method', 'rules'], 'needs --rules'),
+    (['{root}', '--method', 'rules', '--rules', '{root}/missing.toml'], 'could not load rules'),
+    (['{root}', '--max-depth', '-1'], '--max-depth must not be negative'),
+    (['{root}', '{root}/inner'], 'folders overlap'),
+    (['--manifest', '{root}/missing.txt'], 'could not read manifest'),
+])
+def test_usage_errors_exit_with_2(tmp_path, capsys, argv, message):
+    with pytest.raises(SystemExit) as exit_info:
+        main([arg.format(root=tmp_path) for arg in argv])
+
+    assert exit_info.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_exit_code_is_1_when_a_folder_fails(tmp_path, capsys):
+    write(tmp_path / 'good' / 'a.txt')
+
+    assert main([str(tmp_path / 'good'), str(tmp_path / 'missing'), '--jobs', '1']) == 1
+
+    out = capsys.readouterr().out
+    assert f'OK {tmp_path / "good"}: moved 1 of 1 files' in out
+    assert f'FAILED {tmp_path / "missing"}' in out
+    assert 'Sorted 1 of 2 folders' in out
+
+
+def test_json_output(tmp_path, capsys):
+    write(tmp_path / 'a' / 'x.txt')
+    write(tmp_path / 'b' / 'y.jpg')
+    manifest = write(tmp_path / 'folders.txt', f'# folders\n{tmp_path / "a"}\n\n{tmp_path / "b"}\n')
+
+    assert main(['--manifest', str(manifest), '--json', '--jobs', '1']) == 0
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line['event'] for line in lines] == ['root', 'root', 'summary']
+    assert lines[-1]['moved'] == 2 and lines[-1]['failed'] == 0
+    assert lines[0]['unchanged_folders'] is None
+    assert set(tree(tmp_path / 'b')) == {'jpg/y.jpg'}
+
+
+def test_dry_run_moves_nothing(tmp_path, capsys):
+    write(tmp_path / 'a.txt')
+
+    assert main([str(tmp_path), '--method', 'alphabetical', '--dry-run']) == 0
+
+    assert 'would move 1 of 1 files' in capsys.readouterr().out
+    assert set(tree(tmp_path)) == {'a.txt'}
+
+
+def test_aliases_combine_into_composites():
+    assert resolve_method('type > date') == 'By File Type > By Date'
+    assert resolve_method('By Size') == 'By Size'
+    assert resolve_method('type > nothing') is None
+
+
+def test_index_runs_report_new_or_changed_files(tmp_path):
+    for name in ('a.txt', 'b.txt'):
+        write(tmp_path / 'root' / name)
+    options = {'index_path': str(tmp_path / 'index.db')}
+    sort_root(str(tmp_path / 'root'), 'By File Type', options)
+    write(tmp_path / 'root' / 'c.txt')
+
+    summary = sort_root(str(tmp_path / 'root'), 'By File Type', options)
+
+    assert summary['success']
+    # The root changed; the txt folder did not and is not listed again
+    assert (summary['files'], summary['unchanged_folders'], summary['moved']) == (1, 1, 1)
+    assert 'moved 1 of 1 new or changed files (1 unchanged folders skipped)' in format_summary(summary)
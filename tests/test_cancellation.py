@@ -0,0 +1,113 @@
+"""Cancelling, pausing and budgeting sorts with a CancellationToken."""
+
+import threading
+import time
+
+from conftest import tree, write
+from journal import MoveJournal
+from main import CancellationToken, MovePlan
+
+NAMES = ('a', 'b', 'c', 'd', 'e')
+
+
+def _populate(root):
+    for name in NAMES:
+        write(root / 'inbox' / f'{name}.txt', name)
+
+
+def _sorted(root):
+    return sorted(path for path in tree(root) if path.startswith('txt/'))
+
+
+def test_pause_holds_checkpoint_until_resume():
+    token = CancellationToken()
+    token.pause()
+    passed = threading.Event()
+    thread = threading.Thread(target=lambda: token.checkpoint() and passed.set(), daemon=True)
+    thread.start()
+
+    assert not passed.wait(0.1)
+    token.resume()
+    assert passed.wait(5)
+
+
+def test_cancel_ends_a_pause_and_stops_cleanup_too():
+    token = CancellationToken()
+    token.pause()
+    token.cancel()
+
+    assert not token.paused
+    assert not token.checkpoint()
+    assert not token.checkpoint(budget=False)
+    assert token.cancelled
+
+
+def test_budgets_stop_the_work_but_not_the_cleanup():
+    token = CancellationToken(time_budget=0.01)
+    time.sleep(0.02)
+
+    assert not token.checkpoint()
+    assert token.checkpoint(budget=False)
+    assert token.stop_reason == CancellationToken.TIME_BUDGET
+    assert not token.cancelled
+
+    token = CancellationToken(max_files=3)
+    token.files_done = 2
+    assert token.files_left() == 1
+    assert CancellationToken().files_left() is None
+
+
+def test_file_budget_leaves_a_partial_sort_to_resume(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    _populate(root)
+    journal = str(tmp_path / 'journal.jsonl')
+    sorter = make_sorter(journal_path=journal, max_files=2)
+
+    # Running out of budget is not a failure
+    assert sorter.sort_files(str(root), 'By File Type')
+
+    assert sorter.cancel_token.stop_reason == CancellationToken.FILE_BUDGET
+    assert len(_sorted(root)) == 2
+    assert sorter.metrics.counters['files_moved'] == 2
+    run = MoveJournal(journal).read()
+    assert not run.complete
+    assert len(run.done) == 2 and not run.failed
+    # The moves left over are the ones still in the inbox
+    left = {move.filename for move in MovePlan.from_dict(run.plan).moves if move.record_index not in run.done}
+    assert left == {path.split('/')[1] for path in tree(root) if path.startswith('inbox/')}
+
+
+def test_time_budget_used_up_before_moving(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    _populate(root)
+    token = CancellationToken()
+    token.deadline = time.monotonic()
+
+    assert make_sorter().sort_files(str(root), 'By File Type', cancel_token=token)
+
+    assert token.stop_reason == CancellationToken.TIME_BUDGET
+    assert _sorted(root) == []
+
+
+def test_cancel_during_execute_plan(tmp_path, make_sorter, messages):
+    root = tmp_path / 'root'
+    _populate(root)
+    journal = str(tmp_path / 'journal.jsonl')
+    token = CancellationToken()
+
+    def cancel_after_two(event):
+        if event.phase == 'move' and event.files_done >= 2:
+            token.cancel()
+
+    sorter = make_sorter(journal_path=journal, move_workers=0, event_callback=cancel_after_two,
+                         max_event_rate=1e9)
+
+    assert not sorter.sort_files(str(root), 'By File Type', cancel_token=token)
+
+    assert token.cancelled
+    assert len(_sorted(root)) == 2
+    run = MoveJournal(journal).read()
+    assert not run.complete and len(run.done) == 2
+
+    assert make_sorter(journal_path=journal).resume()
+    assert _sorted(root) == [f'txt/{name}.txt' for name in NAMES]
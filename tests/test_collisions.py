@@ -0,0 +1,189 @@
+"""Files with the same name that end up in the same folder."""
+
+import os
+
+import pytest
+
+from conftest import read, tree, write
+
+
+@pytest.mark.parametrize('move_workers', [0, 4])
+def test_same_name_from_two_folders_keeps_both(tmp_path, make_sorter, move_workers):
+    write(tmp_path / 'x' / 'a.txt', 'one')
+    write(tmp_path / 'y' / 'a.txt', 'two')
+
+    assert make_sorter(move_workers=move_workers).sort_files(str(tmp_path), 'By File Type')
+
+    assert sorted(tree(tmp_path).values()) == ['one', 'two']
+    assert set(tree(tmp_path)) == {'txt/a.txt', 'txt/a (1).txt'}
+
+
+def test_existing_file_in_destination_is_not_replaced(tmp_path, make_sorter):
+    write(tmp_path / 'txt' / 'a.txt', 'sorted earlier')
+    write(tmp_path / 'inbox' / 'a.txt', 'new')
+    write(tmp_path / 'inbox' / 'a (1).txt', 'newer')
+
+    assert make_sorter().sort_files(str(tmp_path), 'By File Type')
+
+    assert tree(tmp_path) == {'txt/a.txt': 'sorted earlier', 'txt/a (1).txt': 'newer',
+                              'txt/a (2).txt': 'new'}
+
+
+def test_plan_gives_clashing_destinations_numbered_names(tmp_path, make_sorter):
+    for folder in ('x', 'y', 'z'):
+        write(tmp_path / folder / 'report.pdf', folder)
+    sorter = make_sorter()
+    files = sorter.scan_files(str(tmp_path))
+
+    plan = sorter.plan_moves(str(tmp_path), files, sorter.file_type_bucket)
+
+    names = sorted(os.path.basename(move.destination) for move in plan.moves)
+    assert names == ['report (1).pdf', 'report (2).pdf', 'report.pdf']
+    assert sorter.metrics.counters['files_renamed'] == 2
+    # Planning does not touch the tree
+    assert not (tmp_path / 'pdf').exists()
+
+
+def test_dry_run_reports_renames_without_moving(tmp_path, make_sorter, messages):
+    write(tmp_path / 'x' / 'a.txt', 'one')
+    write(tmp_path / 'y' / 'a.txt', 'two')
+
+    assert make_sorter().sort_files(str(tmp_path), 'By File Type', dry_run=True)
+
+    assert tree(tmp_path) == {'x/a.txt': 'one', 'y/a.txt': 'two'}
+    assert any('numbered name' in message for message in messages)
+
+
+def test_records_follow_renamed_files(tmp_path, make_sorter):
+    write(tmp_path / 'x' / 'a.txt', 'one')
+    write(tmp_path / 'y' / 'a.txt', 'two')
+    sorter = make_sorter()
+    files = sorter.scan_files(str(tmp_path))
+    plan = sorter.plan_moves(str(tmp_path), files, sorter.file_type_bucket)
+
+    sorter.execute_plan(plan, files)
+
+    for record in files:
+        assert os.path.basename(record['filepath']) == record['filename']
+        assert read(record['filepath']) in ('one', 'two')
+
+
+def test_streaming_sort_numbers_clashing_names(tmp_path, make_sorter):
+    write(tmp_path / 'x' / 'a.txt', 'one')
+    write(tmp_path / 'y' / 'a.txt', 'two')
+    write(tmp_path / 'txt' / 'a.txt', 'zero')
+
+    assert make_sorter().sort_files(str(tmp_path), 'By File Type', streaming=True)
+
+    assert sorted(tree(tmp_path).values()) == ['one', 'two', 'zero']
+    assert read(tmp_path / 'txt' / 'a.txt') == 'zero'
+
+
+def test_move_never_replaces_an_existing_file(tmp_path, make_sorter):
+    source = write(tmp_path / 'a.txt', 'new')
+    destination = write(tmp_path / 'txt' / 'a.txt', 'old')
+
+    with pytest.raises(FileExistsError):
+        make_sorter()._move_file(str(source), str(destination))
+
+    assert read(source) == 'new'
+    assert read(destination) == 'old'
+
+
+def test_cross_device_copy_never_replaces_an_existing_file(tmp_path, make_sorter):
+    source = write(tmp_path / 'a.txt', 'new')
+    destination = write(tmp_path / 'txt' / 'a.txt', 'old')
+
+    with pytest.raises(FileExistsError):
+        make_sorter()._move_across_devices(str(source), str(destination))
+
+    assert read(source) == 'new'
+    assert read(destination) == 'old'
+    assert tree(tmp_path) == {'a.txt': 'new', 'txt/a.txt': 'old'}
+
+
+def test_cross_device_copy_leaves_existing_partial_files_alone(tmp_path, make_sorter):
+    source = write(tmp_path / 'a.txt', 'new')
+    write(tmp_path / 'txt' / 'a.txt.partial', 'mine')
+
+    make_sorter()._move_across_devices(str(source), str(tmp_path / 'txt' / 'a.txt'))
+
+    assert tree(tmp_path) == {'txt/a.txt': 'new', 'txt/a.txt.partial': 'mine'}
+
+
+def test_failed_cross_device_copy_removes_only_its_own_file(tmp_path, make_sorter, monkeypatch):
+    import main
+
+    def fail(src, dst, size):
+        dst.write(b'half')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(main, '_copy_file_data', fail)
+    source = write(tmp_path / 'a.txt', 'new')
+    write(tmp_path / 'txt' / 'a.txt.partial', 'mine')
+
+    with pytest.raises(OSError, match='disk full'):
+        make_sorter()._move_across_devices(str(source), str(tmp_path / 'txt' / 'a.txt'))
+
+    assert tree(tmp_path) == {'a.txt': 'new', 'txt/a.txt.partial': 'mine'}
+
+
+def test_fallback_rename_never_replaces(tmp_path, monkeypatch):
+    import main
+    monkeypatch.setattr(main, '_renameat2', False)
+    source = write(tmp_path / 'a.txt', 'new')
+    destination = write(tmp_path / 'b.txt', 'old')
+
+    with pytest.raises(FileExistsError):
+        main._rename_noreplace(str(source), str(destination))
+    main._rename_noreplace(str(source), str(tmp_path / 'c.txt'))
+
+    assert tree(tmp_path) == {'b.txt': 'old', 'c.txt': 'new'}
+
+
+def test_planned_move_onto_a_file_created_later_is_skipped(tmp_path, make_sorter, messages):
+    write(tmp_path / 'inbox' / 'a.txt', 'new')
+    sorter = make_sorter()
+    files = sorter.scan_files(str(tmp_path))
+    plan = sorter.plan_moves(str(tmp_path), files, sorter.file_type_bucket)
+    # Another program creates the destination between planning and moving
+    write(tmp_path / 'txt' / 'a.txt', 'theirs')
+
+    assert sorter.execute_plan(plan, files) == 0
+
+    assert tree(tmp_path) == {'inbox/a.txt': 'new', 'txt/a.txt': 'theirs'}
+    assert any('Could not move a.txt' in message for message in messages)
+
+
+def _chain_plan(tmp_path):
+    """A plan whose first move targets the source of the second, and a third move to the same place."""
+    from main import MovePlan, PlannedMove
+    root = str(tmp_path)
+    for folder, text in (('d0', 'zero'), ('d1', 'one'), ('d3', 'three')):
+        write(tmp_path / folder / 'f', text)
+    write(tmp_path / 'd2' / '.keep', '')
+    moves = (
+        PlannedMove(os.path.join(root, 'd0', 'f'), os.path.join(root, 'd1', 'f'), 'f', 'd1', 0),
+        PlannedMove(os.path.join(root, 'd1', 'f'), os.path.join(root, 'd2', 'f'), 'f', 'd2', 1),
+        PlannedMove(os.path.join(root, 'd3', 'f'), os.path.join(root, 'd2', 'f'), 'f', 'd2', 2),
+    )
+    directories = (os.path.join(root, 'd1'), os.path.join(root, 'd2'))
+    return MovePlan(root, ('d1', 'd2'), directories, moves, 3)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_chained_and_clashing_moves_lose_no_data(tmp_path, make_sorter, workers):
+    sorter = make_sorter()
+
+    sorter.execute_plan(_chain_plan(tmp_path), workers=workers)
+
+    assert sorted(text for path, text in tree(tmp_path).items() if path != 'd2/.keep') == \
+        ['one', 'three', 'zero']
+    assert read(tmp_path / 'd2' / 'f') == 'one'
+    failed = [result.move.record_index for result in sorter.move_results if result.error]
+    # The move into d2/f that comes second in the plan always fails
+    assert 2 in failed
+    if workers > 1:
+        # d1/f has been moved away before the held-back move into it runs
+        assert failed == [2]
+        assert read(tmp_path / 'd1' / 'f') == 'zero'
@@ -0,0 +1,71 @@
+"""Composite sorting methods, which nest the folders of several methods."""
+
+import os
+import time
+
+import pytest
+
+from conftest import tree, write
+from main import FileSorterApp
+
+OCTOBER = time.mktime((2026, 10, 16, 12, 0, 0, 0, 0, -1))
+MARCH = time.mktime((2025, 3, 2, 12, 0, 0, 0, 0, -1))
+
+
+def _dated(path, timestamp, data='x'):
+    write(path, data)
+    os.utime(path, (timestamp, timestamp))
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_type_then_date_nests_folders(tmp_path, make_sorter, streaming):
+    _dated(tmp_path / 'in' / 'a.pdf', OCTOBER)
+    _dated(tmp_path / 'in' / 'b.pdf', MARCH)
+    _dated(tmp_path / 'c.txt', OCTOBER)
+
+    assert make_sorter(date_source='mtime').sort_files(str(tmp_path), 'By File Type > By Date',
+                                                        streaming=streaming)
+
+    assert set(tree(tmp_path)) == {'pdf/Oct_2026/a.pdf', 'pdf/Mar_2025/b.pdf', 'txt/Oct_2026/c.txt'}
+
+
+def test_order_of_the_methods_decides_the_nesting(tmp_path, make_sorter):
+    _dated(tmp_path / 'a.pdf', OCTOBER)
+
+    assert make_sorter(date_source='mtime', date_layout='nested').sort_files(
+        str(tmp_path), 'By Date > By File Type')
+
+    assert set(tree(tmp_path)) == {'2026/10/pdf/a.pdf'}
+
+
+def test_three_levels(tmp_path, make_sorter):
+    write(tmp_path / 'apple.txt', 'x' * 20 * 1024)
+
+    assert make_sorter().sort_files(str(tmp_path), 'Alphabetically > By File Type > By Size')
+
+    assert set(tree(tmp_path)) == {'A/txt/Small (10KB-1MB)/apple.txt'}
+
+
+def test_composite_key_joins_each_path_once(make_sorter):
+    key = make_sorter().key_function('By File Type > By Size')
+    first = key({'file_extension': '.pdf', 'size': 1})
+    second = key({'file_extension': '.pdf', 'size': 2})
+
+    assert first == os.path.join('pdf', 'Tiny (<10KB)')
+    assert first is second
+
+
+@pytest.mark.parametrize('method', [
+    'By File Type > By File Type',
+    'By File Type > By Colour',
+    'By File Type >',
+    '',
+])
+def test_invalid_composites_are_rejected(tmp_path, make_sorter, messages, method):
+    write(tmp_path / 'a.txt')
+
+    assert not FileSorterApp.is_valid_sorting_method(method)
+    assert not make_sorter().sort_files(str(tmp_path), method)
+
+    assert any('Invalid sorting method' in message for message in messages)
+    assert tree(tmp_path) == {'a.txt': 'x'}
@@ -0,0 +1,74 @@
+"""Content sniffing versus file extensions."""
+
+import struct
+
+import pytest
+
+from conftest import tree, write
+from metadata import is_known_extension, sniff_type
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 32
+PDF = b'%PDF-1.7\n'
+ZIP = b'PK\x03\x04' + b'\x00' * 32
+
+
+def _pe_header():
+    header = bytearray(b'MZ' + b'\x00' * 126)
+    struct.pack_into('<I', header, 60, 64)
+    header[64:68] = b'PE\x00\x00'
+    return bytes(header)
+
+
+@pytest.mark.parametrize('header, kind', [
+    (PNG, 'png'),
+    (PDF, 'pdf'),
+    (_pe_header(), 'exe'),
+    (b'\x1f\x8b\x08\x00' + b'\x00' * 6, 'gz'),
+    (b'\xff\xfb\x90\x64' + b'\x00' * 8, 'mp3'),
+    (b'BZh91AY&SY' + b'\x00' * 4, 'bz2'),
+    (b'ID3\x03\x00' + b'\x00' * 8, 'mp3'),
+])
+def test_binary_signatures_are_recognized(header, kind):
+    assert sniff_type(header) == kind
+
+
+@pytest.mark.parametrize('header', [
+    b'MZ is how this note starts, but it is plain text.\n' * 2,
+    b'\x1f\x8b',
+    b'\xff\xfb',
+    b'\xff\xfb\xf0\x00',            # invalid bitrate index
+    b'BZh is not enough\n',
+    b'ID3 tags are explained below\n',
+    b'OTTO was here\n',
+    b'OggS are fine\n',
+])
+def test_short_magics_need_their_following_fields(header):
+    assert sniff_type(header) is None
+
+
+@pytest.mark.parametrize('extension', ['txt', 'ai', 'docm', 'xlsm', 'xlsb', 'odg', 'war', 'numbers', 'JPG'])
+def test_known_extensions(extension):
+    assert is_known_extension(extension)
+
+
+@pytest.mark.parametrize('extension', ['', 'unknownext', 'jpg_original'])
+def test_unknown_extensions(extension):
+    assert not is_known_extension(extension)
+
+
+def test_header_names_the_folder_only_for_missing_or_unknown_extensions(tmp_path, make_sorter):
+    write(tmp_path / 'in' / 'scan', PNG)                      # no extension
+    write(tmp_path / 'in' / 'photo.jpg_original', PNG)        # unknown extension
+    write(tmp_path / 'in' / 'notes.txt', b'MZ starts this text file\n')
+    write(tmp_path / 'in' / 'mislabelled.txt', PNG)           # known extension wins
+    write(tmp_path / 'in' / 'drawing.ai', PDF)
+    write(tmp_path / 'in' / 'macros.docm', ZIP)
+    write(tmp_path / 'in' / 'site.war', ZIP)
+    write(tmp_path / 'in' / 'plain', b'just text\n')
+
+    assert make_sorter(content_types=True).sort_files(str(tmp_path), 'By File Type')
+
+    assert set(tree(tmp_path)) == {
+        'png/scan', 'png/photo.jpg_original', 'txt/notes.txt', 'txt/mislabelled.txt',
+        'ai/drawing.ai', 'docm/macros.docm', 'war/site.war', 'No_Extension/plain',
+    }
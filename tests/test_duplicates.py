@@ -0,0 +1,92 @@
+"""Tiered duplicate detection."""
+
+import os
+
+import pytest
+
+from conftest import tree, write
+from duplicates import DuplicateFinder
+
+
+def _scan(make_sorter, root):
+    return make_sorter().scan_files(str(root))
+
+
+def test_tiers_only_hash_files_that_could_match(tmp_path, make_sorter):
+    block = 16
+    write(tmp_path / 'a.bin', 'A' * 100)
+    write(tmp_path / 'b.bin', 'A' * 100)                       # duplicate of a
+    write(tmp_path / 'c.bin', 'A' * 50 + 'B' + 'A' * 49)       # same size and edges, different middle
+    write(tmp_path / 'd.bin', 'Z' * 100)                       # same size, different edges
+    write(tmp_path / 'e.bin', 'unique size')
+    write(tmp_path / 'empty1.bin', '')
+    write(tmp_path / 'empty2.bin', '')
+    files = _scan(make_sorter, tmp_path)
+    finder = DuplicateFinder(block_size=block)
+
+    groups = finder.find(files)
+
+    assert len(groups) == 1
+    names = [files[index]['filename'] for index in (groups[0].original,) + groups[0].duplicates]
+    assert sorted(names) == ['a.bin', 'b.bin']
+    assert finder.stats['size_candidates'] == 4
+    assert finder.stats['edge_hashes'] == 4
+    # d differs at the edges, so only a, b and c are read in full
+    assert finder.stats['full_hashes'] == 3
+
+
+def test_small_files_are_decided_by_the_edge_hash(tmp_path, make_sorter):
+    write(tmp_path / 'a.txt', 'same')
+    write(tmp_path / 'b.txt', 'same')
+    write(tmp_path / 'c.txt', 'diff')
+    finder = DuplicateFinder()
+
+    groups = finder.find(_scan(make_sorter, tmp_path))
+
+    assert len(groups) == 1 and len(groups[0].duplicates) == 1
+    assert finder.stats['full_hashes'] == 0
+
+
+def test_hard_links_are_hashed_once_and_reported(tmp_path, make_sorter):
+    original = write(tmp_path / 'a.txt', 'linked')
+    try:
+        os.link(original, tmp_path / 'b.txt')
+    except OSError:
+        pytest.skip('hard links are not supported here')
+    finder = DuplicateFinder()
+
+    groups = finder.find(_scan(make_sorter, tmp_path))
+
+    assert len(groups) == 1 and len(groups[0].duplicates) == 1
+    # One entry per inode, so the shared data is read once
+    assert finder.stats['edge_hashes'] == 1
+
+
+@pytest.mark.parametrize('action, expected', [
+    ('skip', {'txt/a.txt', 'y/a.txt'}),
+    ('move', {'txt/a.txt', 'Duplicates/a.txt'}),
+])
+def test_duplicate_actions_when_sorting(tmp_path, make_sorter, action, expected):
+    write(tmp_path / 'x' / 'a.txt', 'same')
+    write(tmp_path / 'y' / 'a.txt', 'same')
+
+    assert make_sorter(duplicates=action).sort_files(str(tmp_path), 'By File Type')
+
+    assert set(tree(tmp_path)) == expected
+
+
+@pytest.mark.skipif(not hasattr(os, 'link'), reason='needs hard links')
+def test_linking_leaves_a_file_named_like_the_temporary_link_alone(tmp_path, make_sorter):
+    write(tmp_path / 'a.txt', 'same')
+    duplicate = write(tmp_path / 'dup', 'same')
+    # Whichever file is kept, the other one's old temporary name is taken
+    write(tmp_path / 'a.txt.link', 'mine')
+    write(tmp_path / 'dup.link', 'also mine')
+    sorter = make_sorter(duplicates='hardlink')
+    files = sorter.scan_files(str(tmp_path))
+    sorter.duplicate_groups = DuplicateFinder().find(files)
+
+    assert sorter._link_duplicates(files, dry_run=False) == 1
+
+    assert tree(tmp_path) == {'a.txt': 'same', 'dup': 'same', 'a.txt.link': 'mine', 'dup.link': 'also mine'}
+    assert os.stat(duplicate).st_nlink == 2
@@ -0,0 +1,76 @@
+"""The GUI's log model and the queue that batches updates for the Tk thread."""
+
+import pytest
+
+pytest.importorskip('customtkinter')
+
+from gui import LogBuffer, UpdateQueue  # noqa: E402
+
+
+def test_log_keeps_the_newest_lines_and_every_issue():
+    log = LogBuffer(max_lines=3)
+
+    for index in range(5):
+        log.append(f'line {index}')
+    log.append('Warning: odd file')
+    log.append('Error moving a.txt')
+
+    assert list(log.lines) == ['line 4', 'Warning: odd file', 'Error moving a.txt']
+    assert list(log.issues) == ['Warning: odd file', 'Error moving a.txt']
+
+    log.clear()
+    assert not log.lines and not log.issues
+
+
+def test_log_file_gets_every_message(tmp_path):
+    path = tmp_path / 'logs' / 'sort.log'
+    log = LogBuffer(max_lines=2)
+
+    log.open_log_file(str(path))
+    for index in range(100):
+        log.append(f'line {index}')
+    log.close_log_file()
+    log.append('after close')
+
+    assert path.read_text().splitlines() == [f'line {index}' for index in range(100)]
+
+
+class _Handlers:
+    """Records the scheduled drains and what they delivered."""
+
+    def __init__(self):
+        self.scheduled = []
+        self.delivered = []
+
+    def queue(self):
+        return UpdateQueue(self.scheduled.append,
+                           lambda message: self.delivered.append(('message', message)),
+                           lambda event: self.delivered.append(('event', event)))
+
+
+def test_a_burst_of_updates_costs_one_callback():
+    handlers = _Handlers()
+    updates = handlers.queue()
+
+    for index in range(100):
+        updates.put_message(f'line {index}')
+        updates.put_event(index)
+
+    assert len(handlers.scheduled) == 1
+    handlers.scheduled[0]()
+    # Every message arrives in order; only the newest event is shown
+    assert handlers.delivered == [('message', f'line {index}') for index in range(100)] + [('event', 99)]
+
+
+def test_updates_after_a_drain_schedule_the_next_one():
+    handlers = _Handlers()
+    updates = handlers.queue()
+
+    updates.put_message('first')
+    handlers.scheduled.pop()()
+    updates.put_event('progress')
+    updates.put_message('second')
+
+    assert len(handlers.scheduled) == 1
+    handlers.scheduled.pop()()
+    assert handlers.delivered == [('message', 'first'), ('event', 'progress'), ('message', 'second')]
@@ -0,0 +1,93 @@
+"""Incremental re-sorting with a FileIndex."""
+
+import sqlite3
+
+from conftest import tree, write
+
+
+def _populate(root):
+    write(root / 'inbox' / 'apple.txt', 'a')
+    write(root / 'inbox' / 'banana.jpg', 'b' * 2000)
+    write(root / 'cherry.pdf', 'c')
+
+
+def test_second_run_with_same_method_skips_unchanged_folders(tmp_path, make_sorter, messages):
+    root = tmp_path / 'root'
+    _populate(root)
+    index = str(tmp_path / 'index.db')
+    assert make_sorter(index_path=index).sort_files(str(root), 'By File Type')
+    messages.clear()
+
+    sorter = make_sorter(index_path=index)
+    assert sorter.sort_files(str(root), 'By File Type')
+
+    assert 'No new or changed files since the last run.' in messages
+    assert sorter.metrics.counters['files_moved'] == 0
+
+
+def test_switching_method_re_sorts_every_file(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    _populate(root)
+    index = str(tmp_path / 'index.db')
+    assert make_sorter(index_path=index).sort_files(str(root), 'By File Type')
+    assert set(tree(root)) == {'txt/apple.txt', 'jpg/banana.jpg', 'pdf/cherry.pdf'}
+
+    sorter = make_sorter(index_path=index)
+    assert sorter.sort_files(str(root), 'Alphabetically')
+
+    assert sorter.metrics.counters['files_moved'] == 3
+    assert set(tree(root)) == {'A/apple.txt', 'B/banana.jpg', 'C/cherry.pdf'}
+
+    # And back again, still under the same index
+    sorter = make_sorter(index_path=index)
+    assert sorter.sort_files(str(root), 'By File Type')
+    assert set(tree(root)) == {'txt/apple.txt', 'jpg/banana.jpg', 'pdf/cherry.pdf'}
+
+
+def test_index_made_before_directory_methods_is_upgraded(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    _populate(root)
+    index = str(tmp_path / 'index.db')
+    connection = sqlite3.connect(index)
+    connection.execute('CREATE TABLE directories (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, '
+                       'subdirs TEXT NOT NULL)')
+    connection.commit()
+    connection.close()
+
+    assert make_sorter(index_path=index).sort_files(str(root), 'By File Type')
+
+    assert set(tree(root)) == {'txt/apple.txt', 'jpg/banana.jpg', 'pdf/cherry.pdf'}
+
+
+def test_changing_date_granularity_re_sorts(tmp_path, make_sorter):
+    import os
+    from datetime import datetime
+    root = tmp_path / 'root'
+    for name, month in (('jan.txt', 1), ('oct.txt', 10)):
+        path = write(root / name)
+        timestamp = datetime(2025, month, 15, 12).timestamp()
+        os.utime(path, (timestamp, timestamp))
+    index = str(tmp_path / 'index.db')
+    options = dict(index_path=index, date_source='mtime')
+    assert make_sorter(date_granularity='month', **options).sort_files(str(root), 'By Date')
+    assert set(tree(root)) == {'Jan_2025/jan.txt', 'Oct_2025/oct.txt'}
+
+    sorter = make_sorter(date_granularity='year', **options)
+    assert sorter.sort_files(str(root), 'By Date')
+
+    assert sorter.metrics.counters['files_moved'] == 2
+    assert set(tree(root)) == {'2025/jan.txt', '2025/oct.txt'}
+
+
+def test_changing_the_scan_filter_lists_folders_again(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    write(root / 'a.txt', 'a')
+    write(root / 'b.log', 'b')
+    index = str(tmp_path / 'index.db')
+    assert make_sorter(index_path=index, exclude=['*.log']).sort_files(str(root), 'By File Type')
+    assert set(tree(root)) == {'txt/a.txt', 'b.log'}
+
+    sorter = make_sorter(index_path=index)
+    assert sorter.sort_files(str(root), 'By File Type')
+
+    assert set(tree(root)) == {'txt/a.txt', 'log/b.log'}
@@ -0,0 +1,88 @@
+"""Journaled sorts: resume and undo."""
+
+import os
+
+from conftest import tree, write
+from journal import MoveJournal
+
+ORIGINAL = {'in/a.txt': 'a', 'in/b.jpg': 'b', 'in/c.pdf': 'c', 'in/d.txt': 'd', 'other/a.txt': 'a2'}
+
+
+def _populate(root):
+    for path, text in ORIGINAL.items():
+        write(root / path, text)
+
+
+def test_undo_restores_the_tree_including_renamed_files(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    _populate(root)
+    journal = str(tmp_path / 'journal.jsonl')
+    assert make_sorter(journal_path=journal).sort_files(str(root), 'By File Type')
+    assert 'txt/a (1).txt' in tree(root)
+
+    assert make_sorter(journal_path=journal).undo()
+
+    assert tree(root) == ORIGINAL
+
+
+def test_undo_leaves_a_file_whose_place_was_taken(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    write(root / 'in' / 'a.txt', 'mine')
+    journal = str(tmp_path / 'journal.jsonl')
+    assert make_sorter(journal_path=journal).sort_files(str(root), 'By File Type')
+    write(root / 'in' / 'a.txt', 'someone else')
+
+    assert not make_sorter(journal_path=journal).undo()
+
+    assert tree(root) == {'in/a.txt': 'someone else', 'txt/a.txt': 'mine'}
+
+
+def test_resume_finishes_a_sort_stopped_by_its_budget(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    _populate(root)
+    journal = str(tmp_path / 'journal.jsonl')
+    assert make_sorter(journal_path=journal, max_files=2).sort_files(str(root), 'By File Type')
+    run = MoveJournal(journal).read()
+    assert not run.complete and len(run.done) == 2
+
+    sorter = make_sorter(journal_path=journal)
+    assert sorter.resume()
+
+    assert set(tree(root)) == {'txt/a.txt', 'txt/a (1).txt', 'jpg/b.jpg', 'pdf/c.pdf', 'txt/d.txt'}
+    assert sorter.metrics.counters['files_moved'] == 3
+    assert MoveJournal(journal).read().complete
+
+
+def test_resume_after_a_crash_counts_unrecorded_moves_as_done(tmp_path, make_sorter):
+    root = tmp_path / 'root'
+    _populate(root)
+    journal_path = str(tmp_path / 'journal.jsonl')
+    sorter = make_sorter()
+    files = sorter.scan_files(str(root))
+    plan = sorter.plan_moves(str(root), files, sorter.file_type_bucket)
+    # The plan reached the journal, then one file moved before the process died
+    journal = MoveJournal(journal_path)
+    journal.begin(plan.to_json())
+    journal.close()
+    first = plan.moves[0]
+    os.makedirs(os.path.dirname(first.destination), exist_ok=True)
+    os.rename(first.source, first.destination)
+
+    resumed = make_sorter(journal_path=journal_path)
+    assert resumed.resume()
+
+    assert resumed.metrics.counters['files_moved'] == len(plan.moves) - 1
+    assert sorted(tree(root).values()) == sorted(ORIGINAL.values())
+    assert all('/' in path and not path.startswith(('in/', 'other/')) for path in tree(root))
+    assert len(MoveJournal(journal_path).read().done) == len(plan.moves)
+
+
+def test_resume_without_an_interrupted_run_does_nothing(tmp_path, make_sorter, messages):
+    root = tmp_path / 'root'
+    _populate(root)
+    journal = str(tmp_path / 'journal.jsonl')
+    assert make_sorter(journal_path=journal).sort_files(str(root), 'By File Type')
+
+    assert make_sorter(journal_path=journal).resume()
+
+    assert 'Nothing to resume: the last run completed.' in messages
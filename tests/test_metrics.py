@@ -0,0 +1,116 @@
+"""Exporting run metrics as JSON and as a Prometheus textfile."""
+
+import json
+import os
+import re
+
+import pytest
+
+from conftest import write
+from metrics import SortMetrics
+
+SAMPLE = re.compile(r'(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)'
+                    r'(?:\{(?P<labels>(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*",?)*)\})?'
+                    r' (?P<value>\S+)\Z')
+
+
+def _parse(text):
+    """Return {family: type} and the samples as (name, labels text, value)."""
+    types = {}
+    samples = []
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            types[name] = kind
+        elif not line.startswith('# HELP '):
+            match = SAMPLE.match(line)
+            assert match, f'malformed sample: {line!r}'
+            samples.append((match['name'], match['labels'] or '', float(match['value'])))
+    return types, samples
+
+
+@pytest.fixture
+def sorted_metrics(tmp_path, make_sorter):
+    for name in ('a.txt', 'b.jpg', 'c.jpg'):
+        write(tmp_path / 'in' / name)
+    sorter = make_sorter()
+    assert sorter.sort_files(str(tmp_path), 'By File Type')
+    return sorter.metrics
+
+
+def test_json_export(sorted_metrics):
+    data = json.loads(sorted_metrics.to_json())
+
+    assert data['success'] is True
+    assert data['method'] == 'By File Type'
+    assert data['counters']['files_moved'] == 3
+    assert data['move_latency']['count'] == 3
+    assert list(data['phases'])[:2] == ['validate', 'scan']
+
+
+def test_prometheus_samples_are_well_formed(sorted_metrics):
+    types, samples = _parse(sorted_metrics.to_prometheus())
+
+    for name, _, _ in samples:
+        family = re.sub(r'_(bucket|sum|count)\Z', '', name) if name not in types else name
+        assert family in types, f'{name} has no TYPE line'
+    # Values of one run reset with the next, so none of them is a counter
+    assert 'counter' not in types.values()
+    assert not any(name.endswith('_total') for name in types)
+    moved = [value for name, _, value in samples if name == 'file_sorter_last_run_files_moved']
+    assert moved == [3]
+
+
+def test_histogram_buckets_are_cumulative(sorted_metrics):
+    _, samples = _parse(sorted_metrics.to_prometheus())
+
+    buckets = [value for name, _, value in samples if name == 'file_sorter_move_duration_seconds_bucket']
+    count = [value for name, _, value in samples if name == 'file_sorter_move_duration_seconds_count']
+    assert buckets == sorted(buckets)
+    assert buckets[-1] == count[0] == 3
+
+
+def test_label_values_are_escaped():
+    metrics = SortMetrics(root='C:\\odd "folder"\nname', method='By Date')
+    metrics.finish(True)
+
+    _, samples = _parse(metrics.to_prometheus())
+
+    assert all(labels.startswith('root="C:\\\\odd \\"folder\\"\\nname"') for _, labels, _ in samples)
+
+
+@pytest.mark.parametrize('label', ['bad-name', '1st', '__reserved'])
+def test_invalid_label_names_are_rejected(label):
+    with pytest.raises(ValueError):
+        SortMetrics().to_prometheus({label: 'x'})
+
+
+def test_textfile_replaces_the_old_one_in_one_step(tmp_path, monkeypatch):
+    path = tmp_path / 'file_sorter.prom'
+    path.write_text('old\n')
+    metrics = SortMetrics('/x', 'By Size')
+    metrics.finish(True)
+
+    def fail(source, destination):
+        raise OSError('interrupted')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        metrics.write_prometheus(str(path))
+    # The old file is untouched and no temporary file is left behind
+    assert os.listdir(tmp_path) == ['file_sorter.prom']
+    assert path.read_text() == 'old\n'
+
+    monkeypatch.undo()
+    metrics.write_prometheus(str(path))
+    assert os.listdir(tmp_path) == ['file_sorter.prom']
+    assert path.read_text() == metrics.to_prometheus()
+
+
+def test_sorter_writes_the_textfile_after_a_run(tmp_path, make_sorter):
+    write(tmp_path / 'root' / 'a.txt')
+    path = tmp_path / 'metrics.prom'
+
+    assert make_sorter(metrics_path=str(path)).sort_files(str(tmp_path / 'root'), 'By File Type')
+
+    assert 'file_sorter_last_run_success{' in path.read_text()
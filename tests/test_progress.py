@@ -0,0 +1,57 @@
+"""Rate limiting of structured progress events."""
+
+from conftest import write
+from main import ProgressEvent, ProgressThrottle
+
+
+def _event(files_done, phase='move'):
+    return ProgressEvent(phase, files_done, 10, 0, 0, '')
+
+
+def test_events_within_the_interval_are_dropped():
+    sent = []
+    throttle = ProgressThrottle(sent.append, max_rate=0.001)
+
+    assert throttle.ready()
+    for files_done in range(5):
+        throttle.emit(_event(files_done))
+
+    assert sent == [_event(0)]
+    assert not throttle.ready()
+
+
+def test_forced_events_always_pass():
+    sent = []
+    throttle = ProgressThrottle(sent.append, max_rate=0.001)
+
+    throttle.emit(_event(1))
+    throttle.emit(_event(2))
+    throttle.emit(_event(3, 'done'), force=True)
+
+    assert sent == [_event(1), _event(3, 'done')]
+
+
+def test_rate_of_zero_means_no_limit():
+    sent = []
+    throttle = ProgressThrottle(sent.append, max_rate=0)
+
+    for files_done in range(5):
+        throttle.emit(_event(files_done))
+
+    assert len(sent) == 5
+    assert throttle.ready()
+
+
+def test_sorter_always_sends_the_final_event(tmp_path, make_sorter):
+    for name in ('a.txt', 'b.txt', 'c.jpg'):
+        write(tmp_path / name)
+    events = []
+
+    assert make_sorter(event_callback=events.append, max_event_rate=0.001).sort_files(
+        str(tmp_path), 'By File Type')
+
+    # Phase changes are forced through; the per-file events in between are not
+    phases = [event.phase for event in events]
+    assert phases[-1] == 'done'
+    assert events[-1].files_done == 3
+    assert len(events) < 3 * len(set(phases))
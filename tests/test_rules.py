@@ -0,0 +1,101 @@
+"""Classifying files with a rule file, and sorting by it."""
+
+import json
+import time
+
+import pytest
+
+from conftest import tree, write
+from rules import RuleSet
+
+
+def record(filename, size=100, age_days=0, folder='/inbox'):
+    """A file record as the scanner makes it, enough for RuleSet.match."""
+    extension = filename.rsplit('.', 1)[1] if '.' in filename else ''
+    modified = time.time() - age_days * 86400
+    return {'filename': filename, 'filepath': f'{folder}/{filename}', 'file_extension': f'.{extension}',
+            'size': size, 'modified_time': modified, 'changed_time': modified}
+
+
+def classify(config, filename, **fields):
+    rules = RuleSet(config)
+    rules.start('/')
+    return rules.classify(record(filename, **fields))
+
+
+def test_first_matching_rule_wins():
+    config = {'default': 'Other', 'rules': [
+        {'folder': 'Screenshots', 'extensions': ['png'], 'names': ['Screenshot*']},
+        {'folder': 'Images', 'extensions': ['png', 'jpg']},
+    ]}
+
+    assert classify(config, 'Screenshot 1.png') == 'Screenshots'
+    assert classify(config, 'holiday.png') == 'Images'
+    assert classify(config, 'notes.txt') == 'Other'
+
+
+def test_size_and_age_limits():
+    config = {'rules': [
+        {'folder': 'Big', 'min_size': '1K'},
+        {'folder': 'Old', 'min_age': 30},
+    ]}
+
+    assert classify(config, 'a.bin', size=2048) == 'Big'
+    assert classify(config, 'a.bin', age_days=40) == 'Old'
+    assert classify(config, 'a.bin') is None
+
+
+def test_later_rule_matches_when_the_first_name_match_fails_another_condition():
+    config = {'rules': [
+        {'folder': 'PDF reports', 'extensions': ['pdf'], 'patterns': ['report']},
+        {'folder': 'Reports', 'patterns': ['report']},
+    ]}
+
+    assert classify(config, 'report.txt') == 'Reports'
+
+
+def test_patterns_with_the_same_group_name_in_different_rules():
+    config = {'rules': [
+        {'folder': 'Invoices', 'patterns': [r'invoice-(?P<id>\d+)']},
+        {'folder': 'Orders', 'patterns': [r'order-(?P<id>\d+)']},
+    ]}
+
+    assert classify(config, 'invoice-12.pdf') == 'Invoices'
+    assert classify(config, 'order-7.pdf') == 'Orders'
+
+
+def test_backreferences_keep_their_meaning():
+    config = {'rules': [
+        {'folder': 'Other', 'patterns': ['^x(y)']},
+        {'folder': 'Doubled', 'patterns': [r'^(\w)\1']},
+    ]}
+
+    assert classify(config, 'aab.txt') == 'Doubled'
+    assert classify(config, 'abb.txt') is None
+
+
+def test_backreference_in_a_rule_with_several_patterns():
+    config = {'rules': [{'folder': 'Doubled', 'patterns': ['^(a)b', r'^(\w)\1']}]}
+
+    assert classify(config, 'zz.txt') == 'Doubled'
+    assert classify(config, 'zy.txt') is None
+
+
+def test_sort_by_rules(tmp_path, make_sorter):
+    rule_file = tmp_path / 'rules.json'
+    rule_file.write_text(json.dumps({'default': 'Other', 'rules': [
+        {'folder': 'Invoices', 'patterns': [r'invoice-(?P<id>\d+)']},
+        {'folder': 'Orders', 'patterns': [r'order-(?P<id>\d+)']},
+    ]}))
+    inbox = tmp_path / 'inbox'
+    for name in ('invoice-1.pdf', 'order-2.pdf', 'photo.jpg'):
+        write(inbox / name, name)
+
+    assert make_sorter(rules_path=str(rule_file)).sort_files(str(inbox), 'By Rules')
+
+    assert set(tree(inbox)) == {'Invoices/invoice-1.pdf', 'Orders/order-2.pdf', 'Other/photo.jpg'}
+
+
+def test_invalid_pattern_is_reported():
+    with pytest.raises(ValueError, match='invalid pattern'):
+        RuleSet({'rules': [{'folder': 'X', 'patterns': ['(']}]})
@@ -0,0 +1,119 @@
+"""Which folders a scan enters and which files it keeps."""
+
+import os
+
+import pytest
+
+from conftest import write
+from main import ScanFilter
+
+
+def scanned(sorter, root, **options):
+    """Relative paths of the files a scan returns."""
+    files = sorter.scan_files(str(root), **options)
+    return {os.path.relpath(file['filepath'], root).replace(os.sep, '/') for file in files}
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    for path in ('a.txt', 'b.jpg', '.hidden.txt', 'docs/c.txt', 'docs/deep/d.txt',
+                 'node_modules/pkg/e.js', '.git/config', 'txt/sorted.txt', 'Oct_2026/f.txt',
+                 'Tiny (<10KB)/g.txt'):
+        write(tmp_path / path, path)
+    return tmp_path
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_excluded_folders_are_not_listed(inbox, make_sorter, workers):
+    sorter = make_sorter(exclude=['node_modules', '.git'])
+
+    assert scanned(sorter, inbox, workers=workers) == {
+        'a.txt', 'b.jpg', '.hidden.txt', 'docs/c.txt', 'docs/deep/d.txt', 'txt/sorted.txt', 'Oct_2026/f.txt',
+        'Tiny (<10KB)/g.txt'}
+    assert sorter.scan_stats['directories_pruned'] == 2
+    # The root, docs, docs/deep, txt, Oct_2026 and Tiny (<10KB)
+    assert sorter.scan_stats['scandir_calls'] == 6
+
+
+def test_exclude_path_pattern(inbox, make_sorter):
+    files = scanned(make_sorter(exclude=['docs/deep']), inbox)
+
+    assert 'docs/c.txt' in files
+    assert 'docs/deep/d.txt' not in files
+
+
+def test_hidden_files_and_folders_are_skipped(inbox, make_sorter):
+    files = scanned(make_sorter(hidden_files='exclude'), inbox)
+
+    assert '.hidden.txt' not in files
+    assert '.git/config' not in files
+    assert 'a.txt' in files
+
+
+@pytest.mark.parametrize('max_depth, expected', [
+    (0, {'a.txt', 'b.jpg'}),
+    (1, {'a.txt', 'b.jpg', 'docs/c.txt'}),
+])
+def test_max_depth(inbox, make_sorter, max_depth, expected):
+    sorter = make_sorter(max_depth=max_depth, exclude=['.*', 'node_modules', 'txt', 'Oct_2026', 'Tiny*'])
+
+    assert scanned(sorter, inbox) == expected
+
+
+def test_include_keeps_matching_files_only(inbox, make_sorter):
+    files = scanned(make_sorter(include=['*.txt'], exclude=['.*']), inbox)
+
+    assert files == {'a.txt', 'docs/c.txt', 'docs/deep/d.txt', 'txt/sorted.txt', 'Oct_2026/f.txt',
+                     'Tiny (<10KB)/g.txt'}
+
+
+def test_output_folders_are_skipped(inbox, make_sorter):
+    files = scanned(make_sorter(skip_output_folders=True), inbox)
+
+    assert 'Oct_2026/f.txt' not in files
+    assert 'Tiny (<10KB)/g.txt' not in files
+    # Extension folders cannot be told apart from the user's own folders
+    assert 'txt/sorted.txt' in files
+    assert 'docs/c.txt' in files
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason='needs symlinks')
+@pytest.mark.parametrize('policy, expected', [
+    ('files', {'a.txt', 'link.txt'}),
+    ('skip', {'a.txt'}),
+    ('follow', {'a.txt', 'link.txt', 'outside/o.txt'}),
+])
+def test_symlink_policies(tmp_path, make_sorter, policy, expected):
+    root = tmp_path / 'root'
+    write(root / 'a.txt')
+    write(tmp_path / 'elsewhere' / 'o.txt')
+    try:
+        os.symlink(root / 'a.txt', root / 'link.txt')
+        os.symlink(tmp_path / 'elsewhere', root / 'outside', target_is_directory=True)
+        # A link back up the tree must not make the scan loop
+        os.symlink(root, root / 'loop', target_is_directory=True)
+    except OSError:
+        pytest.skip('symlinks are not allowed here')
+
+    assert scanned(make_sorter(symlinks=policy), root) == expected
+
+
+def test_accepts_path_checks_every_folder_on_the_way(tmp_path):
+    scan_filter = ScanFilter(include=['*.txt'], exclude=['node_modules'], max_depth=1)
+    scan_filter.start(str(tmp_path))
+
+    assert scan_filter.accepts_path(str(tmp_path / 'a.txt'))
+    assert scan_filter.accepts_path(str(tmp_path / 'docs' / 'c.txt'))
+    assert not scan_filter.accepts_path(str(tmp_path / 'b.jpg'))
+    assert not scan_filter.accepts_path(str(tmp_path / 'node_modules' / 'x.txt'))
+    assert not scan_filter.accepts_path(str(tmp_path / 'docs' / 'deep' / 'd.txt'))
+    assert not scan_filter.accepts_path(str(tmp_path / 'node_modules'), is_dir=True)
+
+
+def test_invalid_policies_are_rejected():
+    with pytest.raises(ValueError):
+        ScanFilter(hidden='maybe')
+    with pytest.raises(ValueError):
+        ScanFilter(symlinks='sometimes')
+    with pytest.raises(ValueError):
+        ScanFilter(max_depth=-1)
@@ -0,0 +1,73 @@
+"""Streaming sorts, which move files while the folder is still being scanned."""
+
+import os
+
+from conftest import tree, write
+
+
+def test_files_move_before_the_scan_finishes(tmp_path, make_sorter):
+    for folder in ('a', 'b', 'c'):
+        write(tmp_path / folder / f'{folder}.txt', folder)
+    sorter = make_sorter()
+    scanned = sorter.iter_files
+    moved_before_next = []
+
+    def iter_files(*args, **kwargs):
+        previous = None
+        for file in scanned(*args, **kwargs):
+            if previous is not None:
+                moved_before_next.append(not os.path.exists(previous))
+            previous = file['filepath']
+            yield file
+
+    sorter.iter_files = iter_files
+
+    assert sorter.sort_files(str(tmp_path), 'By File Type', streaming=True)
+
+    assert moved_before_next == [True, True]
+    assert sorter.stream_stats['files_moved'] == 3
+    assert sorter.stream_stats['first_move_seconds'] is not None
+
+
+def test_same_names_from_different_folders_are_numbered(tmp_path, make_sorter):
+    write(tmp_path / 'txt' / 'a.txt', 'sorted earlier')
+    write(tmp_path / 'x' / 'a.txt', 'one')
+    write(tmp_path / 'y' / 'a.txt', 'two')
+
+    assert make_sorter().sort_files(str(tmp_path), 'By File Type', streaming=True)
+
+    files = tree(tmp_path)
+    assert set(files) == {'txt/a.txt', 'txt/a (1).txt', 'txt/a (2).txt'}
+    assert files['txt/a.txt'] == 'sorted earlier'
+    assert sorted(files.values()) == ['one', 'sorted earlier', 'two']
+
+
+def test_vacated_folders_are_removed(tmp_path, make_sorter):
+    write(tmp_path / 'x' / 'deep' / 'a.txt')
+    write(tmp_path / 'y' / 'b.jpg')
+    os.makedirs(tmp_path / 'untouched')
+
+    assert make_sorter().sort_files(str(tmp_path), 'By File Type', streaming=True)
+
+    assert sorted(os.listdir(tmp_path)) == ['jpg', 'txt', 'untouched']
+
+
+def test_composite_method_streams_into_nested_folders(tmp_path, make_sorter):
+    write(tmp_path / 'small.txt', 'x')
+
+    assert make_sorter().sort_files(str(tmp_path), 'By File Type > By Size', streaming=True)
+
+    assert set(tree(tmp_path)) == {'txt/Tiny (<10KB)/small.txt'}
+
+
+def test_file_budget_stops_the_stream(tmp_path, make_sorter):
+    for name in ('a', 'b', 'c'):
+        write(tmp_path / 'inbox' / f'{name}.txt', name)
+    sorter = make_sorter(max_files=2)
+
+    # A budget ends the run early without failing it
+    assert sorter.sort_files(str(tmp_path), 'By File Type', streaming=True)
+
+    assert sorter.cancel_token.stop_reason == 'file_budget'
+    assert sorter.stream_stats['files_moved'] == 2
+    assert len([path for path in tree(tmp_path) if path.startswith('txt/')]) == 2
@@ -0,0 +1,58 @@
+"""Watch mode batches."""
+
+import threading
+import time
+
+from conftest import tree, write
+
+
+def _watch_until(watcher, condition, timeout=10.0):
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline and not condition():
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+        thread.join(timeout)
+    assert condition()
+
+
+def test_watch_batches_are_journaled_and_indexed(tmp_path, make_sorter):
+    from watcher import FolderWatcher
+    root = tmp_path / 'root'
+    root.mkdir()
+    sorter = make_sorter(journal_path=str(tmp_path / 'journal.jsonl'), index_path=str(tmp_path / 'index.db'))
+    # Without an initial sort, files already present are picked up as new
+    write(root / 'note.txt', 'hello')
+    watcher = FolderWatcher(sorter, str(root), 'By File Type', debounce=0.05, backend='polling',
+                            initial_sort=False)
+
+    _watch_until(watcher, lambda: watcher.stats['files_sorted'] == 1)
+    assert tree(root) == {'txt/note.txt': 'hello'}
+
+    # The batch is in the index: the next incremental sort has nothing to do
+    rows = sorter.file_index.get_files(str(root / 'txt'))
+    assert list(rows) == [str(root / 'txt' / 'note.txt')]
+
+    # And in the journal: it can be undone
+    assert sorter.journal.read().kind == 'watch'
+    assert sorter.undo()
+    assert tree(root) == {'note.txt': 'hello'}
+
+
+def test_watch_batches_are_planned_like_a_sort(tmp_path, make_sorter):
+    from watcher import FolderWatcher
+    root = tmp_path / 'root'
+    root.mkdir()
+    sorter = make_sorter(duplicates='move')
+    write(root / 'a.txt', 'same')
+    write(root / 'b.txt', 'same')
+    watcher = FolderWatcher(sorter, str(root), 'By File Type', debounce=0.05, backend='polling',
+                            initial_sort=False)
+
+    _watch_until(watcher, lambda: watcher.stats['files_sorted'] == 2)
+
+    # One of the two is kept, the other is moved aside as a duplicate
+    assert sorted(path.split('/')[0] for path in tree(root)) == ['Duplicates', 'txt']
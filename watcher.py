@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+File Sorter - Watch Mode
+
+Keeps a drop folder sorted continuously. New files are picked up from
+filesystem events (inotify on Linux, directory-mtime polling elsewhere), held
+back until their writes have finished, and then sorted in small batches with
+the same key functions as FileSorterApp's sorting methods. No periodic full
+walks of the tree are made.
+
+Author: Olagunju Matthew
+Email: olagunjunifemi6@gmail.com
+Repository: https://github.com/Matthew-123-dev/File_sorting_script
+License: MIT
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+import threading
+from typing import List, Dict, Tuple
+
+from main import FileSorterApp, CancellationToken
+
+# Backend-neutral event kinds
+FILE_CHANGED = 'file_changed'    # File created or written to; may still be open
+FILE_CLOSED = 'file_closed'      # File closed after writing, or moved in complete
+DIR_CREATED = 'dir_created'
+DIR_REMOVED = 'dir_removed'
+OVERFLOW = 'overflow'            # Events were lost; everything must be rechecked
+
+Event = Tuple[str, str]          # (kind, path)
+
+
+class InotifyBackend:
+    """Linux inotify backend using ctypes (no third-party dependency)."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE |
+                  IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+    EVENT_HEADER = struct.Struct('iIII')
+    READ_SIZE = 64 * 1024
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return True if inotify can be used on this platform."""
+        if not sys.platform.startswith('linux'):
+            return False
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            return False
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        return hasattr(libc, 'inotify_init1')
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._paths = {}
+        self._watches = {}
+
+    def add_watch(self, path: str):
+        """Start watching a directory (not recursive)."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        self._paths[wd] = path
+        self._watches[path] = wd
+
+    def remove_watch(self, path: str):
+        """Stop watching a directory."""
+        wd = self._watches.pop(path, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float) -> List[Event]:
+        """Wait up to timeout seconds and return the events that arrived."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, self.READ_SIZE)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+
+        events = []
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        while offset + header_size <= len(data):
+            wd, mask, _, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += header_size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+
+            if mask & self.IN_Q_OVERFLOW:
+                events.append((OVERFLOW, ''))
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            if mask & (self.IN_IGNORED | self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                self._watches.pop(directory, None)
+                self._paths.pop(wd, None)
+                events.append((DIR_REMOVED, directory))
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    events.append((DIR_CREATED, path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                events.append((FILE_CLOSED, path))
+            elif mask & (self.IN_CREATE | self.IN_MODIFY):
+                events.append((FILE_CHANGED, path))
+        return events
+
+    def close(self):
+        """Release the inotify file descriptor."""
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """
+    Portable fallback that detects new entries from directory mtimes.
+
+    Each poll costs one stat per watched directory; only directories whose
+    mtime changed are listed again.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._directories = {}
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def _list(self, path: str) -> Tuple[int, Dict[str, bool]]:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            entries = {entry.name: entry.is_dir(follow_symlinks=False) for entry in it}
+        return mtime_ns, entries
+
+    def add_watch(self, path: str):
+        self._directories[path] = self._list(path)
+
+    def remove_watch(self, path: str):
+        self._directories.pop(path, None)
+
+    def read_events(self, timeout: float) -> List[Event]:
+        time.sleep(min(timeout, self.interval))
+        events = []
+        for path, (mtime_ns, entries) in list(self._directories.items()):
+            try:
+                if os.stat(path).st_mtime_ns == mtime_ns:
+                    continue
+                new_state = self._list(path)
+            except OSError:
+                self._directories.pop(path, None)
+                events.append((DIR_REMOVED, path))
+                continue
+            self._directories[path] = new_state
+            for name, is_dir in new_state[1].items():
+                if name in entries:
+                    continue
+                kind = DIR_CREATED if is_dir else FILE_CHANGED
+                events.append((kind, os.path.join(path, name)))
+        return events
+
+    def close(self):
+        self._directories.clear()
+
+
+class FolderWatcher:
+    """
+    Watch a folder and sort files shortly after they land.
+
+    A file is sorted once it has been quiet for `debounce` seconds and either
+    the backend reported it closed after writing, or its size and mtime did
+    not change between two checks. Ready files are sorted in batches of up to
+    `batch_size`, planned like a sort with the selected sorting method (so
+    content types, media dates and duplicate handling apply). Duplicates are
+    only looked for among the files of one batch. Each batch is written to the
+    sorter's journal, if it has one, as a 'watch' run that replaces the
+    previous one, so only the last batch can be resumed or undone. Its moves
+    are recorded in the sorter's index.
+
+    The watcher drives its sorter from the thread that calls run(), so the
+    sorter must not be used for anything else while watching.
+    """
+
+    def __init__(self, sorter: FileSorterApp, folder_path: str, sorting_method: str,
+                 debounce: float = 0.3, batch_size: int = 100, backend: str = 'auto',
+                 initial_sort: bool = True):
+        """
+        Args:
+            sorter: FileSorterApp used for sorting and logging, owned by the
+                watcher while it runs
+            folder_path: Folder to keep sorted
+            sorting_method: One of the keys from FileSorterApp.SORTING_METHODS,
+                or a composite such as 'By File Type > By Date'
+            debounce: Seconds a file must be quiet before it is sorted
+            batch_size: Maximum number of files sorted per batch
+            backend: 'inotify', 'polling' or 'auto' (inotify where available)
+            initial_sort: Sort the files already in the folder before watching
+        """
+        if not FileSorterApp.is_valid_sorting_method(sorting_method):
+            raise ValueError(f'Invalid sorting method "{sorting_method}"')
+        self.sorter = sorter
+        self.folder_path = os.path.normpath(os.path.abspath(folder_path))
+        self.sorting_method = sorting_method
+        methods = FileSorterApp.split_sorting_method(sorting_method)
+        if sorter.rules is None and any(FileSorterApp.SORTING_METHODS[method] == 'sort_by_rules'
+                                        for method in methods):
+            raise ValueError('Sorting by rules needs a rule file')
+        self.key_func = sorter.key_function(sorting_method)
+        self.debounce = debounce
+        self.batch_size = batch_size
+        self.initial_sort = initial_sort
+        self.backend_name = backend
+        self.backend = None
+        self.pending = {}
+        self.recent_destinations = {}
+        self.stop_event = threading.Event()
+        self.stats = {'files_sorted': 0, 'batches': 0, 'errors': 0}
+
+    def _create_backend(self):
+        if self.backend_name == 'inotify' or (self.backend_name == 'auto' and InotifyBackend.available()):
+            return InotifyBackend()
+        return PollingBackend()
+
+    def _watch_tree(self, path: str, include_files: bool):
+        """
+        Add watches for a directory and all directories below it.
+        
+        With include_files, files already present are queued for sorting; this
+        covers files written into a new directory before its watch existed.
+        """
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            try:
+                self.backend.add_watch(directory)
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self._accepts(entry.path, is_dir=True):
+                                stack.append(entry.path)
+                        elif include_files:
+                            self._mark_pending(entry.path, closed=False)
+            except OSError as e:
+                self.sorter._log_progress(f'Warning: Could not watch folder {directory}: {e}')
+
+    def _accepts(self, path: str, is_dir: bool = False) -> bool:
+        """Whether the sorter's scan filter lets a path be watched and sorted."""
+        scan_filter = self.sorter.scan_filter
+        return scan_filter is None or scan_filter.accepts_path(path, is_dir)
+
+    def _mark_pending(self, path: str, closed: bool):
+        if path in self.recent_destinations or not self._accepts(path):
+            return
+        _, was_closed, signature = self.pending.get(path, (0, False, None))
+        self.pending[path] = (time.monotonic(), closed or was_closed, signature)
+
+    def _handle_event(self, kind: str, path: str):
+        if kind == OVERFLOW:
+            self.sorter._log_progress('Warning: Filesystem events were lost; re-sorting the whole folder.')
+            self.sorter.sort_files(self.folder_path, self.sorting_method)
+        elif kind == DIR_CREATED:
+            if self._accepts(path, is_dir=True):
+                self._watch_tree(path, include_files=True)
+        elif kind == DIR_REMOVED:
+            self.backend.remove_watch(path)
+        else:
+            self._mark_pending(path, kind == FILE_CLOSED)
+
+    def _collect_ready(self) -> List[Dict]:
+        """Return records for pending files that have finished being written."""
+        now = time.monotonic()
+        ready = []
+        for path, (last_event, closed, signature) in list(self.pending.items()):
+            if now - last_event < self.debounce:
+                continue
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                del self.pending[path]
+                continue
+            if not os.path.isfile(path):
+                del self.pending[path]
+                continue
+            current = (stat_result.st_size, stat_result.st_mtime_ns)
+            if not closed and current != signature:
+                # Not known to be complete; wait for it to stay unchanged
+                self.pending[path] = (now, closed, current)
+                continue
+            del self.pending[path]
+            ready.append(self.sorter._make_file_record(path, os.path.basename(path), stat_result))
+            if len(ready) >= self.batch_size:
+                break
+        return ready
+
+    def _sort_batch(self, records: List[Dict]):
+        # Each batch runs on its own token, unaffected by a cancelled or budgeted sort
+        self.sorter.cancel_token = CancellationToken()
+        if self.sorter.rules is not None:
+            # Rule ages are measured from the time of the batch
+            self.sorter.rules.start(self.folder_path)
+        plan = self.sorter._plan_sort(self.folder_path, records, self.key_func)
+        if self.sorter.duplicates == 'hardlink' and self.sorter.duplicate_groups:
+            self.sorter._link_duplicates(records, dry_run=False)
+        if not plan.moves:
+            return
+        # Journaled like a sort, so the last batch can be undone or resumed
+        moved = self.sorter._run_journaled(plan, records, kind='watch')
+        if self.sorter.file_index is not None:
+            self.sorter.file_index.record_moves(self.folder_path, self.sorter.sorting_signature(self.sorting_method),
+                                                records, self.sorter.move_results)
+        self.sorter.delete_empty_folders(self.folder_path, self.sorter.vacated_dirs)
+        expires = time.monotonic() + max(5.0, self.debounce * 10)
+        for move in plan.moves:
+            self.recent_destinations[move.destination] = expires
+        self.stats['files_sorted'] += moved
+        self.stats['batches'] += 1
+        self.stats['errors'] += len(plan.moves) - moved
+        self.sorter._log_progress(f'Watch: sorted {moved} of {len(plan.moves)} new files.')
+
+    def _expire_recent(self):
+        now = time.monotonic()
+        for path, expires in list(self.recent_destinations.items()):
+            if expires <= now:
+                del self.recent_destinations[path]
+
+    def run(self):
+        """Watch until stop() is called. Blocks the calling thread."""
+        if not self.sorter.validate_folder_path(self.folder_path):
+            return
+        if self.initial_sort:
+            self.sorter.sort_files(self.folder_path, self.sorting_method)
+
+        if self.sorter.scan_filter is not None:
+            self.sorter.scan_filter.start(self.folder_path)
+        self.backend = self._create_backend()
+        self.sorter._log_progress(f'Watching {self.folder_path} ({type(self.backend).__name__})...')
+        if self.sorter.duplicates:
+            self.sorter._log_progress('Watch: duplicates are only looked for among files that arrive '
+                                      'together, not against files sorted earlier.')
+        self._watch_tree(self.folder_path, include_files=not self.initial_sort)
+
+        try:
+            while not self.stop_event.is_set():
+                timeout = self.debounce if self.pending else 0.5
+                for kind, path in self.backend.read_events(timeout):
+                    self._handle_event(kind, path)
+                records = self._collect_ready()
+                while records:
+                    self._sort_batch(records)
+                    records = self._collect_ready()
+                self._expire_recent()
+        finally:
+            self.backend.close()
+            self.sorter._log_progress('Stopped watching.')
+
+    def stop(self):
+        """Ask run() to return after the current iteration."""
+        self.stop_event.set()
+
+
+def main():
+    """Command-line entry point for watch mode."""
+    parser = argparse.ArgumentParser(description='Continuously sort files as they land in a folder.')
+    parser.add_argument('folder', help='folder to keep sorted')
+    parser.add_argument('--method', default='By File Type',
+                        help='sorting method, or several joined by " > " for nested folders '
+                             '(default: %(default)s; choices: '
+                             + ', '.join(FileSorterApp.get_available_sorting_methods()) + ')')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                        help='seconds a file must be quiet before it is sorted (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='maximum files sorted per batch (default: %(default)s)')
+    parser.add_argument('--backend', default='auto', choices=['auto', 'inotify', 'polling'],
+                        help='event source (default: %(default)s)')
+    parser.add_argument('--rules', metavar='FILE',
+                        help='TOML or JSON rule file used by the By Rules method')
+    parser.add_argument('--no-initial-sort', action='store_true',
+                        help='do not sort existing files before watching')
+    args = parser.parse_args()
+    if not FileSorterApp.is_valid_sorting_method(args.method):
+        parser.error(f'invalid sorting method "{args.method}"')
+
+    try:
+        sorter = FileSorterApp(rules_path=args.rules)
+    except (OSError, ValueError) as e:
+        parser.error(f'could not load rules: {e}')
+    watcher = FolderWatcher(sorter, args.folder, args.method, args.debounce,
+                            args.batch_size, args.backend, not args.no_initial_sort)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print('\nOperation cancelled by user.')
+
+
+if __name__ == '__main__':
+    main()